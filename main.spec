@@ -15,7 +15,19 @@ a = Analysis(
        ("./text.yml", "data"),
        ("./datafiles/skaled-ssl-test", "data/datafiles")
     ],
-    hiddenimports=[],
+    hiddenimports=[
+       'node_cli.cli.exit',
+       'node_cli.cli.health',
+       'node_cli.cli.logs',
+       'node_cli.cli.lvmpy',
+       'node_cli.cli.node',
+       'node_cli.cli.resources_allocation',
+       'node_cli.cli.schains',
+       'node_cli.cli.ssl',
+       'node_cli.cli.sync_node',
+       'node_cli.cli.validate',
+       'node_cli.cli.wallet'
+    ],
     hookspath=[],
     runtime_hooks=[],
     excludes=[],
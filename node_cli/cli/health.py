@@ -18,9 +18,15 @@
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import click
+from node_cli.cli.info import TYPE
 from node_cli.utils.texts import Texts
 
-from node_cli.core.health import get_containers, get_schains_checks, get_sgx_info
+from node_cli.core.health import (
+    get_containers,
+    get_schains_checks,
+    get_services_status,
+    get_sgx_info
+)
 
 
 G_TEXTS = Texts()
@@ -57,3 +63,27 @@ def schains(json_format: bool) -> None:
 @health.command(help=TEXTS['sgx']['help'])
 def sgx():
     get_sgx_info()
+
+
+@health.command(help=TEXTS['services']['help'])
+@click.option(
+    '--json',
+    'json_format',
+    help=G_TEXTS['common']['json'],
+    is_flag=True
+)
+def services(json_format: bool) -> None:
+    get_services_status(json_format, sync_node=TYPE == 'sync')
+
+
+@click.group()
+def sync_health_cli():
+    pass
+
+
+@sync_health_cli.group('health', help=TEXTS['help'])
+def sync_health():
+    pass
+
+
+sync_health.add_command(services)
@@ -21,6 +21,7 @@ import sys
 
 import click
 from node_cli.core.logs import create_logs_dump
+from node_cli.utils.compression import COMPRESSION_ALGORITHMS
 from node_cli.configs.cli_logger import LOG_FILEPATH, DEBUG_LOG_FILEPATH
 from node_cli.utils.exit_codes import CLIExitCodes
 
@@ -50,9 +51,40 @@ def cli(debug):
     help='Dump logs only from specified container',
     default=None
 )
+@click.option(
+    '--since',
+    type=click.DateTime(),
+    help='Dump only logs written after this time (UTC)',
+    default=None
+)
+@click.option(
+    '--until',
+    type=click.DateTime(),
+    help='Dump only logs written before this time (UTC)',
+    default=None
+)
+@click.option(
+    '--tail',
+    type=click.IntRange(min=0),
+    help='Dump only last N lines of each container logs',
+    default=None
+)
+@click.option(
+    '--compression',
+    type=click.Choice(COMPRESSION_ALGORITHMS),
+    help='Archive compression algorithm',
+    default='gzip'
+)
 @click.argument('path')
-def dump(container, path):
-    res = create_logs_dump(path, container)
+def dump(container, since, until, tail, compression, path):
+    res = create_logs_dump(
+        path,
+        container,
+        since=since,
+        until=until,
+        tail='all' if tail is None else tail,
+        compression=compression
+    )
     if res:
         print(f'Logs dump created: {res}')
     else:
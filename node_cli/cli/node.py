@@ -35,8 +35,10 @@ from node_cli.core.node import (
     set_domain_name,
     run_checks
 )
+from node_cli.core.dashboard import show_dashboard
 from node_cli.configs import DEFAULT_NODE_BASE_PORT
 from node_cli.configs.env import ALLOWED_ENV_TYPES
+from node_cli.utils.compression import COMPRESSION_ALGORITHMS
 from node_cli.utils.decorators import check_inited
 from node_cli.utils.helper import (
     abort_if_false,
@@ -67,6 +69,12 @@ def node_info(format):
     get_node_info(format)
 
 
+@node.command('dashboard', help="Get node, health, sChains and wallet info at once")
+@click.option('--format', '-f', type=click.Choice(['json', 'text']))
+def dashboard(format):
+    show_dashboard(format)
+
+
 @node.command('register', help="Register current node in the SKALE Manager")
 @click.option(
     '--name', '-n',
@@ -116,10 +124,16 @@ def init_node(env_file):
     hidden=True,
     is_flag=True
 )
+@click.option(
+    '--prestage',
+    help='Only download and validate configs, contracts ABIs and images, '
+         'running containers are not changed',
+    is_flag=True
+)
 @click.argument('env_file')
 @streamed_cmd
-def update_node(env_file, pull_config_for_schain, unsafe_ok):
-    update(env_file, pull_config_for_schain, unsafe_ok)
+def update_node(env_file, pull_config_for_schain, unsafe_ok, prestage):
+    update(env_file, pull_config_for_schain, unsafe_ok, prestage=prestage)
 
 
 @node.command('signature', help='Get node signature for given validator id')
@@ -130,10 +144,37 @@ def signature(validator_id):
 
 
 @node.command('backup', help="Generate backup file to restore SKALE node on another machine")
+@click.option(
+    '--compression',
+    type=click.Choice(COMPRESSION_ALGORITHMS),
+    help='Archive compression algorithm',
+    default='gzip'
+)
+@click.option(
+    '--level',
+    type=int,
+    help='Compression level (1-9 for gzip, 1-19 for zstd)'
+)
+@click.option(
+    '--threads',
+    type=click.IntRange(min=1),
+    help='Compression threads, all cores are used by default'
+)
+@click.option(
+    '--incremental',
+    is_flag=True,
+    help='Store only changed files in the chunk store of the backup folder'
+)
 @click.argument('backup_folder_path')
 @streamed_cmd
-def backup_node(backup_folder_path):
-    backup(backup_folder_path)
+def backup_node(compression, level, threads, incremental, backup_folder_path):
+    backup(
+        backup_folder_path,
+        compression=compression,
+        level=level,
+        threads=threads,
+        incremental=incremental
+    )
 
 
 @node.command('restore', help="Restore SKALE node on another machine")
@@ -235,16 +276,26 @@ def _set_domain_name(domain):
     default='mainnet',
     help='Network to check'
 )
-def check(network):
-    run_checks(network)
+@click.option(
+    '--fresh',
+    is_flag=True,
+    help='Run all checks ignoring cached results'
+)
+def check(network, fresh):
+    run_checks(network, fresh=fresh)
 
 
 @node.command(help='Reconfigure iptables rules')
-@click.option('--yes', is_flag=True, callback=abort_if_false,
-              expose_value=False,
-              prompt='Are you sure you want to reconfigure firewall rules?')
-def configure_firewall():
-    configure_firewall_rules()
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation')
+@click.option(
+    '--dry-run',
+    is_flag=True,
+    help='Show rules that would be added and removed without applying them'
+)
+def configure_firewall(yes, dry_run):
+    if not dry_run and not yes:
+        click.confirm('Are you sure you want to reconfigure firewall rules?', abort=True)
+    configure_firewall_rules(force=True, dry_run=dry_run)
 
 
 @node.command(help='Show node version information')
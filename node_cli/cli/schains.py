@@ -21,9 +21,11 @@ from typing import Optional
 
 import click
 
+from node_cli.utils.compression import COMPRESSION_ALGORITHMS
 from node_cli.utils.helper import abort_if_false, URL_TYPE
 from node_cli.core.schains import (
     describe,
+    export_schain_snapshot,
     get_schain_firewall_rules,
     get_schains_by_artifacts,
     restore_schain_from_snapshot,
@@ -113,10 +115,90 @@ def info_(schain_name: str, json_format: bool) -> None:
 @click.argument('snapshot_path')
 @click.option('--schain-type', default='medium')
 @click.option('--env-type', default=None)
+@click.option(
+    '--block-number',
+    type=int,
+    default=None,
+    help='Snapshot block number, required if snapshot is read from stdin'
+)
 def restore(
     schain_name: str,
     snapshot_path: str,
     schain_type: str,
-    env_type: Optional[str]
+    env_type: Optional[str],
+    block_number: Optional[int]
+) -> None:
+    restore_schain_from_snapshot(
+        schain_name,
+        snapshot_path,
+        env_type=env_type,
+        schain_type=schain_type,
+        block_number=block_number
+    )
+
+
+@schains.group('snapshot', help='sChain snapshot commands')
+def snapshot() -> None:
+    pass
+
+
+@snapshot.command('export', help='Export sChain snapshot as compressed chunks with manifest')
+@click.argument('schain_name')
+@click.option(
+    '--output-dir',
+    default='.',
+    help='Folder for snapshot chunks and manifest'
+)
+@click.option(
+    '--block-number',
+    type=int,
+    default=None,
+    help='Block number of skaled snapshot to export, the latest by default'
+)
+@click.option(
+    '--incremental',
+    is_flag=True,
+    help='Send only changes since the previous export, restore needs its snapshot'
+)
+@click.option(
+    '--compression',
+    type=click.Choice(COMPRESSION_ALGORITHMS),
+    help='Stream compression algorithm',
+    default='gzip'
+)
+@click.option(
+    '--level',
+    type=int,
+    help='Compression level (1-9 for gzip, 1-19 for zstd)'
+)
+@click.option(
+    '--threads',
+    type=click.IntRange(min=1),
+    help='Compression threads, all cores are used by default'
+)
+@click.option(
+    '--chunk-size',
+    type=click.IntRange(min=1),
+    default=256,
+    help='Chunk size in MiB'
+)
+def export(
+    schain_name: str,
+    output_dir: str,
+    block_number: Optional[int],
+    incremental: bool,
+    compression: str,
+    level: Optional[int],
+    threads: Optional[int],
+    chunk_size: int
 ) -> None:
-    restore_schain_from_snapshot(schain_name, snapshot_path)
+    export_schain_snapshot(
+        schain_name,
+        output_dir,
+        block_number=block_number,
+        incremental=incremental,
+        compression=compression,
+        level=level,
+        threads=threads,
+        chunk_size=chunk_size * 1024 * 1024
+    )
@@ -123,16 +123,23 @@ def _update_sync(env_file, unsafe_ok):
     hidden=True,
     help='Ip of the node from to download snapshot from'
 )
+@click.option(
+    '--wait-reclaim',
+    help='Wait until btrfs frees space of removed data and show reclaimed space',
+    is_flag=True
+)
 @streamed_cmd
 def _repair_sync(
     archive: str,
     catchup: str,
     historic_state: str,
-    snapshot_from: Optional[str] = None
+    snapshot_from: Optional[str] = None,
+    wait_reclaim: bool = False
 ) -> None:
     repair_sync(
         archive=archive,
         catchup=catchup,
         historic_state=historic_state,
-        snapshot_from=snapshot_from
+        snapshot_from=snapshot_from,
+        wait_reclaim=wait_reclaim
     )
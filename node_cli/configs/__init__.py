@@ -50,6 +50,7 @@ CONTAINER_CONFIG_TMP_PATH = os.path.join(SKALE_TMP_DIR, 'config')
 CONTRACTS_PATH = os.path.join(SKALE_DIR, 'contracts_info')
 REPORTS_PATH = os.path.join(SKALE_DIR, 'reports')
 BACKUP_CONTRACTS_PATH = os.path.join(SKALE_DIR, '.old_contracts_info')
+STAGED_CONTRACTS_PATH = os.path.join(SKALE_DIR, '.staged_contracts_info')
 INIT_ENV_FILEPATH = os.path.join(SKALE_DIR, '.env')
 SKALE_RUN_DIR = '/var/run/skale'
 
@@ -94,6 +95,7 @@ LVMPY_LOG_DIR = '/var/log/docker-lvmpy'
 
 IPTABLES_DIR = '/etc/iptables/'
 IPTABLES_RULES_STATE_FILEPATH = os.path.join(IPTABLES_DIR, 'rules.v4')
+FIREWALL_PLAN_FILEPATH = os.path.join(NODE_DATA_PATH, 'firewall_plan.json')
 DEFAULT_SSH_PORT = 22
 
 FLASK_SECRET_KEY_FILENAME = 'flask_db_key.txt'
@@ -132,14 +134,23 @@ LONG_LINE = '-' * 50
 
 ADMIN_PORT = 3007
 ADMIN_HOST = 'localhost'
+ADMIN_API_POOL_SIZE = 10
+ADMIN_API_RETRIES = 3
+ADMIN_API_BACKOFF_FACTOR = 0.3
+
+CONTAINERS_REMOVAL_WORKERS = int(os.getenv('CONTAINERS_REMOVAL_WORKERS') or 4)
+IMAGES_PULL_WORKERS = int(os.getenv('IMAGES_PULL_WORKERS') or 4)
+BACKUP_WORKERS = int(os.getenv('BACKUP_WORKERS') or 4)
+SNAPSHOT_RESTORE_WORKERS = int(os.getenv('SNAPSHOT_RESTORE_WORKERS') or 8)
+CLEANUP_WORKERS = int(os.getenv('CLEANUP_WORKERS') or 4)
+LOGS_DUMP_WORKERS = int(os.getenv('LOGS_DUMP_WORKERS') or 4)
 DEFAULT_URL_SCHEME = 'http://'
 
 DEFAULT_NODE_BASE_PORT = 10000
 
 BACKUP_ARCHIVE_NAME = 'skale-node-backup'
 
-TM_INIT_TIMEOUT = 20
-RESTORE_SLEEP_TIMEOUT = 20
+CONTAINERS_READY_TIMEOUT = 300
 
 MANAGER_CONTRACTS_FILEPATH = os.path.join(CONTRACTS_PATH, 'manager.json')
 IMA_CONTRACTS_FILEPATH = os.path.join(CONTRACTS_PATH, 'ima.json')
@@ -156,6 +167,9 @@ DOCKER_SERVICE_CONFIG_PATH = '/etc/systemd/system/docker.service.d/no-host.conf'
 DOCKER_SOCKET_PATH = '/var/run/skale/docker.sock'
 
 CHECK_REPORT_PATH = os.path.join(REPORTS_PATH, 'checks.json')
+HOST_FACTS_PATH = os.path.join(REPORTS_PATH, 'host_facts.json')
+CHECK_CACHE_PATH = os.path.join(REPORTS_PATH, 'checks_cache.json')
+CHECK_CACHE_TTL = int(os.getenv('CHECK_CACHE_TTL') or 24 * 3600)
 
 AUTOLOAD_KERNEL_MODULES_PATH = '/etc/modules'
 BTRFS_KERNEL_MODULE = 'btrfs'
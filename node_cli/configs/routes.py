@@ -18,6 +18,7 @@
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+from typing import Optional, Tuple
 
 
 CURRENT_API_VERSION = 'v1'
@@ -45,6 +46,32 @@ ROUTES = {
 }
 
 
+# (connect, read) timeouts in seconds
+DEFAULT_ROUTE_TIMEOUT = (3, 60)
+TRANSACTION_ROUTE_TIMEOUT = (3, 300)
+# server builds the whole dump before sending the first byte
+DOWNLOAD_ROUTE_TIMEOUT = (3, None)
+
+ROUTE_TIMEOUTS = {
+    'node': {
+        'register': TRANSACTION_ROUTE_TIMEOUT,
+        'maintenance-on': TRANSACTION_ROUTE_TIMEOUT,
+        'maintenance-off': TRANSACTION_ROUTE_TIMEOUT,
+        'exit/start': TRANSACTION_ROUTE_TIMEOUT,
+        'set-domain-name': TRANSACTION_ROUTE_TIMEOUT
+    },
+    'health': {
+        'schains': (3, 120)
+    },
+    'logs': {
+        'dump': DOWNLOAD_ROUTE_TIMEOUT
+    },
+    'wallet': {
+        'send-eth': TRANSACTION_ROUTE_TIMEOUT
+    }
+}
+
+
 class RouteNotFoundException(Exception):
     """Raised when requested route is not found in provided API version"""
 
@@ -71,3 +98,7 @@ def get_all_available_routes(api_version=CURRENT_API_VERSION):
         for blueprint in routes
         for method in routes[blueprint]
     ]
+
+
+def get_route_timeout(blueprint: str, method: str) -> Tuple[int, Optional[int]]:
+    return ROUTE_TIMEOUTS.get(blueprint, {}).get(method, DEFAULT_ROUTE_TIMEOUT)
@@ -0,0 +1,582 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import datetime
+import glob
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import stat
+import tarfile
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from node_cli.configs import BACKUP_ARCHIVE_NAME, BACKUP_WORKERS
+from node_cli.utils.compression import (
+    DEFAULT_GZIP_LEVEL,
+    compressed_writer,
+    decompressed_reader,
+    validate_compression_level
+)
+from node_cli.utils.helper import format_bytes, read_json, save_json
+
+
+logger = logging.getLogger(__name__)
+
+TAR_BUFSIZE = 1024 * 1024
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.manifest.json'
+CHUNKS_DIR_NAME = 'chunks'
+CHUNK_SIZE = 4 * 1024 * 1024
+CHECKSUMS_MEMBER = '.skale-backup-checksums.json'
+RESTORE_PROGRESS_INTERVAL = 5
+
+PackResult = namedtuple('PackResult', ['entries', 'size', 'archive_size', 'duration'])
+IncrementalBackupResult = namedtuple(
+    'IncrementalBackupResult',
+    [
+        'manifest_path', 'entries', 'size', 'reused_files',
+        'new_chunks', 'written', 'removed_chunks', 'duration'
+    ]
+)
+StoredFile = namedtuple('StoredFile', ['chunks', 'new_chunks', 'written'])
+RestoreResult = namedtuple('RestoreResult', ['entries', 'size', 'verified', 'duration'])
+ExtractedCallback = Callable[[str, str], None]
+
+
+class BackupIntegrityError(Exception):
+    pass
+
+
+def compile_excludes(source: Path, exclude: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Converts excluded absolute paths to archive names once.
+    Returned matcher checks if archive name is excluded or is inside an excluded dir.
+    Raises ValueError for relative or unrelated paths.
+    """
+    return match_names(Path(e).relative_to(source.parent).as_posix() for e in exclude)
+
+
+def match_names(names: Iterable[str]) -> Callable[[str], bool]:
+    """ Returned matcher checks if archive name is one of names or is inside of one of them """
+    names = frozenset(names)
+    prefixes = tuple(f'{name}/' for name in names)
+
+    def is_matched(name: str) -> bool:
+        return name in names or name.startswith(prefixes)
+    return is_matched
+
+
+def iter_tree(source: Path, is_excluded: Callable[[str], bool]) -> Iterator[str]:
+    """ Walks source once yielding archive names, excluded dirs are not entered """
+    base = source.parent
+    yield source.name
+    for root, dirs, files in os.walk(source):
+        rel_root = Path(root).relative_to(base).as_posix()
+        dirs[:] = [d for d in sorted(dirs) if not is_excluded(f'{rel_root}/{d}')]
+        for name in dirs:
+            yield f'{rel_root}/{name}'
+        for name in sorted(files):
+            arcname = f'{rel_root}/{name}'
+            if not is_excluded(arcname):
+                yield arcname
+
+
+class HashingReader:
+    """ File wrapper that hashes everything read through it """
+
+    def __init__(self, fileobj) -> None:
+        self.fileobj = fileobj
+        self.hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.hash.update(data)
+        return data
+
+
+def add_bytes_member(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    tarinfo = tarfile.TarInfo(name)
+    tarinfo.size = len(data)
+    tarinfo.mtime = int(time.time())
+    tarinfo.mode = 0o600
+    tar.addfile(tarinfo, io.BytesIO(data))
+
+
+def pack_dir(
+    source: str,
+    dest: str,
+    exclude: Iterable[str] = (),
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None
+) -> PackResult:
+    """
+    Streams source dir into compressed tar archive.
+    Compression runs in a separate multi-threaded process (pigz or zstd)
+    while the tree is read. Sha256 of every file is computed while it is
+    packed and stored in the last archive member (CHECKSUMS_MEMBER).
+    """
+    exclude = tuple(exclude)
+    logger.info('Packing dir %s to %s excluding %s', source, dest, exclude)
+    source_path = Path(source)
+    is_excluded = compile_excludes(source_path, exclude)
+    base = source_path.parent
+
+    start = time.monotonic()
+    entries, size = 0, 0
+    checksums = {}
+    with compressed_writer(dest, compression, level=level, threads=threads) as out:
+        with tarfile.open(fileobj=out, mode='w|', bufsize=TAR_BUFSIZE) as tar:
+            for arcname in iter_tree(source_path, is_excluded):
+                tarinfo = tar.gettarinfo(os.path.join(base, arcname), arcname=arcname)
+                if tarinfo is None:
+                    logger.debug('Skipping unsupported file type %s', arcname)
+                    continue
+                if tarinfo.isreg():
+                    with open(os.path.join(base, arcname), 'rb') as f:
+                        reader = HashingReader(f)
+                        tar.addfile(tarinfo, reader)
+                    checksums[arcname] = reader.hash.hexdigest()
+                    size += tarinfo.size
+                else:
+                    tar.addfile(tarinfo)
+                entries += 1
+            add_bytes_member(tar, CHECKSUMS_MEMBER, json.dumps({
+                'algorithm': 'sha256',
+                'files': checksums
+            }).encode('utf-8'))
+    duration = time.monotonic() - start
+    result = PackResult(entries, size, os.path.getsize(dest), duration)
+    logger.info(
+        'Packing finished %s: %d entries, %s in %.1fs (%s/s), archive %s',
+        source,
+        result.entries,
+        format_bytes(result.size),
+        result.duration,
+        format_bytes(result.size / max(result.duration, 1e-6)),
+        format_bytes(result.archive_size)
+    )
+    return result
+
+
+def get_chunk_path(chunks_dir: str, digest: str) -> str:
+    return os.path.join(chunks_dir, digest[:2], digest)
+
+
+def store_chunk(chunks_dir: str, digest: str, data: bytes, level: int) -> int:
+    """ Writes chunk if it is not in the store yet, returns written bytes """
+    path = get_chunk_path(chunks_dir, digest)
+    if os.path.isfile(path):
+        return 0
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compressed = gzip.compress(data, compresslevel=level)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(compressed)
+    os.replace(tmp_path, path)
+    return len(compressed)
+
+
+def load_chunk(chunks_dir: str, digest: str) -> bytes:
+    with open(get_chunk_path(chunks_dir, digest), 'rb') as f:
+        data = gzip.decompress(f.read())
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise BackupIntegrityError(f'Chunk {digest} is corrupted')
+    return data
+
+
+def store_file(path: str, chunks_dir: str, level: int) -> StoredFile:
+    chunks, new_chunks, written = [], 0, 0
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest = hashlib.sha256(data).hexdigest()
+            chunk_written = store_chunk(chunks_dir, digest, data, level)
+            if chunk_written:
+                new_chunks += 1
+                written += chunk_written
+            chunks.append(digest)
+    return StoredFile(chunks, new_chunks, written)
+
+
+def get_manifest_paths(backup_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(backup_dir, f'{BACKUP_ARCHIVE_NAME}-*{MANIFEST_SUFFIX}')))
+
+
+def is_backup_manifest(path: str) -> bool:
+    return path.endswith(MANIFEST_SUFFIX)
+
+
+def get_entry(path: str, arcname: str) -> Dict:
+    st = os.lstat(path)
+    entry = {
+        'path': arcname,
+        'mode': stat.S_IMODE(st.st_mode),
+        'uid': st.st_uid,
+        'gid': st.st_gid,
+        'mtime_ns': st.st_mtime_ns
+    }
+    if stat.S_ISLNK(st.st_mode):
+        entry.update(type='symlink', link=os.readlink(path))
+    elif stat.S_ISDIR(st.st_mode):
+        entry['type'] = 'dir'
+    elif stat.S_ISREG(st.st_mode):
+        entry.update(type='file', size=st.st_size)
+    else:
+        return {}
+    return entry
+
+
+def prune_chunks(backup_dir: str) -> int:
+    """
+    Removes chunks that are not referenced by any manifest in backup_dir,
+    so deleting old manifests frees the space of their chunks.
+    Returns the number of removed chunks.
+    """
+    referenced = set()
+    for manifest_path in get_manifest_paths(backup_dir):
+        for entry in read_json(manifest_path)['entries']:
+            referenced.update(entry.get('chunks', ()))
+    removed = 0
+    for path in glob.glob(os.path.join(backup_dir, CHUNKS_DIR_NAME, '*', '*')):
+        name = os.path.basename(path)
+        if name in referenced or name.endswith('.tmp'):
+            continue
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def is_entry_unchanged(entry: Dict, previous: Optional[Dict], chunks_dir: str) -> bool:
+    return bool(
+        previous and
+        previous['type'] == 'file' and
+        previous['size'] == entry['size'] and
+        previous['mtime_ns'] == entry['mtime_ns'] and
+        all(os.path.isfile(get_chunk_path(chunks_dir, d)) for d in previous['chunks'])
+    )
+
+
+def create_incremental_backup(
+    source: str,
+    backup_dir: str,
+    exclude: Iterable[str] = (),
+    level: Optional[int] = None,
+    workers: int = BACKUP_WORKERS
+) -> IncrementalBackupResult:
+    """
+    Stores files of source into content-addressed chunk store of backup_dir
+    and writes manifest that references the chunks.
+    Files with the same size and mtime as in the latest manifest are not read,
+    chunks that are already in the store are not written.
+    Chunks not referenced by any kept manifest are removed afterwards.
+    """
+    start = time.monotonic()
+    validate_compression_level('gzip', level)
+    level = level or DEFAULT_GZIP_LEVEL
+    source_path = Path(source)
+    base = source_path.parent
+    chunks_dir = os.path.join(backup_dir, CHUNKS_DIR_NAME)
+    os.makedirs(chunks_dir, exist_ok=True)
+
+    manifests = get_manifest_paths(backup_dir)
+    previous = {}
+    if manifests:
+        logger.info('Using %s as the previous backup', manifests[-1])
+        previous = {e['path']: e for e in read_json(manifests[-1])['entries']}
+
+    is_excluded = compile_excludes(source_path, exclude)
+    entries, changed = [], []
+    reused = 0
+    for arcname in iter_tree(source_path, is_excluded):
+        entry = get_entry(os.path.join(base, arcname), arcname)
+        if not entry:
+            logger.debug('Skipping unsupported file type %s', arcname)
+            continue
+        if entry['type'] == 'file':
+            prev = previous.get(arcname)
+            if is_entry_unchanged(entry, prev, chunks_dir):
+                entry['chunks'] = prev['chunks']
+                reused += 1
+            else:
+                changed.append(entry)
+        entries.append(entry)
+
+    logger.info('Storing %d changed files, %d files are unchanged', len(changed), reused)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        stored = list(executor.map(
+            lambda e: store_file(os.path.join(base, e['path']), chunks_dir, level),
+            changed
+        ))
+    for entry, stored_file in zip(changed, stored):
+        entry['chunks'] = stored_file.chunks
+
+    created = datetime.datetime.utcnow()
+    manifest_path = os.path.join(
+        backup_dir,
+        f'{BACKUP_ARCHIVE_NAME}-{created.strftime("%Y-%m-%d-%H-%M-%S-%f")}{MANIFEST_SUFFIX}'
+    )
+    save_json(manifest_path, {
+        'version': MANIFEST_VERSION,
+        'created': created.isoformat(),
+        'chunk_size': CHUNK_SIZE,
+        'chunks_dir': CHUNKS_DIR_NAME,
+        'entries': entries
+    })
+    removed_chunks = prune_chunks(backup_dir)
+    result = IncrementalBackupResult(
+        manifest_path=manifest_path,
+        entries=len(entries),
+        size=sum(e.get('size', 0) for e in entries),
+        reused_files=reused,
+        new_chunks=sum(s.new_chunks for s in stored),
+        written=sum(s.written for s in stored),
+        removed_chunks=removed_chunks,
+        duration=time.monotonic() - start
+    )
+    logger.info(
+        'Incremental backup %s: %d entries, %s, %d new chunks, %s written, '
+        '%d unused chunks removed in %.1fs',
+        manifest_path,
+        result.entries,
+        format_bytes(result.size),
+        result.new_chunks,
+        format_bytes(result.written),
+        result.removed_chunks,
+        result.duration
+    )
+    return result
+
+
+def get_restore_path(dest: str, name: str) -> str:
+    """
+    Rejects absolute names, names with '..' and names that lead outside
+    of dest through already restored symlinks.
+    """
+    if os.path.isabs(name) or '..' in Path(name).parts:
+        raise BackupIntegrityError(f'Unsafe path in backup: {name}')
+    path = os.path.join(dest, name)
+    real_dest = os.path.realpath(dest)
+    real_parent = os.path.realpath(os.path.dirname(path))
+    if os.path.commonpath([real_dest, real_parent]) != real_dest:
+        raise BackupIntegrityError(f'Unsafe path in backup: {name}')
+    return path
+
+
+def restore_entry_owner(path: str, entry: Dict) -> None:
+    if os.geteuid() == 0:
+        os.lchown(path, entry['uid'], entry['gid'])
+
+
+def restore_from_manifest(
+    manifest_path: str,
+    dest: str,
+    on_extracted: Optional[ExtractedCallback] = None,
+    skip: Iterable[str] = ()
+) -> int:
+    """
+    Rebuilds files listed in manifest from the chunk store, returns restored entries.
+    Entries named in skip (or inside of them) are left as they are in dest.
+    """
+    manifest = read_json(manifest_path)
+    chunks_dir = os.path.join(os.path.dirname(manifest_path), manifest['chunks_dir'])
+    logger.info('Restoring %d entries from %s', len(manifest['entries']), manifest_path)
+    is_skipped = match_names(skip)
+    dirs: List[Tuple[str, Dict]] = []
+    entries = 0
+    for entry in manifest['entries']:
+        if is_skipped(entry['path']):
+            continue
+        entries += 1
+        path = get_restore_path(dest, entry['path'])
+        if entry['type'] == 'dir':
+            ensure_restore_dir(path, entry['path'])
+            dirs.append((path, entry))
+            continue
+        if os.path.lexists(path):
+            os.remove(path)
+        if entry['type'] == 'symlink':
+            os.symlink(entry['link'], path)
+            restore_entry_owner(path, entry)
+            continue
+        with open_new_file(path) as f:
+            for digest in entry['chunks']:
+                f.write(load_chunk(chunks_dir, digest))
+        restore_entry_owner(path, entry)
+        os.chmod(path, entry['mode'])
+        os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+        if on_extracted:
+            on_extracted(entry['path'], path)
+    # directories modes and mtimes are set after their content is written
+    for path, entry in reversed(dirs):
+        restore_entry_owner(path, entry)
+        os.chmod(path, entry['mode'])
+        os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+    return entries
+
+
+def open_new_file(path: str) -> BinaryIO:
+    """ Creates file for writing, fails if anything (e.g. a symlink) already exists at path """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    return os.fdopen(fd, 'wb')
+
+
+def ensure_restore_dir(path: str, name: str) -> None:
+    if os.path.islink(path) or (os.path.lexists(path) and not os.path.isdir(path)):
+        raise BackupIntegrityError(f'Unsafe path in backup: {name}')
+    os.makedirs(path, exist_ok=True)
+
+
+def restore_member_attrs(path: str, member: tarfile.TarInfo) -> None:
+    if os.geteuid() == 0:
+        os.lchown(path, member.uid, member.gid)
+    if not member.issym():
+        os.chmod(path, member.mode)
+        os.utime(path, (member.mtime, member.mtime))
+
+
+def extract_file(tar: tarfile.TarFile, member: tarfile.TarInfo, path: str) -> str:
+    """ Writes regular file member to path, returns its sha256 """
+    reader = HashingReader(tar.extractfile(member))
+    with open_new_file(path) as f:
+        shutil.copyfileobj(reader, f, TAR_BUFSIZE)
+    return reader.hash.hexdigest()
+
+
+def verify_checksums(expected: Optional[Dict], actual: Dict[str, str]) -> bool:
+    if expected is None:
+        logger.warning('Backup has no checksums, restored files are not verified')
+        return False
+    files = expected['files']
+    mismatched = sorted(name for name, digest in files.items() if actual.get(name) != digest)
+    unexpected = sorted(set(actual) - set(files))
+    if mismatched or unexpected:
+        raise BackupIntegrityError(
+            f'Backup verification failed, mismatched: {mismatched[:10]}, '
+            f'not in checksums: {unexpected[:10]}'
+        )
+    logger.info('All %d restored files match backup checksums', len(files))
+    return True
+
+
+def remove_path(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def move_tree(src: str, dest: str) -> None:
+    """ Moves content of src into dest, existing dirs are merged, other entries replaced """
+    for name in os.listdir(src):
+        src_path, dest_path = os.path.join(src, name), os.path.join(dest, name)
+        src_is_dir = os.path.isdir(src_path) and not os.path.islink(src_path)
+        dest_is_dir = os.path.isdir(dest_path) and not os.path.islink(dest_path)
+        if src_is_dir and dest_is_dir:
+            move_tree(src_path, dest_path)
+            shutil.copystat(src_path, dest_path)
+            continue
+        if dest_is_dir:
+            shutil.rmtree(dest_path)
+        os.replace(src_path, dest_path)
+
+
+def restore_archive(
+    backup_path: str,
+    dest: str,
+    on_extracted: Optional[ExtractedCallback] = None,
+    skip: Iterable[str] = ()
+) -> RestoreResult:
+    """
+    Streams backup archive member by member into a staging dir inside dest,
+    hashing every file while it is written. Files are verified against
+    CHECKSUMS_MEMBER and moved into dest only if all of them match.
+    on_extracted(name, path) is called for every extracted member,
+    path points to the staging dir. Members named in skip (or inside of them)
+    are verified but not moved into dest.
+    """
+    start = time.monotonic()
+    os.makedirs(dest, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.restore-', dir=dest)
+    expected, actual = None, {}
+    is_skipped = match_names(skip)
+    skipped: List[str] = []
+    dirs: List[Tuple[str, tarfile.TarInfo]] = []
+    entries, size = 0, 0
+    last_progress = start
+    try:
+        with decompressed_reader(backup_path) as stream:
+            with tarfile.open(fileobj=stream, mode='r|', bufsize=TAR_BUFSIZE) as tar:
+                for member in tar:
+                    if member.name == CHECKSUMS_MEMBER:
+                        expected = json.load(tar.extractfile(member))
+                        continue
+                    path = get_restore_path(staging, member.name)
+                    if not member.isdir() and os.path.lexists(path):
+                        raise BackupIntegrityError(f'Duplicate member in backup: {member.name}')
+                    if is_skipped(member.name):
+                        skipped.append(path)
+                    if member.isdir():
+                        ensure_restore_dir(path, member.name)
+                        dirs.append((path, member))
+                    elif member.isreg():
+                        actual[member.name] = extract_file(tar, member, path)
+                        size += member.size
+                    elif member.issym():
+                        os.symlink(member.linkname, path)
+                    elif member.islnk():
+                        target = get_restore_path(staging, member.linkname)
+                        if os.path.islink(target) or not os.path.isfile(target):
+                            raise BackupIntegrityError(f'Unsafe link in backup: {member.name}')
+                        os.link(target, path, follow_symlinks=False)
+                    else:
+                        logger.warning('Skipping unsupported member %s', member.name)
+                        continue
+                    if not member.isdir():
+                        restore_member_attrs(path, member)
+                    entries += 1
+                    if on_extracted:
+                        on_extracted(member.name, path)
+                    if time.monotonic() - last_progress >= RESTORE_PROGRESS_INTERVAL:
+                        last_progress = time.monotonic()
+                        logger.info('Restored %d entries, %s', entries, format_bytes(size))
+        for path, member in reversed(dirs):
+            restore_member_attrs(path, member)
+        verified = verify_checksums(expected, actual)
+        for path in skipped:
+            remove_path(path)
+        move_tree(staging, dest)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    result = RestoreResult(entries, size, verified, time.monotonic() - start)
+    logger.info(
+        'Restored %d entries, %s in %.1fs, verified: %s',
+        result.entries, format_bytes(result.size), result.duration, result.verified
+    )
+    return result
@@ -20,6 +20,7 @@
 
 import enum
 import functools
+import hashlib
 import inspect
 import itertools
 import json
@@ -27,6 +28,8 @@ import logging
 import os
 import shutil
 import socket
+import threading
+import time
 from collections import namedtuple
 from functools import wraps
 from typing import (
@@ -35,34 +38,47 @@ from typing import (
     List, Optional,
     Tuple, TypeVar, Union, )
 
-import docker  # type: ignore
 import psutil  # type: ignore
 import yaml
 from debian import debian_support
 from packaging.version import parse as version_parse
 
 from node_cli.configs import (
+    CHECK_CACHE_PATH,
+    CHECK_CACHE_TTL,
     CHECK_REPORT_PATH,
     CONTAINER_CONFIG_PATH,
     DOCKER_CONFIG_FILEPATH,
     DOCKER_DAEMON_HOSTS,
+    HOST_FACTS_PATH,
     REPORTS_PATH,
     STATIC_PARAMS_FILEPATH
 )
 from node_cli.core.resources import get_disk_size
+from node_cli.utils.docker_utils import docker_client as get_docker_client
 from node_cli.utils.helper import run_cmd, safe_mkdir
 
 logger = logging.getLogger(__name__)
 
 
-CheckResult = namedtuple('CheckResult', ['name', 'status', 'info'])
+CheckResult = namedtuple(
+    'CheckResult',
+    ['name', 'status', 'info', 'duration'],
+    defaults=(None,)
+)
 ResultList = List[CheckResult]
 
 
 NETWORK_CHECK_TIMEOUT = 4
+CHECK_TIMEOUT = 60
 CLOUDFLARE_DNS_HOST = '1.1.1.1'
 CLOUDFLARE_DNS_HOST_PORT = 443
 
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+SWAPS_PATH = '/proc/swaps'
+SYS_BLOCK_PATH = '/sys/class/block'
+DPKG_STATUS_PATH = '/var/lib/dpkg/status'
+
 Func = TypeVar('Func', bound=Callable[..., Any])
 FuncList = List[Func]
 
@@ -73,6 +89,10 @@ def get_static_params(
 ) -> Dict:
     status_params_filename = os.path.basename(STATIC_PARAMS_FILEPATH)
     static_params_filepath = os.path.join(config_path, status_params_filename)
+    return read_static_params(static_params_filepath, env_type)
+
+
+def read_static_params(static_params_filepath: str, env_type: str = 'mainnet') -> Dict:
     with open(static_params_filepath) as requirements_file:
         ydata = yaml.load(requirements_file, Loader=yaml.Loader)
         return ydata['envs'][env_type]
@@ -82,7 +102,7 @@ def check_quietly(check: Func, *args, **kwargs) -> CheckResult:
     try:
         return check(*args, **kwargs)
     except Exception as err:
-        logger.exception('%s check errored')
+        logger.exception('%s check errored', check.__name__)
         return CheckResult(
             name=check.__name__,
             status='error',
@@ -119,10 +139,12 @@ def postinstall(func) -> Func:
 def generate_report_from_result(
     check_result: List[CheckResult]
 ) -> List[Dict]:
-    report = [
-        {'name': cr.name, 'status': cr.status}
-        for cr in check_result
-    ]
+    report = []
+    for cr in check_result:
+        item = {'name': cr.name, 'status': cr.status}
+        if cr.duration is not None:
+            item['duration'] = round(cr.duration, 3)
+        report.append(item)
     return report
 
 
@@ -165,7 +187,167 @@ def merge_reports(
     ))
 
 
+class HostFactError(Exception):
+    """ Error of the fact replayed from the dumped snapshot, keeps the original repr """
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class HostFacts:
+    """
+    Snapshot of host properties shared by all checkers during one run.
+    Every fact is collected lazily at most once, only facts required by
+    executed checks are collected. Snapshot can be dumped with `to_dict`
+    and replayed with `from_dict`, collection errors included.
+    """
+
+    FACTS = (
+        'cpu_total',
+        'cpu_physical',
+        'memory',
+        'swap',
+        'disk_size',
+        'docker_version',
+        'compose_version',
+        'docker_config'
+    )
+
+    def __init__(
+        self,
+        disk_device: str,
+        facts: Optional[Dict] = None,
+        errors: Optional[Dict[str, Exception]] = None
+    ) -> None:
+        self.disk_device = disk_device
+        self._facts: Dict[str, Any] = dict(facts or {})
+        self._errors: Dict[str, Exception] = dict(errors or {})
+        self._locks = {name: threading.Lock() for name in self.FACTS}
+
+    def get(self, name: str) -> Any:
+        with self._locks[name]:
+            if name in self._errors:
+                raise self._errors[name]
+            if name not in self._facts:
+                try:
+                    self._facts[name] = getattr(self, f'_collect_{name}')()
+                except Exception as err:
+                    self._errors[name] = err
+                    raise
+            return self._facts[name]
+
+    def to_dict(self) -> Dict:
+        return {
+            'disk_device': self.disk_device,
+            'facts': {name: self._facts[name] for name in self.FACTS if name in self._facts},
+            'errors': {name: repr(err) for name, err in self._errors.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HostFacts':
+        return cls(
+            data['disk_device'],
+            facts=data['facts'],
+            errors={
+                name: HostFactError(error)
+                for name, error in data.get('errors', {}).items()
+            }
+        )
+
+    def _collect_cpu_total(self) -> int:
+        return psutil.cpu_count(logical=True)
+
+    def _collect_cpu_physical(self) -> int:
+        return psutil.cpu_count(logical=False)
+
+    def _collect_memory(self) -> int:
+        return psutil.virtual_memory().total
+
+    def _collect_swap(self) -> int:
+        return psutil.swap_memory().total
+
+    def _collect_disk_size(self) -> int:
+        return get_disk_size(self.disk_device)
+
+    def _collect_docker_version(self) -> Optional[Dict]:
+        try:
+            return get_docker_client().version()
+        except Exception as err:
+            logger.error(f'Request to docker api failed {err}')
+            return None
+
+    def _collect_compose_version(self) -> Optional[Dict]:
+        if shutil.which('docker-compose') is None:
+            return None
+        result = run_cmd(
+            ['docker-compose', '-v'],
+            check_code=False,
+            separate_stderr=True
+        )
+        return {
+            'returncode': result.returncode,
+            'output': result.stdout.decode('utf-8').rstrip()
+        }
+
+    def _collect_docker_config(self) -> Dict:
+        if not os.path.isfile(DOCKER_CONFIG_FILEPATH):
+            logger.error(f'No such file {DOCKER_CONFIG_FILEPATH}')
+            return {}
+        with open(DOCKER_CONFIG_FILEPATH) as docker_config_file:
+            try:
+                return json.load(docker_config_file)
+            except json.decoder.JSONDecodeError as err:
+                logger.error(f'Loading docker config json failed with {err}')
+                return {}
+
+
+def save_host_facts(facts: HostFacts, path: str = HOST_FACTS_PATH) -> None:
+    safe_mkdir(REPORTS_PATH)
+    with open(path, 'w') as facts_file:
+        json.dump(facts.to_dict(), facts_file, indent=4)
+
+
+def load_host_facts(path: str = HOST_FACTS_PATH) -> HostFacts:
+    with open(path) as facts_file:
+        return HostFacts.from_dict(json.load(facts_file))
+
+
+def file_stat_fingerprint(path: Optional[str]) -> Optional[str]:
+    if path is None or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f'{path}:{stat.st_mtime_ns}:{stat.st_size}'
+
+
+def file_content_fingerprint(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def block_device_size_fingerprint(disk_device: str) -> Optional[str]:
+    device_name = os.path.basename(os.path.realpath(disk_device))
+    return file_content_fingerprint(os.path.join(SYS_BLOCK_PATH, device_name, 'size'))
+
+
 class BaseChecker:
+    def fingerprint(self, check_name: str) -> Optional[str]:
+        """
+        Returns digest of everything the check result depends on,
+        None means that result of the check can't be cached.
+        """
+        inputs = self._get_fingerprint_inputs(check_name)
+        if inputs is None:
+            return None
+        requirements = getattr(self, 'requirements', None)
+        data = json.dumps([check_name, requirements, inputs], sort_keys=True)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _get_fingerprint_inputs(self, check_name: str) -> Optional[str]:
+        return None
+
     def _ok(
         self,
         name: str,
@@ -211,15 +393,26 @@ class MachineChecker(BaseChecker):
             self,
             requirements: Dict,
             disk_device: str,
-            network_timeout: Optional[int] = None) -> None:
+            network_timeout: Optional[int] = None,
+            facts: Optional[HostFacts] = None) -> None:
         self.requirements = requirements
         self.disk_device = disk_device
         self.network_timeout = network_timeout or NETWORK_CHECK_TIMEOUT
+        self.facts = facts or HostFacts(disk_device)
+
+    def _get_fingerprint_inputs(self, check_name: str) -> Optional[str]:
+        if check_name in ('cpu_total', 'cpu_physical', 'memory'):
+            return file_content_fingerprint(BOOT_ID_PATH)
+        elif check_name == 'swap':
+            return file_content_fingerprint(SWAPS_PATH)
+        elif check_name == 'disk':
+            return block_device_size_fingerprint(self.disk_device)
+        return None
 
     @preinstall
     def cpu_total(self) -> CheckResult:
         name = 'cpu-total'
-        actual = psutil.cpu_count(logical=True)
+        actual = self.facts.get('cpu_total')
         expected = self.requirements['cpu_total']
         info = f'Expected {expected} logical cores, actual {actual} cores'
         if actual < expected:
@@ -230,7 +423,7 @@ class MachineChecker(BaseChecker):
     @preinstall
     def cpu_physical(self) -> CheckResult:
         name = 'cpu-physical'
-        actual = psutil.cpu_count(logical=False)
+        actual = self.facts.get('cpu_physical')
         expected = self.requirements['cpu_physical']
         info = f'Expected {expected} physical cores, actual {actual} cores'
         if actual < expected:
@@ -241,8 +434,7 @@ class MachineChecker(BaseChecker):
     @preinstall
     def memory(self) -> CheckResult:
         name = 'memory'
-        mem_info = psutil.virtual_memory().total,
-        actual = mem_info[0]
+        actual = self.facts.get('memory')
         expected = self.requirements['memory']
         actual_gb = round(actual / 1024 ** 3, 2)
         expected_gb = round(expected / 1024 ** 3, 2)
@@ -255,7 +447,7 @@ class MachineChecker(BaseChecker):
     @preinstall
     def swap(self) -> CheckResult:
         name = 'swap'
-        actual = psutil.swap_memory().total
+        actual = self.facts.get('swap')
         expected = self.requirements['swap']
         actual_gb = round(actual / 1024 ** 3, 2)
         expected_gb = round(expected / 1024 ** 3, 2)
@@ -266,7 +458,7 @@ class MachineChecker(BaseChecker):
             return self._ok(name=name, info=info)
 
     def _get_disk_size(self) -> int:
-        return get_disk_size(self.disk_device)
+        return self.facts.get('disk_size')
 
     @preinstall
     def disk(self) -> CheckResult:
@@ -285,29 +477,75 @@ class MachineChecker(BaseChecker):
     def network(self) -> CheckResult:
         name = 'network'
         try:
-            socket.setdefaulttimeout(self.network_timeout)
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect(
-                (CLOUDFLARE_DNS_HOST, CLOUDFLARE_DNS_HOST_PORT))
-            return self._ok(name=name)
+            with socket.create_connection(
+                (CLOUDFLARE_DNS_HOST, CLOUDFLARE_DNS_HOST_PORT),
+                timeout=self.network_timeout
+            ):
+                return self._ok(name=name)
         except socket.error as err:
             info = f'Network checking returned error: {err}'
             return self._failed(name=name, info=info)
 
 
+PackageInfo = namedtuple('PackageInfo', ['name', 'status', 'version'])
+
+DPKG_QUERY_FORMAT = '${Package}\t${db:Status-Status}\t${Version}\n'
+PACKAGES_CACHE: Dict[str, Optional[PackageInfo]] = {}
+PACKAGES_CACHE_LOCK = threading.Lock()
+
+
+def parse_dpkg_query_output(output: str) -> Dict[str, PackageInfo]:
+    packages = {}
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) == 3:
+            info = PackageInfo(*fields)
+            packages[info.name] = info
+    return packages
+
+
+def get_packages_info(packages: Iterable[str]) -> Dict[str, Optional[PackageInfo]]:
+    """
+    Returns dpkg status and version of the packages (None if package is unknown).
+    Packages that are not cached yet are queried with a single dpkg-query call,
+    results are kept for the whole process.
+    """
+    packages = list(packages)
+    with PACKAGES_CACHE_LOCK:
+        missing = sorted(set(packages) - set(PACKAGES_CACHE))
+        if missing:
+            result = run_cmd(
+                ['dpkg-query', '-W', '-f', DPKG_QUERY_FORMAT, *missing],
+                check_code=False,
+                separate_stderr=True
+            )
+            found = parse_dpkg_query_output(result.stdout.decode('utf-8'))
+            for name in missing:
+                PACKAGES_CACHE[name] = found.get(name)
+        return {name: PACKAGES_CACHE[name] for name in packages}
+
+
+def reset_packages_cache() -> None:
+    with PACKAGES_CACHE_LOCK:
+        PACKAGES_CACHE.clear()
+
+
 class PackageChecker(BaseChecker):
     def __init__(self, requirements: Dict) -> None:
         self.requirements = requirements
 
+    def _get_fingerprint_inputs(self, check_name: str) -> Optional[str]:
+        return file_stat_fingerprint(DPKG_STATUS_PATH)
+
     def _check_apt_package(self, package_name: str,
                            version: str = None) -> CheckResult:
-        # TODO: check versions
-        dpkg_cmd_result = run_cmd(
-            ['dpkg', '-s', package_name], check_code=False)
-        output = dpkg_cmd_result.stdout.decode('utf-8').strip()
-        if dpkg_cmd_result.returncode != 0:
-            return self._failed(name=package_name, info=output)
-
-        actual_version = self._version_from_dpkg_output(output)
+        packages_info = get_packages_info({*self.requirements, package_name})
+        package_info = packages_info[package_name]
+        if package_info is None or package_info.status != 'installed':
+            info = f'Package {package_name} is not installed'
+            return self._failed(name=package_name, info=info)
+
+        actual_version = package_info.version
         expected_version = self.requirements[package_name]
         info = {
             'expected_version': expected_version,
@@ -341,29 +579,25 @@ class PackageChecker(BaseChecker):
     def psmisc(self) -> CheckResult:
         return self._check_apt_package('psmisc')
 
-    def _version_from_dpkg_output(self, output: str) -> str:
-        info_lines = map(lambda s: s.strip(), output.split('\n'))
-        v_line = next(filter(
-            lambda s: s.startswith('Version'),
-            info_lines
-        ))
-        return v_line.split()[1]
-
 
 class DockerChecker(BaseChecker):
-    def __init__(self, requirements: Dict) -> None:
-        self.docker_client = docker.from_env()
+    def __init__(self, requirements: Dict, facts: Optional[HostFacts] = None) -> None:
         self.requirements = requirements
+        self.facts = facts or HostFacts(disk_device='')
+
+    def _get_fingerprint_inputs(self, check_name: str) -> Optional[str]:
+        # docker_engine and docker_api check that daemon is reachable, they are never cached
+        if check_name == 'docker_compose':
+            return file_stat_fingerprint(shutil.which('docker-compose'))
+        elif check_name in ('keeping_containers_alive', 'hosts_config'):
+            return file_stat_fingerprint(DOCKER_CONFIG_FILEPATH)
+        return None
 
     def _check_docker_command(self) -> Optional[str]:
         return shutil.which('docker')
 
     def _get_docker_version_info(self) -> Optional[Dict]:
-        try:
-            return self.docker_client.version()
-        except Exception as err:
-            logger.error(f'Request to docker api failed {err}')
-            return None
+        return self.facts.get('docker_version')
 
     @preinstall
     def docker_engine(self) -> CheckResult:
@@ -378,7 +612,7 @@ class DockerChecker(BaseChecker):
                 info='Docker api request failed. Is docker installed?'
             )
         logger.debug('Docker version info %s', version_info)
-        actual_version = self.docker_client.version()['Version']
+        actual_version = version_info['Version']
         expected_version = self.requirements['docker-engine']
         info = {
             'expected_version': expected_version,
@@ -416,18 +650,13 @@ class DockerChecker(BaseChecker):
     @preinstall
     def docker_compose(self) -> CheckResult:
         name = 'docker-compose'
-        cmd = shutil.which('docker-compose')
-        if cmd is None:
+        compose_version = self.facts.get('compose_version')
+        if compose_version is None:
             info = 'No such command: "docker-compose"'
             return self._failed(name=name, info=info)
 
-        v_cmd_result = run_cmd(
-            ['docker-compose', '-v'],
-            check_code=False,
-            separate_stderr=True
-        )
-        output = v_cmd_result.stdout.decode('utf-8').rstrip()
-        if v_cmd_result.returncode != 0:
+        output = compose_version['output']
+        if compose_version['returncode'] != 0:
             info = f'Checking docker-compose version failed with: {output}'
             return self._failed(name=name, info=output)
 
@@ -441,16 +670,7 @@ class DockerChecker(BaseChecker):
             return self._ok(name=name, info=info)
 
     def _get_docker_config(self) -> Dict:
-        if not os.path.isfile(DOCKER_CONFIG_FILEPATH):
-            logger.error(f'No such file {DOCKER_CONFIG_FILEPATH}')
-            return {}
-        with open(DOCKER_CONFIG_FILEPATH) as docker_config_file:
-            try:
-                docker_config = json.load(docker_config_file)
-            except json.decoder.JSONDecodeError as err:
-                logger.error(f'Loading docker config json failed with {err}')
-                return {}
-            return docker_config
+        return self.facts.get('docker_config')
 
     def _check_docker_alive_option(self, config: Dict) -> Tuple:
         actual_value = config.get('live-restore', None)
@@ -510,11 +730,139 @@ def get_checks(
     )
 
 
-def get_all_checkers(disk: str, requirements: Dict) -> List[BaseChecker]:
+def get_check_name(check: Func) -> str:
+    return getattr(check, 'func', check).__name__
+
+
+def timed_check(check: Func) -> CheckResult:
+    start = time.perf_counter()
+    result = check()
+    return result._replace(duration=time.perf_counter() - start)
+
+
+class CheckThread(threading.Thread):
+    """
+    Runs one check in a daemon thread, so a hung check doesn't keep
+    the process alive after its result is reported as timed out.
+    """
+
+    def __init__(self, check: Func) -> None:
+        super().__init__(name=f'check-{get_check_name(check)}', daemon=True)
+        self.check = check
+        self.started_at = 0.0
+        self.result: Optional[CheckResult] = None
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        super().start()
+
+    def run(self) -> None:
+        try:
+            self.result = timed_check(self.check)
+        except BaseException as err:
+            self.error = err
+
+
+def execute_checks(checks: FuncList, timeout: float = CHECK_TIMEOUT) -> ResultList:
+    """
+    Runs every check in its own thread. Results keep the order of checks,
+    a check that doesn't finish in `timeout` seconds since its start
+    is reported as errored.
+    """
+    threads = [CheckThread(check) for check in checks]
+    for thread in threads:
+        thread.start()
+    results = []
+    for thread in threads:
+        thread.join(max(thread.started_at + timeout - time.monotonic(), 0))
+        if thread.is_alive():
+            name = get_check_name(thread.check)
+            logger.error('%s check timed out after %ds', name, timeout)
+            results.append(CheckResult(
+                name=name,
+                status='error',
+                info=f'Timed out after {timeout}s',
+                duration=timeout
+            ))
+        elif thread.error is not None:
+            raise thread.error
+        else:
+            results.append(thread.result)
+    return results
+
+
+def get_checks_cache(cache_path: str = CHECK_CACHE_PATH) -> Dict:
+    if not os.path.isfile(cache_path):
+        return {}
+    with open(cache_path) as cache_file:
+        try:
+            return json.load(cache_file)
+        except json.decoder.JSONDecodeError as err:
+            logger.warning('Checks cache is corrupted %s', err)
+            return {}
+
+
+def save_checks_cache(cache: Dict, cache_path: str = CHECK_CACHE_PATH) -> None:
+    safe_mkdir(REPORTS_PATH)
+    with open(cache_path, 'w') as cache_file:
+        json.dump(cache, cache_file, indent=4)
+
+
+def get_check_fingerprint(check: Func) -> Optional[str]:
+    checker = check.args[0] if isinstance(check, functools.partial) else None
+    if not isinstance(checker, BaseChecker):
+        return None
+    return checker.fingerprint(get_check_name(check))
+
+
+def execute_cached_checks(
+    checks: FuncList,
+    cache: Dict,
+    ttl: int = CHECK_CACHE_TTL
+) -> ResultList:
+    """
+    Serves successful results of checks with unchanged fingerprint from `cache`
+    if they are younger than `ttl` seconds, executes the rest and updates `cache`.
+    """
+    now = time.time()
+    results: List[Optional[CheckResult]] = [None] * len(checks)
+    fingerprints = [get_check_fingerprint(check) for check in checks]
+    to_run = []
+    for i, check in enumerate(checks):
+        name = get_check_name(check)
+        entry = cache.get(name)
+        if fingerprints[i] is not None and entry is not None and \
+                entry['fingerprint'] == fingerprints[i] and now - entry['timestamp'] < ttl:
+            logger.debug('%s check result is served from cache', name)
+            results[i] = CheckResult(**entry['result'])._replace(duration=0)
+        else:
+            to_run.append(i)
+
+    for i, result in zip(to_run, execute_checks([checks[i] for i in to_run])):
+        results[i] = result
+        name = get_check_name(checks[i])
+        if result.status == 'ok' and fingerprints[i] is not None:
+            cache[name] = {
+                'fingerprint': fingerprints[i],
+                'timestamp': now,
+                'result': {'name': result.name, 'status': result.status, 'info': result.info}
+            }
+        else:
+            cache.pop(name, None)
+    return cast(ResultList, results)
+
+
+def get_all_checkers(
+    disk: str,
+    requirements: Dict,
+    facts: Optional[HostFacts] = None
+) -> List[BaseChecker]:
+    facts = facts or HostFacts(disk)
     return [
-        MachineChecker(requirements['server'], disk),
+        MachineChecker(requirements['server'], disk, facts=facts),
         PackageChecker(requirements['package']),
-        DockerChecker(requirements['docker'])
+        DockerChecker(requirements['docker'], facts=facts)
     ]
 
 
@@ -522,13 +870,20 @@ def run_checks(
     disk: str,
     env_type: str = 'mainnet',
     config_path: str = CONTAINER_CONFIG_PATH,
-    check_type: CheckType = CheckType.ALL
+    check_type: CheckType = CheckType.ALL,
+    fresh: bool = False,
+    requirements: Optional[Dict] = None
 ) -> ResultList:
-    logger.info('Executing checks. Type: %s', check_type)
-    requirements = get_static_params(env_type, config_path)
-    checkers = get_all_checkers(disk, requirements)
+    logger.info('Executing checks. Type: %s, fresh: %s', check_type, fresh)
+    if requirements is None:
+        requirements = get_static_params(env_type, config_path)
+    facts = HostFacts(disk)
+    checkers = get_all_checkers(disk, requirements, facts=facts)
     checks = get_checks(checkers, check_type)
-    results = [check() for check in checks]
+    cache = {} if fresh else get_checks_cache()
+    results = execute_cached_checks(checks, cache)
+    save_checks_cache(cache)
+    save_host_facts(facts)
 
     saved_report = get_report()
     report = generate_report_from_result(results)
@@ -0,0 +1,120 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import logging
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from node_cli.core.node import NodeStatuses, get_node_status
+from node_cli.utils.exit_codes import CLIExitCodes
+from node_cli.utils.helper import get_request
+from node_cli.utils.print_formatters import (
+    print_containers,
+    print_dashboard_section,
+    print_dkg_statuses,
+    print_err_response,
+    print_node_info,
+    print_schains,
+    print_schains_healthchecks,
+    print_sgx_info,
+    print_wallet_info,
+    TEXTS
+)
+
+
+logger = logging.getLogger(__name__)
+
+DashboardSection = namedtuple('DashboardSection', ['title', 'blueprint', 'method', 'params'])
+
+DASHBOARD_SECTIONS = {
+    'node': DashboardSection('Node', 'node', 'info', None),
+    'containers': DashboardSection('Containers', 'health', 'containers', {'all': False}),
+    'schains_health': DashboardSection('sChains healthchecks', 'health', 'schains', None),
+    'sgx': DashboardSection('SGX', 'health', 'sgx', None),
+    'schains': DashboardSection('sChains', 'schains', 'list', None),
+    'dkg': DashboardSection('DKG statuses', 'schains', 'dkg-statuses', {'all': False}),
+    'wallet': DashboardSection('Wallet', 'wallet', 'info', None)
+}
+
+
+def fetch_dashboard() -> Dict[str, Dict]:
+    """ Requests all dashboard sections concurrently, keeps DASHBOARD_SECTIONS order """
+    with ThreadPoolExecutor(max_workers=len(DASHBOARD_SECTIONS)) as executor:
+        futures = {
+            name: executor.submit(
+                get_request,
+                blueprint=section.blueprint,
+                method=section.method,
+                params=section.params
+            )
+            for name, section in DASHBOARD_SECTIONS.items()
+        }
+        results = {}
+        for name, future in futures.items():
+            status, payload = future.result()
+            results[name] = {'status': status, 'payload': payload}
+    return results
+
+
+def print_node_section(payload: Dict) -> None:
+    node_info = payload['node_info']
+    if node_info['status'] == NodeStatuses.NOT_CREATED.value:
+        print(TEXTS['service']['node_not_registered'])
+    else:
+        print_node_info(node_info, get_node_status(int(node_info['status'])))
+
+
+def print_list_section(printer):
+    def print_section(payload):
+        if not payload:
+            print('No sChains found')
+        else:
+            printer(payload)
+    return print_section
+
+
+SECTION_PRINTERS = {
+    'node': print_node_section,
+    'containers': print_containers,
+    'schains_health': print_list_section(print_schains_healthchecks),
+    'sgx': print_sgx_info,
+    'schains': print_list_section(print_schains),
+    'dkg': print_dkg_statuses,
+    'wallet': print_wallet_info
+}
+
+
+def show_dashboard(format: str = 'text') -> None:
+    results = fetch_dashboard()
+    if format == 'json':
+        print(json.dumps(results, indent=4))
+    else:
+        for name, result in results.items():
+            print_dashboard_section(DASHBOARD_SECTIONS[name].title)
+            if result['status'] == 'ok':
+                SECTION_PRINTERS[name](result['payload'])
+            else:
+                print_err_response(result['payload'])
+    failed = [name for name, result in results.items() if result['status'] != 'ok']
+    if failed:
+        logger.error('Dashboard sections failed: %s', ', '.join(failed))
+        sys.exit(CLIExitCodes.BAD_API_RESPONSE.value)
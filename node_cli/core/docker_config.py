@@ -19,7 +19,7 @@ from node_cli.configs import (
     SKALE_RUN_DIR,
 )
 from node_cli.utils.helper import run_cmd
-from node_cli.utils.docker_utils import docker_client, get_containers
+from node_cli.utils.docker_utils import get_container_summaries
 
 
 logger = logging.getLogger(__name__)
@@ -44,9 +44,6 @@ def get_content(filename: Path) -> Optional[str]:
         return f.read()
 
 
-gdclient = docker_client()
-
-
 class DockerConfigError(Exception):
     pass
 
@@ -174,7 +171,7 @@ def ensure_run_dir(run_dir: Path = SKALE_RUN_DIR) -> DockerConfigResult:
 def assert_no_containers(ignore: Tuple[str] = ()):
     containers = [
         c.name
-        for c in get_containers()
+        for c in get_container_summaries(use_cache=False)
         if c.name not in ignore
     ]
     if len(containers) > 0:
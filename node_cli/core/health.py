@@ -18,11 +18,15 @@
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import json
-from terminaltables import SingleTable
+import sys
 
+from node_cli.utils.decorators import check_inited
+from node_cli.utils.docker_utils import get_services_liveness
 from node_cli.utils.print_formatters import (
     print_containers,
-    print_schains_healthchecks
+    print_schains_healthchecks,
+    print_services_liveness,
+    print_sgx_info
 )
 from node_cli.utils.helper import error_exit, get_request
 from node_cli.utils.exit_codes import CLIExitCodes
@@ -66,15 +70,23 @@ def get_sgx_info():
         method='sgx'
     )
     if status == 'ok':
-        data = payload
-        table_data = [
-            ['SGX info', ''],
-            ['Server URL', data['sgx_server_url']],
-            ['SGXWallet Version', data['sgx_wallet_version']],
-            ['Node SGX keyname', data['sgx_keyname']],
-            ['Status', data['status_name']]
-        ]
-        table = SingleTable(table_data)
-        print(table.table)
+        print_sgx_info(payload)
     else:
         error_exit(payload, exit_code=CLIExitCodes.BAD_API_RESPONSE)
+
+
+@check_inited
+def get_services_status(json_format: bool = False, sync_node: bool = False) -> None:
+    from node_cli.core.node import get_node_env  # heavy, needed only for this command
+
+    env = get_node_env(None, sync_node=sync_node)
+    liveness = get_services_liveness(env, sync_node=sync_node)
+    if json_format:
+        print(json.dumps({
+            service: state._asdict()
+            for service, state in liveness.items()
+        }))
+    else:
+        print_services_liveness(liveness.values())
+    if not all(state.alive for state in liveness.values()):
+        sys.exit(CLIExitCodes.FAILURE.value)
@@ -39,7 +39,6 @@ from node_cli.configs import (
 from node_cli.configs.resource_allocation import (
     RESOURCE_ALLOCATION_FILEPATH
 )
-from node_cli.configs.cli_logger import LOG_DATA_PATH
 from node_cli.configs.env import SKALE_DIR_ENV_FILEPATH, CONFIGS_ENV_FILEPATH
 from node_cli.utils.helper import safe_mkdir
 from node_cli.utils.print_formatters import print_abi_validation_errors
@@ -112,11 +111,6 @@ def link_env_file():
         os.symlink(SKALE_DIR_ENV_FILEPATH, CONFIGS_ENV_FILEPATH)
 
 
-def init_logs_dir():
-    safe_mkdir(LOG_DATA_PATH)
-    safe_mkdir(REMOVED_CONTAINERS_FOLDER_PATH)
-
-
 def init_data_dir():
     safe_mkdir(NODE_DATA_PATH)
 
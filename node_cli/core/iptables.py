@@ -17,18 +17,24 @@
 #   You should have received a copy of the GNU Affero General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
+import json
 import logging
+import os
 import socket
 import sys
+from collections import namedtuple
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from node_cli.configs import (
+    FIREWALL_PLAN_FILEPATH,
     IPTABLES_DIR,
     IPTABLES_RULES_STATE_FILEPATH,
     ENV,
     DEFAULT_SSH_PORT
 )
-from node_cli.utils.helper import run_cmd
+from node_cli.utils.helper import read_json, run_cmd, save_json
 
 
 logger = logging.getLogger(__name__)
@@ -37,8 +43,7 @@ try:
     import iptc
 except (FileNotFoundError, AttributeError) as err:
     if "pytest" in sys.modules or ENV == 'dev':
-        from collections import namedtuple  # hotfix for tests
-        iptc = namedtuple('iptc', ['Chain', 'Rule'])
+        iptc = namedtuple('iptc', ['Chain', 'Rule'])  # hotfix for tests
     else:
         logger.error(f'Unable to import iptc due to an error {err}')
 
@@ -57,84 +62,61 @@ ALLOWED_INCOMING_UDP_PORTS = [
     '53'  # dns
 ]
 
+BASE_POLICIES = {
+    'INPUT': 'ACCEPT',
+    'OUTPUT': 'ACCEPT',
+    'FORWARD': 'DROP'
+}
 
-def configure_iptables():
-    """
-    This is the main function used for the initial setup of the firewall rules on the SKALE Node
-    host machine
-    """
-    logger.info('Configuring iptables...')
-    if not iptc:
-        raise ImportError('Unable to import iptc package')
-    Path(IPTABLES_DIR).mkdir(parents=True, exist_ok=True)
+ALLOWED_ICMP_TYPES = ['destination-unreachable', 'source-quench', 'time-exceeded']
 
-    tb = iptc.Table(iptc.Table.FILTER)
-    input_chain = iptc.Chain(tb, 'INPUT')
-
-    set_base_policies()
-    allow_loopback(input_chain)
-    accept_icmp(input_chain)
-    allow_conntrack(input_chain)
-    allow_base_ports(input_chain)
-    drop_all_tcp(input_chain)
-    drop_all_udp(input_chain)
-    save_iptables_rules_state()
-
-
-def save_iptables_rules_state():
-    res = run_cmd(['iptables-save'])
-    plain_rules = res.stdout.decode('utf-8').rstrip()
-    with open(IPTABLES_RULES_STATE_FILEPATH, 'w') as state_file:
-        state_file.write(plain_rules)
-
-
-def set_base_policies() -> None:
-    """Drop all incoming, allow all outcoming, drop all forwarding"""
-    logger.debug('Setting base policies...')
-    iptc.easy.set_policy(iptc.Table.FILTER, 'INPUT', 'ACCEPT')
-    iptc.easy.set_policy(iptc.Table.FILTER, 'OUTPUT', 'ACCEPT')
-    iptc.easy.set_policy(iptc.Table.FILTER, 'FORWARD', 'DROP')
+FIREWALL_PLAN_VERSION = 1
 
+FirewallRule = namedtuple(
+    'FirewallRule',
+    ['target', 'protocol', 'in_interface', 'dport', 'icmp_type', 'ctstate', 'insert'],
+    defaults=(None, None, None, None, None, False)
+)
+FirewallDiff = namedtuple('FirewallDiff', ['add', 'remove'])
 
-def allow_loopback(chain: iptc.Chain) -> None:
-    """Allow local loopback services"""
-    logger.debug('Allowing loopback packages...')
-    rule = iptc.Rule()
-    rule.target = iptc.Target(rule, 'ACCEPT')
-    rule.in_interface = 'lo'
-    ensure_rule(chain, rule)
 
+class ChainReconciler:
+    """
+    Reads chain rules from the kernel once and queues changes,
+    apply() should be followed by a single table commit
+    """
 
-def allow_conntrack(chain: iptc.Chain) -> None:
-    """Allow conntrack established connections"""
-    logger.debug('Allowing conntrack...')
-    rule = iptc.Rule()
-    rule.target = iptc.Target(rule, 'ACCEPT')
-    match = iptc.Match(rule, 'conntrack')
-    chain = iptc.Chain(iptc.Table(iptc.Table.FILTER), 'INPUT')
-    match.ctstate = 'RELATED,ESTABLISHED'
-    rule.add_match(match)
-    ensure_rule(chain, rule)
-
-
-def drop_all_tcp(chain: iptc.Chain) -> None:
-    """Drop the rest of tcp connections"""
-    logger.debug('Adding drop tcp rule ...')
-    r = iptc.Rule()
-    t = iptc.Target(r, 'DROP')
-    r.target = t
-    r.protocol = 'tcp'
-    ensure_rule(chain, r)
-
-
-def drop_all_udp(chain: iptc.Chain) -> None:
-    """Drop the rest of udp connections """
-    logger.debug('Adding drop udp rule ...')
-    r = iptc.Rule()
-    t = iptc.Target(r, 'DROP')
-    r.target = t
-    r.protocol = 'udp'
-    ensure_rule(chain, r)
+    def __init__(self, table: 'iptc.Table', name: str) -> None:
+        self.name = name
+        self.chain = iptc.Chain(table, name)
+        self.rules: List['iptc.Rule'] = self.chain.rules
+        self.inserted: List['iptc.Rule'] = []
+        self.appended: List['iptc.Rule'] = []
+        self.deleted: List['iptc.Rule'] = []
+
+    def insert_rule(self, rule: 'iptc.Rule') -> None:
+        self.rules.insert(0, rule)
+        self.inserted.append(rule)
+
+    def append_rule(self, rule: 'iptc.Rule') -> None:
+        self.rules.append(rule)
+        self.appended.append(rule)
+
+    def delete_rule(self, rule: 'iptc.Rule') -> None:
+        self.rules.remove(rule)
+        self.deleted.append(rule)
+
+    def apply(self) -> None:
+        logger.info(
+            'Applying changes to %s chain: %d added, %d removed',
+            self.name, len(self.inserted) + len(self.appended), len(self.deleted)
+        )
+        for rule in self.deleted:
+            self.chain.delete_rule(rule)
+        for rule in self.inserted:
+            self.chain.insert_rule(rule)
+        for rule in self.appended:
+            self.chain.append_rule(rule)
 
 
 def get_ssh_port(ssh_service_name='ssh'):
@@ -145,68 +127,157 @@ def get_ssh_port(ssh_service_name='ssh'):
         return DEFAULT_SSH_PORT
 
 
-def allow_ssh(chain: iptc.Chain) -> None:
-    ssh_port = get_ssh_port()
-    accept_incoming(chain, str(ssh_port), 'tcp')
+def get_firewall_plan(ssh_port: Optional[int] = None) -> List[FirewallRule]:
+    """
+    Desired INPUT chain rules in order they are applied,
+    accepted ports are inserted to the top of the chain
+    """
+    ssh_port = ssh_port or get_ssh_port()
+    return [
+        FirewallRule('ACCEPT', in_interface='lo'),
+        *(FirewallRule('ACCEPT', protocol='icmp', icmp_type=t) for t in ALLOWED_ICMP_TYPES),
+        FirewallRule('ACCEPT', ctstate='RELATED,ESTABLISHED'),
+        FirewallRule('ACCEPT', protocol='tcp', dport=str(ssh_port), insert=True),
+        *(
+            FirewallRule('ACCEPT', protocol='tcp', dport=port, insert=True)
+            for port in ALLOWED_INCOMING_TCP_PORTS
+        ),
+        *(
+            FirewallRule('ACCEPT', protocol='udp', dport=port, insert=True)
+            for port in ALLOWED_INCOMING_UDP_PORTS
+        ),
+        FirewallRule('DROP', protocol='tcp'),
+        FirewallRule('DROP', protocol='udp')
+    ]
+
+
+def get_plan_fingerprint(plan: List[FirewallRule]) -> str:
+    data = json.dumps({
+        'version': FIREWALL_PLAN_VERSION,
+        'policies': BASE_POLICIES,
+        'rules': [rule._asdict() for rule in plan]
+    }, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def get_applied_plan() -> Optional[Dict]:
+    if not os.path.isfile(FIREWALL_PLAN_FILEPATH):
+        return None
+    return read_json(FIREWALL_PLAN_FILEPATH)
+
+
+def save_applied_plan(plan: List[FirewallRule]) -> None:
+    save_json(FIREWALL_PLAN_FILEPATH, {
+        'fingerprint': get_plan_fingerprint(plan),
+        'rules': [rule._asdict() for rule in plan]
+    })
+
+
+def is_plan_applied(plan: List[FirewallRule]) -> bool:
+    applied = get_applied_plan()
+    return applied is not None and applied['fingerprint'] == get_plan_fingerprint(plan)
+
+
+def to_iptc_rule(fw_rule: FirewallRule) -> 'iptc.Rule':
+    rule = iptc.Rule()
+    if fw_rule.protocol:
+        rule.protocol = fw_rule.protocol
+    if fw_rule.in_interface:
+        rule.in_interface = fw_rule.in_interface
+    if fw_rule.dport:
+        match = iptc.Match(rule, fw_rule.protocol)
+        match.dport = fw_rule.dport
+        rule.add_match(match)
+    if fw_rule.icmp_type:
+        match = iptc.Match(rule, 'icmp')
+        match.icmp_type = fw_rule.icmp_type
+        rule.add_match(match)
+    if fw_rule.ctstate:
+        match = iptc.Match(rule, 'conntrack')
+        match.ctstate = fw_rule.ctstate
+        rule.add_match(match)
+    rule.target = iptc.Target(rule, fw_rule.target)
+    return rule
+
+
+def get_firewall_diff(
+    chain_rules: List['iptc.Rule'],
+    plan: List[FirewallRule],
+    applied_rules: List[FirewallRule]
+) -> FirewallDiff:
+    """
+    Rules from plan missing in chain should be added, rules from the previously
+    applied plan that are not in the new plan should be removed.
+    Rules added by other tools are left untouched.
+    """
+    add = [rule for rule in plan if to_iptc_rule(rule) not in chain_rules]
+    remove = [
+        rule for rule in applied_rules
+        if rule not in plan and to_iptc_rule(rule) in chain_rules
+    ]
+    return FirewallDiff(add=add, remove=remove)
 
 
-def allow_base_ports(chain: iptc.Chain) -> None:
-    logger.info('Configuring ssh port')
-    allow_ssh(chain)
-    logger.info('Configuring incoming tcp ports')
-    for port in ALLOWED_INCOMING_TCP_PORTS:
-        accept_incoming(chain, port, 'tcp')
-    logger.info('Configuring incoming udp ports')
-    for port in ALLOWED_INCOMING_UDP_PORTS:
-        accept_incoming(chain, port, 'udp')
+def configure_iptables(force: bool = False, dry_run: bool = False) -> Optional[FirewallDiff]:
+    """
+    This is the main function used for the setup of the firewall rules on the SKALE Node
+    host machine. The plan is always compared with the live INPUT chain, if nothing
+    differs commit and iptables-save are skipped unless force is set.
+    With dry_run the diff is returned without applying it.
+    """
+    if not iptc:
+        raise ImportError('Unable to import iptc package')
+    plan = get_firewall_plan()
+    applied = get_applied_plan()
+    applied_rules = [FirewallRule(**rule) for rule in applied['rules']] if applied else []
+    tb = iptc.Table(iptc.Table.FILTER)
+    tb.autocommit = False
+    try:
+        tb.refresh()
+        input_chain = ChainReconciler(tb, 'INPUT')
+        diff = get_firewall_diff(input_chain.rules, plan, applied_rules)
+        if dry_run:
+            return diff
+        if not force and not diff.add and not diff.remove and is_base_policies_set(tb):
+            logger.info('Firewall rules are up to date, skipping iptables configuration')
+            if not is_plan_applied(plan):
+                save_applied_plan(plan)
+            return None
+        logger.info('Configuring iptables...')
+        Path(IPTABLES_DIR).mkdir(parents=True, exist_ok=True)
+        set_base_policies(tb)
+        for rule in diff.remove:
+            input_chain.delete_rule(to_iptc_rule(rule))
+        for rule in diff.add:
+            if rule.insert:
+                input_chain.insert_rule(to_iptc_rule(rule))
+            else:
+                input_chain.append_rule(to_iptc_rule(rule))
+        input_chain.apply()
+        tb.commit()
+    finally:
+        tb.autocommit = True
+    save_iptables_rules_state()
+    save_applied_plan(plan)
+    return diff
 
 
-def accept_incoming(chain: iptc.Chain, port: str, protocol: str) -> None:
-    logger.debug('Going to allow %s traffic from %s port', protocol, port)
-    rule = iptc.Rule()
-    rule.protocol = protocol
-    match = iptc.Match(rule, protocol)
-    match.dport = port
-    t = iptc.Target(rule, 'ACCEPT')
-    rule.target = t
-    rule.add_match(match)
-    ensure_rule(chain, rule, insert=True)
+def save_iptables_rules_state():
+    res = run_cmd(['iptables-save'])
+    plain_rules = res.stdout.decode('utf-8').rstrip()
+    with open(IPTABLES_RULES_STATE_FILEPATH, 'w') as state_file:
+        state_file.write(plain_rules)
 
 
-def accept_icmp(chain: iptc.Chain) -> None:
-    add_icmp_rule(chain, 'destination-unreachable')
-    add_icmp_rule(chain, 'source-quench')
-    add_icmp_rule(chain, 'time-exceeded')
+def is_base_policies_set(table: 'iptc.Table') -> bool:
+    return all(
+        iptc.Chain(table, chain_name).get_policy().name == policy
+        for chain_name, policy in BASE_POLICIES.items()
+    )
 
 
-def add_icmp_rule(chain: iptc.Chain, icmp_type: str) -> None:
-    rule = iptc.Rule()
-    rule.protocol = 'icmp'
-    match = iptc.Match(rule, 'icmp')
-    match.icmp_type = icmp_type
-    t = iptc.Target(rule, 'ACCEPT')
-    rule.target = t
-    rule.add_match(match)
-    ensure_rule(chain, rule)
-
-
-def ensure_rule(chain: iptc.Chain, rule: iptc.Rule, insert=False) -> None:
-    if rule not in chain.rules:
-        logger.debug(f'Adding rule: {rule_to_dict(rule)}, chain: {chain.name}')
-        if insert:
-            chain.insert_rule(rule)
-        else:
-            chain.append_rule(rule)
-    else:
-        logger.debug(f'Rule already present: {rule_to_dict(rule)}, chain: {chain.name}')
-
-
-def rule_to_dict(rule):
-    return {
-        'proto': rule.protocol,
-        'src': rule.src,
-        'dst': rule.dst,
-        'in_interface': rule.in_interface,
-        'out': rule.out_interface,
-        'target': rule.target.name,
-    }
+def set_base_policies(table: 'iptc.Table') -> None:
+    """Allow all incoming, allow all outcoming, drop all forwarding"""
+    logger.debug('Setting base policies...')
+    for chain_name, policy in BASE_POLICIES.items():
+        iptc.Chain(table, chain_name).set_policy(policy)
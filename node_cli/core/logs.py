@@ -21,39 +21,73 @@ import os
 import shutil
 import logging
 import datetime
+import tarfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Union
 
-from node_cli.utils.helper import run_cmd, safe_mkdir
+from node_cli.utils.compression import ARCHIVE_EXTENSIONS, compressed_writer
+from node_cli.utils.helper import safe_mkdir
 from node_cli.utils.docker_utils import (
     save_container_logs, get_containers
 )
-from node_cli.configs import REMOVED_CONTAINERS_FOLDER_PATH, SKALE_TMP_DIR
+from node_cli.configs import LOGS_DUMP_WORKERS, REMOVED_CONTAINERS_FOLDER_PATH, SKALE_TMP_DIR
 from node_cli.configs.cli_logger import LOG_DATA_PATH
 
 
 logger = logging.getLogger(__name__)
 
 
-def create_logs_dump(path, filter_container=None):
+def create_logs_dump(
+    path: str,
+    filter_container: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    tail: Union[int, str] = 'all',
+    compression: str = 'gzip',
+    workers: int = LOGS_DUMP_WORKERS
+) -> Optional[str]:
+    """
+    Writes containers logs, cli logs and removed containers logs into one compressed tarball.
+    Containers logs are fetched concurrently and added to the archive as soon as they are ready.
+    """
     dump_folder_path, dump_folder_name = create_dump_dir()
-
     containers_logs_path = os.path.join(dump_folder_path, 'containers')
-    cli_logs_path = os.path.join(dump_folder_path, 'cli')
-    removed_containers_logs_path = os.path.join(dump_folder_path, 'removed_containers')
-    archive_path = os.path.join(path, f'{dump_folder_name}.tar.gz')
-
-    if filter_container:
-        containers = get_containers(filter_container)
-    else:
-        containers = get_containers('skale')
-
-    for container in containers:
-        log_filepath = os.path.join(containers_logs_path, f'{container.name}.log')
-        save_container_logs(container, log_filepath, tail='all')
-
-    shutil.copytree(LOG_DATA_PATH, cli_logs_path)
-    shutil.copytree(REMOVED_CONTAINERS_FOLDER_PATH, removed_containers_logs_path)
-    create_archive(archive_path, dump_folder_path)
-    rm_dump_dir(dump_folder_path)
+    archive_path = os.path.join(
+        path,
+        f'{dump_folder_name}.{ARCHIVE_EXTENSIONS[compression]}'
+    )
+    containers = get_containers(filter_container or 'skale')
+
+    try:
+        with compressed_writer(archive_path, compression) as out, \
+                tarfile.open(fileobj=out, mode='w|') as tar:
+            tar.add(containers_logs_path, arcname='containers', recursive=False)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        save_container_logs,
+                        container,
+                        os.path.join(containers_logs_path, f'{container.name}.log'),
+                        tail=tail,
+                        since=since,
+                        until=until
+                    ): container.name
+                    for container in containers
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    log_name = f'{futures[future]}.log'
+                    log_filepath = os.path.join(containers_logs_path, log_name)
+                    tar.add(log_filepath, arcname=os.path.join('containers', log_name))
+                    os.remove(log_filepath)
+            tar.add(LOG_DATA_PATH, arcname='cli')
+            tar.add(REMOVED_CONTAINERS_FOLDER_PATH, arcname='removed_containers')
+    except Exception:
+        if os.path.isfile(archive_path):
+            os.remove(archive_path)
+        raise
+    finally:
+        rm_dump_dir(dump_folder_path)
     if not os.path.isfile(archive_path):
         return None
     return archive_path
@@ -72,7 +106,3 @@ def create_dump_dir():
 def rm_dump_dir(dump_folder_path: str) -> None:
     logger.debug(f'Going to remove tmp dir with logs dump: {dump_folder_path}')
     shutil.rmtree(dump_folder_path)
-
-
-def create_archive(archive_path, source_path):
-    run_cmd(['tar', '-czvf', archive_path, '-C', source_path, '.'])
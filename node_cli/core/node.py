@@ -20,14 +20,8 @@
 import datetime
 import logging
 import os
-import tarfile
-import time
-from contextlib import contextmanager
 from enum import Enum
-from pathlib import Path
-from typing import Optional, Tuple
-
-import docker
+from typing import Dict, Optional, Tuple
 
 from node_cli.configs import (
     BACKUP_ARCHIVE_NAME,
@@ -35,16 +29,15 @@ from node_cli.configs import (
     FILESTORAGE_MAPPING,
     INIT_ENV_FILEPATH,
     LOG_PATH,
-    RESTORE_SLEEP_TIMEOUT,
     SCHAINS_MNT_DIR_REGULAR,
     SCHAINS_MNT_DIR_SYNC,
     SKALE_DIR,
-    SKALE_STATE_DIR,
-    TM_INIT_TIMEOUT
+    SKALE_STATE_DIR
 )
 from node_cli.configs.env import get_env_config
 from node_cli.configs.cli_logger import LOG_DATA_PATH as CLI_LOG_DATA_PATH
 
+from node_cli.core.backup import create_incremental_backup, pack_dir
 from node_cli.core.iptables import configure_iptables
 from node_cli.core.host import (
     is_node_inited, save_env_params, get_flask_secret_key
@@ -53,6 +46,7 @@ from node_cli.core.checks import run_checks as run_host_checks
 from node_cli.core.resources import update_resource_allocation
 from node_cli.operations import (
     update_op,
+    prestage_op,
     init_op,
     turn_off_op,
     turn_on_op,
@@ -62,9 +56,22 @@ from node_cli.operations import (
     update_sync_op
 )
 from node_cli.utils.print_formatters import (
-    print_failed_requirements_checks, print_node_cmd_error, print_node_info
+    print_failed_requirements_checks,
+    print_firewall_diff,
+    print_node_cmd_error,
+    print_node_info
+)
+from node_cli.utils.docker_utils import (
+    ContainersNotReadyError,
+    get_compose_services,
+    wait_for_compose_services
+)
+from node_cli.utils.compression import (
+    ARCHIVE_EXTENSIONS,
+    CompressionError,
+    validate_compression_level
 )
-from node_cli.utils.helper import error_exit, get_request, post_request
+from node_cli.utils.helper import error_exit, format_bytes, get_request, post_request
 from node_cli.utils.helper import extract_env_params
 from node_cli.utils.texts import Texts
 from node_cli.utils.exit_codes import CLIExitCodes
@@ -78,8 +85,6 @@ from node_cli.utils.decorators import (
 logger = logging.getLogger(__name__)
 TEXTS = Texts()
 
-SYNC_BASE_CONTAINERS_AMOUNT = 2
-BASE_CONTAINERS_AMOUNT = 5
 BLUEPRINT_NAME = 'node'
 
 
@@ -147,9 +152,7 @@ def init(env_filepath):
             'Init operation failed',
             exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
         )
-    logger.info('Waiting for containers initialization')
-    time.sleep(TM_INIT_TIMEOUT)
-    if not is_base_containers_alive():
+    if not wait_for_containers(env):
         error_exit(
             'Containers are not running',
             exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
@@ -177,7 +180,11 @@ def restore(backup_path, env_filepath, no_snapshot=False, config_only=False):
             'Restore operation failed',
             exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
         )
-    time.sleep(RESTORE_SLEEP_TIMEOUT)
+    if not config_only and not wait_for_containers(env):
+        error_exit(
+            'Containers are not running',
+            exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
+        )
     logger.info('Generating resource allocation file ...')
     update_resource_allocation(env['ENV_TYPE'])
     print('Node is restored from backup')
@@ -207,9 +214,7 @@ def init_sync(
             'Init operation failed',
             exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
         )
-    logger.info('Waiting for containers initialization')
-    time.sleep(TM_INIT_TIMEOUT)
-    if not is_base_containers_alive(sync_node=True):
+    if not wait_for_containers(env, sync_node=True):
         error_exit(
             'Containers are not running',
             exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR
@@ -224,11 +229,7 @@ def update_sync(env_filepath: str, unsafe_ok: bool = False) -> None:
     configure_firewall_rules()
     env = get_node_env(env_filepath, sync_node=True)
     update_ok = update_sync_op(env_filepath, env)
-    if update_ok:
-        logger.info('Waiting for containers initialization')
-        time.sleep(TM_INIT_TIMEOUT)
-    alive = is_base_containers_alive(sync_node=True)
-    if not update_ok or not alive:
+    if not update_ok or not wait_for_containers(env, sync_node=True):
         print_node_cmd_error()
         return
     else:
@@ -241,17 +242,26 @@ def repair_sync(
     archive: bool,
     catchup: bool,
     historic_state: bool,
-    snapshot_from: str
+    snapshot_from: str,
+    wait_reclaim: bool = False
 ) -> None:
 
     env_params = extract_env_params(INIT_ENV_FILEPATH, sync_node=True)
     schain_name = env_params['SCHAIN_NAME']
-    repair_sync_op(
+    cleanup_result = repair_sync_op(
         schain_name=schain_name,
         archive=archive,
         catchup=catchup,
         historic_state=historic_state,
-        snapshot_from=snapshot_from
+        snapshot_from=snapshot_from,
+        wait_reclaim=wait_reclaim
+    )
+    reclaimed = ''
+    if cleanup_result.reclaimed is not None:
+        reclaimed = f', {format_bytes(cleanup_result.reclaimed)} reclaimed'
+    print(
+        f'Removed {cleanup_result.subvolumes} subvolumes and {cleanup_result.paths} paths '
+        f'in {cleanup_result.duration:.1f}s{reclaimed}'
     )
     logger.info('Schain was started from scratch')
 
@@ -261,7 +271,8 @@ def get_node_env(
     inited_node=False,
     sync_schains=None,
     pull_config_for_schain=None,
-    sync_node=False
+    sync_node=False,
+    save_env=True
 ):
     if env_filepath is not None:
         env_params = extract_env_params(
@@ -269,7 +280,8 @@ def get_node_env(
             sync_node=sync_node,
             raise_for_status=True
         )
-        save_env_params(env_filepath)
+        if save_env:
+            save_env_params(env_filepath)
     else:
         env_params = extract_env_params(INIT_ENV_FILEPATH, sync_node=sync_node)
 
@@ -293,7 +305,15 @@ def get_node_env(
 
 @check_inited
 @check_user
-def update(env_filepath: str, pull_config_for_schain: str, unsafe_ok: bool = False) -> None:
+def update(
+    env_filepath: str,
+    pull_config_for_schain: str,
+    unsafe_ok: bool = False,
+    prestage: bool = False
+) -> None:
+    if prestage:
+        prestage_update(env_filepath)
+        return
     if not unsafe_ok and not is_update_safe():
         error_msg = 'Cannot update safely'
         error_exit(error_msg, exit_code=CLIExitCodes.UNSAFE_UPDATE)
@@ -307,17 +327,23 @@ def update(env_filepath: str, pull_config_for_schain: str, unsafe_ok: bool = Fal
         pull_config_for_schain=pull_config_for_schain
     )
     update_ok = update_op(env_filepath, env)
-    if update_ok:
-        logger.info('Waiting for containers initialization')
-        time.sleep(TM_INIT_TIMEOUT)
-    alive = is_base_containers_alive()
-    if not update_ok or not alive:
+    if not update_ok or not wait_for_containers(env):
         print_node_cmd_error()
         return
     else:
         logger.info('Node update finished')
 
 
+def prestage_update(env_filepath: str) -> None:
+    logger.info('Node update pre-staging started')
+    # The running node keeps its .env, it is replaced by the update itself
+    env = get_node_env(env_filepath, inited_node=True, sync_schains=False, save_env=False)
+    if not prestage_op(env):
+        print_node_cmd_error()
+        return
+    logger.info('Node update pre-staged, running containers were not changed')
+
+
 def get_node_signature(validator_id):
     params = {'validator_id': validator_id}
     status, payload = get_request(
@@ -331,65 +357,94 @@ def get_node_signature(validator_id):
         return payload
 
 
-def backup(path):
-    backup_filepath = get_backup_filepath(path)
-    create_backup_archive(backup_filepath)
+def backup(
+    path: str,
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None,
+    incremental: bool = False
+) -> None:
+    if incremental and (compression != 'gzip' or threads is not None):
+        error_exit(
+            '--compression and --threads are not supported for incremental backup',
+            exit_code=CLIExitCodes.BAD_USER_ERROR
+        )
+    try:
+        validate_compression_level(compression, level)
+    except CompressionError as err:
+        error_exit(err, exit_code=CLIExitCodes.BAD_USER_ERROR)
+    if incremental:
+        create_incremental_node_backup(path, level=level)
+        return
+    backup_filepath = get_backup_filepath(path, compression)
+    try:
+        create_backup_archive(backup_filepath, compression, level=level, threads=threads)
+    except CompressionError as err:
+        error_exit(err, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+
+
+def get_backup_excludes(backup_dir: str) -> Tuple[str, ...]:
+    excludes = (CLI_LOG_DATA_PATH, LOG_PATH)
+    backup_dir = os.path.abspath(backup_dir)
+    if os.path.commonpath([backup_dir, SKALE_DIR]) == SKALE_DIR:
+        excludes += (backup_dir,)
+    return excludes
 
 
-def get_backup_filename():
+def create_incremental_node_backup(backup_dir: str, level: Optional[int] = None) -> None:
+    print('Creating incremental backup...')
+    os.makedirs(backup_dir, exist_ok=True)
+    result = create_incremental_backup(
+        SKALE_DIR,
+        backup_dir,
+        exclude=get_backup_excludes(backup_dir),
+        level=level
+    )
+    print(f'Backup manifest succesfully created {result.manifest_path}')
+    print(
+        f'Backed up {result.entries} entries ({format_bytes(result.size)}), '
+        f'{result.reused_files} files unchanged, {result.new_chunks} new chunks, '
+        f'{format_bytes(result.written)} written, {result.removed_chunks} unused chunks '
+        f'removed in {result.duration:.1f}s'
+    )
+
+
+def get_backup_filename(compression: str = 'gzip') -> str:
     time = datetime.datetime.utcnow().strftime("%Y-%m-%d-%H-%M-%S")
-    return f'{BACKUP_ARCHIVE_NAME}-{time}.tar.gz'
+    return f'{BACKUP_ARCHIVE_NAME}-{time}.{ARCHIVE_EXTENSIONS[compression]}'
 
 
-def get_backup_filepath(base_path):
-    return os.path.abspath(os.path.join(base_path, get_backup_filename()))
+def get_backup_filepath(base_path: str, compression: str = 'gzip') -> str:
+    return os.path.abspath(os.path.join(base_path, get_backup_filename(compression)))
 
 
-@contextmanager
-def chdir(dest):
-    old = os.getcwd()
-    try:
-        os.chdir(dest)
-        yield
-    finally:
-        os.chdir(old)
-
-
-def pack_dir(source: str, dest: str, exclude: Tuple[str] = ()):
-    logger.info('Packing dir %s to %s excluding %s', source, dest, exclude)
-
-    source, dest = Path(source), Path(dest)
-    exclude = [Path(e).relative_to(source.parent) for e in exclude]
-
-    def logfilter(tarinfo):
-        path = Path(tarinfo.name)
-        for e in exclude:
-            logger.debug('Cheking if %s is parent of %s', e, tarinfo.name)
-            try:
-                path.relative_to(e)
-            except ValueError:
-                pass
-            else:
-                logger.debug('Excluding %s', tarinfo.name)
-                return None
-        return tarinfo
-
-    with chdir(source.parent):
-        with tarfile.open(dest, 'w:gz') as tar:
-            tar.add(source.name, filter=logfilter)
-    logger.info('Packing finished %s', source)
-
-
-def create_backup_archive(backup_filepath):
+def create_backup_archive(
+    backup_filepath: str,
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None
+) -> None:
     print('Creating backup archive...')
-    cli_log_path = CLI_LOG_DATA_PATH
-    container_log_path = LOG_PATH
-    pack_dir(
-        SKALE_DIR,
-        backup_filepath,
-        exclude=(cli_log_path, container_log_path)
-    )
+    try:
+        result = pack_dir(
+            SKALE_DIR,
+            backup_filepath,
+            exclude=get_backup_excludes(os.path.dirname(backup_filepath)),
+            compression=compression,
+            level=level,
+            threads=threads
+        )
+    except BaseException:
+        logger.info('Removing incomplete backup archive %s', backup_filepath)
+        if os.path.exists(backup_filepath):
+            os.remove(backup_filepath)
+        raise
     print(f'Backup archive succesfully created {backup_filepath}')
+    print(
+        f'Packed {format_bytes(result.size)} in {result.duration:.1f}s '
+        f'({format_bytes(result.size / max(result.duration, 1e-6))}/s), '
+        f'archive size {format_bytes(result.archive_size)}'
+    )
 
 
 def set_maintenance_mode_on():
@@ -440,9 +495,7 @@ def turn_off(maintenance_on: bool = False, unsafe_ok: bool = False) -> None:
 def turn_on(maintenance_off, sync_schains, env_file):
     env = get_node_env(env_file, inited_node=True, sync_schains=sync_schains)
     turn_on_op(env)
-    logger.info('Waiting for containers initialization')
-    time.sleep(TM_INIT_TIMEOUT)
-    if not is_base_containers_alive():
+    if not wait_for_containers(env):
         print_node_cmd_error()
         return
     logger.info('Node turned on')
@@ -450,14 +503,16 @@ def turn_on(maintenance_off, sync_schains, env_file):
         set_maintenance_mode_off()
 
 
-def is_base_containers_alive(sync_node: bool = False):
-    dclient = docker.from_env()
-    containers = dclient.containers.list()
-    skale_containers = list(filter(
-        lambda c: c.name.startswith('skale_'), containers
-    ))
-    containers_amount = SYNC_BASE_CONTAINERS_AMOUNT if sync_node else BASE_CONTAINERS_AMOUNT
-    return len(skale_containers) >= containers_amount
+def wait_for_containers(env: Dict, sync_node: bool = False) -> bool:
+    logger.info('Waiting for containers initialization')
+    services = get_compose_services(env, sync_node=sync_node)
+    try:
+        ready = wait_for_compose_services(services)
+    except ContainersNotReadyError as err:
+        logger.error('Containers are not ready: %s', err)
+        return False
+    logger.info('All containers are ready in %.1fs', max(ready.values(), default=0))
+    return True
 
 
 def get_node_info_plain():
@@ -510,7 +565,8 @@ def set_domain_name(domain_name):
 def run_checks(
     network: str = 'mainnet',
     container_config_path: str = CONTAINER_CONFIG_PATH,
-    disk: Optional[str] = None
+    disk: Optional[str] = None,
+    fresh: bool = False
 ) -> None:
     if not is_node_inited():
         print(TEXTS['node']['not_inited'])
@@ -522,7 +578,8 @@ def run_checks(
     failed_checks = run_host_checks(
         disk,
         network,
-        container_config_path
+        container_config_path,
+        fresh=fresh
     )
     if not failed_checks:
         print('Requirements checking succesfully finished!')
@@ -531,7 +588,13 @@ def run_checks(
         print_failed_requirements_checks(failed_checks)
 
 
-def configure_firewall_rules() -> None:
+def configure_firewall_rules(force: bool = False, dry_run: bool = False) -> None:
+    if dry_run:
+        print_firewall_diff(configure_iptables(dry_run=True))
+        return
     print('Configuring firewall ...')
-    configure_iptables()
-    print('Done')
+    diff = configure_iptables(force=force)
+    if diff is None:
+        print('Firewall rules are up to date')
+    else:
+        print(f'Done, {len(diff.add)} rules added, {len(diff.remove)} rules removed')
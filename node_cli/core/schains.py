@@ -1,21 +1,38 @@
-import glob
 import logging
 import os
 import pprint
 import shutil
+import subprocess
+import sys
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional
 
 from node_cli.configs import (
     ALLOCATION_FILEPATH,
+    CLEANUP_WORKERS,
     NODE_CONFIG_PATH,
     NODE_CLI_STATUS_FILENAME,
     SCHAIN_NODE_DATA_PATH,
-    SCHAINS_MNT_DIR_SYNC
+    SCHAINS_MNT_DIR_SYNC,
+    SNAPSHOT_RESTORE_WORKERS
 )
 from node_cli.configs.env import get_env_config
+from node_cli.core.snapshots import (
+    EXPORTS_DIRNAME,
+    SNAPSHOT_CHUNK_SIZE,
+    SNAPSHOTS_DIRNAME,
+    SnapshotExportError,
+    SnapshotIntegrityError,
+    export_snapshot,
+    is_snapshot_manifest,
+    open_snapshot_stream,
+    read_snapshot_manifest
+)
 
 from node_cli.utils.helper import (
     get_request,
@@ -29,14 +46,28 @@ from node_cli.utils.print_formatters import (
     print_schain_info,
     print_schains
 )
+from node_cli.utils.compression import (
+    READ_CHUNK_SIZE,
+    CompressionError,
+    decompressed_reader,
+    detect_compression
+)
 from node_cli.utils.docker_utils import ensure_volume, is_volume_exists
-from node_cli.utils.helper import read_json, run_cmd, save_json
+from node_cli.utils.helper import format_bytes, read_json, run_cmd, run_in_pool, save_json
+from node_cli.utils.metrics import METRICS
 from lvmpy.src.core import mount, volume_mountpoint
 
 
 logger = logging.getLogger(__name__)
 
 BLUEPRINT_NAME = 'schains'
+STDIN_PATH = '-'
+SUBVOLUMES_DELETE_BATCH = 32
+
+CleanupResult = namedtuple(
+    'CleanupResult',
+    ['subvolumes', 'paths', 'free_before', 'reclaimed', 'duration']
+)
 
 
 def get_schain_firewall_rules(schain: str) -> None:
@@ -146,12 +177,43 @@ def btrfs_set_readonly_false(subvolume_path: str) -> None:
     run_cmd(['btrfs', 'property', 'set', '-ts', subvolume_path, 'ro', 'false'])
 
 
+def btrfs_receive_stream(src_path: str, stream: BinaryIO) -> None:
+    """ Pipes btrfs send stream into btrfs receive """
+    cmd = ['btrfs', 'receive', src_path]
+    logger.debug('Running: %s', cmd)
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        shutil.copyfileobj(stream, proc.stdin, READ_CHUNK_SIZE)
+        proc.stdin.close()
+    except BrokenPipeError:
+        logger.error('btrfs receive closed the stream')
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
 def btrfs_receive_binary(src_path: str, binary_path: str) -> None:
-    run_cmd(['btrfs', 'receive', '-f', binary_path, src_path])
+    """
+    Receives snapshot from plain or compressed (gzip, zstd) file, from chunks
+    listed in export manifest or from stdin if binary_path is STDIN_PATH.
+    """
+    if binary_path == STDIN_PATH:
+        btrfs_receive_stream(src_path, sys.stdin.buffer)
+    elif is_snapshot_manifest(binary_path):
+        with open_snapshot_stream(binary_path) as stream:
+            btrfs_receive_stream(src_path, stream)
+    elif detect_compression(binary_path) is None:
+        run_cmd(['btrfs', 'receive', '-f', binary_path, src_path], capture=False)
+    else:
+        with decompressed_reader(binary_path) as stream:
+            btrfs_receive_stream(src_path, stream)
 
 
 def get_block_number_from_path(snapshot_path: str) -> int:
-    stem = Path(snapshot_path).stem
+    stem = Path(snapshot_path).name.split('.')[0]
     bn = -1
     try:
         bn = int(stem.split('-')[-1])
@@ -169,12 +231,20 @@ def get_node_id() -> int:
     return info['node_id']
 
 
-def migrate_prices_and_blocks(path: str, node_id: int) -> None:
+def migrate_prices_and_blocks(
+    path: str,
+    node_id: int,
+    workers: int = SNAPSHOT_RESTORE_WORKERS
+) -> None:
     db_suffix = '.db'
-    for sname in os.listdir(path):
-        subvolume_path = os.path.join(path, sname)
-        logger.debug('Processing %s', sname)
-        btrfs_set_readonly_false(subvolume_path)
+    snames = os.listdir(path)
+    logger.debug('Making %d subvolumes writable', len(snames))
+    run_in_pool(
+        btrfs_set_readonly_false,
+        [(os.path.join(path, sname),) for sname in snames],
+        workers
+    )
+    for sname in snames:
         if sname.endswith(db_suffix):
             subvolume_path = os.path.join(path, sname)
             dbname = sname.split('_')[0]
@@ -187,49 +257,145 @@ def make_btrfs_snapshot(src: str, dst: str) -> None:
     run_cmd(['btrfs', 'subvolume', 'snapshot', src, dst])
 
 
-def rm_btrfs_subvolume(subvolume: str) -> None:
-    run_cmd(['btrfs', 'subvolume', 'delete', subvolume])
+def rm_btrfs_subvolumes(subvolumes: List[str], commit: bool = False) -> None:
+    """ Deletes subvolumes in one call, commit waits for transaction commit at the end """
+    cmd = ['btrfs', 'subvolume', 'delete']
+    if commit:
+        cmd.append('--commit-after')
+    run_cmd([*cmd, *subvolumes])
+
+
+def btrfs_subvolume_sync(path: str) -> None:
+    """ Waits until btrfs cleans up deleted subvolumes of the filesystem and frees their space """
+    run_cmd(['btrfs', 'subvolume', 'sync', path])
 
 
-def fillin_snapshot_folder(src_path: str, block_number: int) -> None:
-    snapshots_dirname = 'snapshots'
+def fillin_snapshot_folder(
+    src_path: str,
+    block_number: int,
+    workers: int = SNAPSHOT_RESTORE_WORKERS
+) -> None:
     snapshot_folder_path = os.path.join(
-        src_path, snapshots_dirname, str(block_number))
+        src_path, SNAPSHOTS_DIRNAME, str(block_number))
     os.makedirs(snapshot_folder_path, exist_ok=True)
-    for subvolume in os.listdir(src_path):
-        if subvolume != snapshots_dirname:
-            logger.debug('Copying %s to %s', subvolume, snapshot_folder_path)
-            subvolume_path = os.path.join(src_path, subvolume)
-            subvolume_snapshot_path = os.path.join(
-                snapshot_folder_path, subvolume)
-            make_btrfs_snapshot(subvolume_path, subvolume_snapshot_path)
+    logger.debug('Copying subvolumes to %s', snapshot_folder_path)
+    run_in_pool(
+        make_btrfs_snapshot,
+        [
+            (os.path.join(src_path, subvolume), os.path.join(snapshot_folder_path, subvolume))
+            for subvolume in os.listdir(src_path)
+            if subvolume not in (SNAPSHOTS_DIRNAME, EXPORTS_DIRNAME)
+        ],
+        workers
+    )
+
+
+@contextmanager
+def restore_phase(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    logger.info('Snapshot restore phase: %s', phase)
+    start = time.monotonic()
+    with METRICS.timed(f'schain_restore.{phase}'):
+        yield
+    timings[phase] = time.monotonic() - start
 
 
 def restore_schain_from_snapshot(
     schain: str,
     snapshot_path: str,
     env_type: Optional[str] = None,
-    schain_type: str = 'medium'
-) -> None:
+    schain_type: str = 'medium',
+    block_number: Optional[int] = None
+) -> Optional[Dict[str, float]]:
+    """
+    Restores schain volume from btrfs send stream (plain or compressed file,
+    export manifest or stdin if snapshot_path is STDIN_PATH).
+    Returns duration of every phase.
+    """
     if env_type is None:
         env_config = get_env_config()
         env_type = env_config['ENV_TYPE']
-    ensure_schain_volume(schain, schain_type, env_type)
-    block_number = get_block_number_from_path(snapshot_path)
+    parent_block_number = None
+    if is_snapshot_manifest(snapshot_path):
+        try:
+            manifest = read_snapshot_manifest(snapshot_path)
+        except SnapshotIntegrityError as err:
+            error_exit(err, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+        parent_block_number = manifest['parent_block_number']
+        if block_number is None:
+            block_number = manifest['block_number']
+    if block_number is None:
+        block_number = get_block_number_from_path(snapshot_path)
     if block_number == -1:
         logger.error('Invalid snapshot path format')
-        return
+        return None
+    missing_parent_msg = (
+        f'Snapshot is incremental, {schain} volume should contain '
+        f'snapshot for block {parent_block_number}'
+    )
+    if parent_block_number is not None and not is_volume_exists(schain):
+        error_exit(missing_parent_msg, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+    ensure_schain_volume(schain, schain_type, env_type)
     node_id = get_node_id()
 
+    timings: Dict[str, float] = {}
     mount(schain)
     src_path = volume_mountpoint(schain)
-    logger.info('Unpacking binary')
-    btrfs_receive_binary(src_path, snapshot_path)
-    logger.info('Migrating suvolumes')
-    migrate_prices_and_blocks(src_path, node_id)
-    migrate_prices_and_blocks(src_path, node_id)
-    logger.info('Recreating snapshot folder')
-    fillin_snapshot_folder(src_path, block_number)
+    if parent_block_number is not None and not os.path.isdir(
+        os.path.join(src_path, SNAPSHOTS_DIRNAME, str(parent_block_number))
+    ):
+        error_exit(missing_parent_msg, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+    with restore_phase(timings, 'receive'):
+        try:
+            btrfs_receive_binary(src_path, snapshot_path)
+        except (
+            SnapshotIntegrityError,
+            CompressionError,
+            subprocess.CalledProcessError
+        ) as err:
+            error_exit(err, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+    with restore_phase(timings, 'migrate'):
+        migrate_prices_and_blocks(src_path, node_id)
+    with restore_phase(timings, 'snapshots'):
+        fillin_snapshot_folder(src_path, block_number)
+
+    summary = ', '.join(f'{phase} {duration:.1f}s' for phase, duration in timings.items())
+    logger.info('Schain %s restored from %s: %s', schain, snapshot_path, summary)
+    print(f'Schain {schain} restored: {summary}')
+    return timings
+
+
+def export_schain_snapshot(
+    schain: str,
+    output_dir: str,
+    block_number: Optional[int] = None,
+    incremental: bool = False,
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE
+) -> None:
+    mount(schain)
+    print(f'Exporting {schain} snapshot...')
+    try:
+        result = export_snapshot(
+            volume_mountpoint(schain),
+            output_dir,
+            block_number=block_number,
+            incremental=incremental,
+            compression=compression,
+            level=level,
+            threads=threads,
+            chunk_size=chunk_size
+        )
+    except (SnapshotExportError, CompressionError) as err:
+        error_exit(err, exit_code=CLIExitCodes.OPERATION_EXECUTION_ERROR)
+    parent = result.parent_block_number
+    print(f'Snapshot manifest succesfully created {result.manifest_path}')
+    print(
+        f'Block {result.block_number}, '
+        f'{"incremental from " + str(parent) if parent is not None else "full"}, '
+        f'{result.chunks} chunks ({format_bytes(result.size)}) in {result.duration:.1f}s'
+    )
 
 
 def get_schains_by_artifacts() -> str:
@@ -249,25 +415,92 @@ def ensure_schain_volume(schain: str, schain_type: str, env_type: str) -> None:
         logger.warning('Volume %s already exists', schain)
 
 
-def cleanup_sync_datadir(schain_name: str, base_path: str = SCHAINS_MNT_DIR_SYNC) -> None:
+def remove_path(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def get_free_space(path: str) -> int:
+    stat = os.statvfs(path)
+    return stat.f_bavail * stat.f_frsize
+
+
+def cleanup_sync_datadir(
+    schain_name: str,
+    base_path: str = SCHAINS_MNT_DIR_SYNC,
+    commit: bool = True,
+    workers: int = CLEANUP_WORKERS,
+    batch_size: int = SUBVOLUMES_DELETE_BATCH
+) -> CleanupResult:
+    """
+    Removes sync node schain data. Snapshot subvolumes are deleted in batches
+    (many paths per btrfs call) concurrently with removal of regular folders,
+    with commit the last batch waits for the transaction commit once.
+    btrfs frees space of deleted subvolumes in background, so reclaimed is None,
+    use wait_for_reclaimed_space to get it.
+    """
+    start = time.monotonic()
     base_path = os.path.join(base_path, schain_name)
-    regular_folders_pattern = f'{base_path}/[!snapshots]*'
-    logger.info('Removing regular folders')
-    for filepath in glob.glob(regular_folders_pattern):
-        if os.path.isdir(filepath):
-            logger.debug('Removing recursively %s', filepath)
-            shutil.rmtree(filepath)
-        if os.path.isfile(filepath):
-            os.remove(filepath)
-
-    logger.info('Removing subvolumes')
-    subvolumes_pattern = f'{base_path}/snapshots/*/*'
-    for filepath in glob.glob(subvolumes_pattern):
-        logger.debug('Deleting subvolume %s', filepath)
-        if os.path.isdir(filepath):
-            rm_btrfs_subvolume(filepath)
-        else:
-            os.remove(filepath)
+    if not os.path.isdir(base_path):
+        logger.info('%s does not exist, nothing to clean up', base_path)
+        return CleanupResult(0, 0, None, 0, time.monotonic() - start)
+    free_before = get_free_space(os.path.dirname(base_path))
+
+    snapshots_path = os.path.join(base_path, SNAPSHOTS_DIRNAME)
+    paths = [
+        os.path.join(base_path, name)
+        for name in os.listdir(base_path) if name != SNAPSHOTS_DIRNAME
+    ]
+    subvolumes = []
+    if os.path.isdir(snapshots_path):
+        for block_dir in os.listdir(snapshots_path):
+            block_path = os.path.join(snapshots_path, block_dir)
+            for name in os.listdir(block_path):
+                path = os.path.join(block_path, name)
+                if os.path.isdir(path):
+                    subvolumes.append(path)
+                else:
+                    paths.append(path)
+    batches = [subvolumes[i:i + batch_size] for i in range(0, len(subvolumes), batch_size)]
+    last_batch = batches.pop() if commit and batches else None
+
+    logger.info(
+        'Removing %d paths and %d subvolumes in %d batches',
+        len(paths), len(subvolumes), len(batches) + bool(last_batch)
+    )
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(remove_path, path) for path in paths]
+        futures.extend(executor.submit(rm_btrfs_subvolumes, batch) for batch in batches)
+        for future in futures:
+            future.result()
+    if last_batch:
+        rm_btrfs_subvolumes(last_batch, commit=True)
+
     logger.info('Cleaning up snapshots folder')
-    if os.path.isdir(base_path):
-        shutil.rmtree(base_path)
+    shutil.rmtree(base_path)
+    result = CleanupResult(
+        subvolumes=len(subvolumes),
+        paths=len(paths),
+        free_before=free_before,
+        reclaimed=None,
+        duration=time.monotonic() - start
+    )
+    logger.info('Cleaned up %s in %.1fs', base_path, result.duration)
+    return result
+
+
+def wait_for_reclaimed_space(
+    result: CleanupResult,
+    base_path: str = SCHAINS_MNT_DIR_SYNC
+) -> CleanupResult:
+    """ Waits until btrfs frees space of deleted subvolumes and measures reclaimed space """
+    if result.free_before is None:
+        return result
+    if result.subvolumes:
+        logger.info('Waiting for btrfs to free space of deleted subvolumes')
+        btrfs_subvolume_sync(base_path)
+    reclaimed = max(get_free_space(base_path) - result.free_before, 0)
+    logger.info('%s reclaimed', format_bytes(reclaimed))
+    return result._replace(reclaimed=reclaimed)
@@ -0,0 +1,411 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import datetime
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from node_cli.configs import SNAPSHOT_RESTORE_WORKERS
+from node_cli.utils.compression import (
+    COMPRESSED_EXTENSIONS,
+    DEFAULT_GZIP_LEVEL,
+    READ_CHUNK_SIZE,
+    decompressed_stream,
+    get_compress_cmd,
+    validate_compression_level
+)
+from node_cli.utils.helper import read_json, run_cmd, run_in_pool, save_json
+from node_cli.utils.metrics import METRICS
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MANIFEST_VERSION = 1
+SNAPSHOT_MANIFEST_SUFFIX = '.manifest.json'
+SNAPSHOT_CHUNK_SIZE = 256 * 1024 * 1024
+SNAPSHOTS_DIRNAME = 'snapshots'
+EXPORTS_DIRNAME = '.exports'
+
+ExportResult = namedtuple(
+    'ExportResult',
+    ['manifest_path', 'block_number', 'parent_block_number', 'chunks', 'size', 'duration']
+)
+
+
+class SnapshotExportError(Exception):
+    pass
+
+
+class SnapshotIntegrityError(Exception):
+    pass
+
+
+def get_snapshot_basename(block_number: int) -> str:
+    return f'snapshot-{block_number}'
+
+
+def is_snapshot_manifest(path: str) -> bool:
+    return path.endswith(SNAPSHOT_MANIFEST_SUFFIX)
+
+
+def get_block_numbers(path: str) -> List[int]:
+    """ Returns sorted block numbers of snapshot folders in path """
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(name) for name in os.listdir(path) if name.isdigit())
+
+
+def get_subvolumes(path: str) -> List[str]:
+    return sorted(
+        name for name in os.listdir(path)
+        if os.path.isdir(os.path.join(path, name))
+    )
+
+
+def make_readonly_snapshot(src: str, dst: str) -> None:
+    run_cmd(['btrfs', 'subvolume', 'snapshot', '-r', src, dst])
+
+
+def delete_subvolume(path: str) -> None:
+    run_cmd(['btrfs', 'subvolume', 'delete', path])
+
+
+def delete_subvolumes(paths: List[str], workers: int = SNAPSHOT_RESTORE_WORKERS) -> None:
+    run_in_pool(delete_subvolume, [(path,) for path in paths], workers)
+
+
+def ensure_export_snapshot(
+    volume_path: str,
+    block_number: int,
+    workers: int = SNAPSHOT_RESTORE_WORKERS
+) -> str:
+    """ Creates read-only copies of subvolumes of skaled snapshot, they are kept as parents """
+    export_path = os.path.join(volume_path, EXPORTS_DIRNAME, str(block_number))
+    if os.path.isdir(export_path):
+        logger.info('Read-only snapshot for block %d already exists', block_number)
+        return export_path
+    source_path = os.path.join(volume_path, SNAPSHOTS_DIRNAME, str(block_number))
+    tmp_path = f'{export_path}.tmp'
+    if os.path.isdir(tmp_path):
+        delete_subvolumes([os.path.join(tmp_path, s) for s in get_subvolumes(tmp_path)], workers)
+        os.rmdir(tmp_path)
+    os.makedirs(tmp_path)
+    run_in_pool(
+        make_readonly_snapshot,
+        [
+            (os.path.join(source_path, subvolume), os.path.join(tmp_path, subvolume))
+            for subvolume in get_subvolumes(source_path)
+        ],
+        workers
+    )
+    os.rename(tmp_path, export_path)
+    return export_path
+
+
+def remove_stale_exports(
+    volume_path: str,
+    keep: int,
+    workers: int = SNAPSHOT_RESTORE_WORKERS
+) -> None:
+    """
+    Removes read-only exports older than keep block number, newer ones
+    are kept as they can be parents of the following exports
+    """
+    exports_path = os.path.join(volume_path, EXPORTS_DIRNAME)
+    for block_number in get_block_numbers(exports_path):
+        if block_number >= keep:
+            continue
+        path = os.path.join(exports_path, str(block_number))
+        logger.info('Removing stale export %s', path)
+        delete_subvolumes([os.path.join(path, s) for s in get_subvolumes(path)], workers)
+        os.rmdir(path)
+
+
+def get_send_cmd(export_path: str, parent_path: Optional[str] = None) -> List[str]:
+    """
+    btrfs send for all subvolumes of export_path. With parent every parent subvolume
+    is passed as clone source, so btrfs picks matching parent for each subvolume.
+    """
+    cmd = ['btrfs', 'send', '-q']
+    if parent_path:
+        for subvolume in get_subvolumes(parent_path):
+            cmd.extend(['-c', os.path.join(parent_path, subvolume)])
+    cmd.extend(os.path.join(export_path, s) for s in get_subvolumes(export_path))
+    return cmd
+
+
+class ChunkedWriter:
+    """ Splits written data into fixed-size chunk files hashing every chunk """
+
+    def __init__(self, base_path: str, chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> None:
+        self.base_path = base_path
+        self.chunk_size = chunk_size
+        self.chunks: List[Dict] = []
+        self._file: Optional[BinaryIO] = None
+        self._hash = hashlib.sha256()
+        self._written = 0
+
+    def _get_chunk_path(self, index: int) -> str:
+        return f'{self.base_path}.{index:05d}'
+
+    def _open_chunk(self) -> None:
+        self._file = open(self._get_chunk_path(len(self.chunks)), 'wb')
+        self._hash = hashlib.sha256()
+        self._written = 0
+
+    def _close_chunk(self) -> None:
+        self._file.close()
+        self.chunks.append({
+            'name': os.path.basename(self._get_chunk_path(len(self.chunks))),
+            'size': self._written,
+            'sha256': self._hash.hexdigest()
+        })
+        self._file = None
+
+    def write(self, data: bytes) -> int:
+        view = memoryview(data)
+        while view:
+            if self._file is None:
+                self._open_chunk()
+            part = view[:self.chunk_size - self._written]
+            self._file.write(part)
+            self._hash.update(part)
+            self._written += len(part)
+            view = view[len(part):]
+            if self._written == self.chunk_size:
+                self._close_chunk()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._close_chunk()
+
+
+def send_to_chunks(
+    send_cmd: List[str],
+    writer: ChunkedWriter,
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None
+) -> None:
+    """ Pipes btrfs send through multi-threaded compressor into chunked writer """
+    compress_cmd = get_compress_cmd(compression, level=level, threads=threads)
+    validate_compression_level(compression, level)
+    logger.debug('Running: %s', send_cmd)
+    send = subprocess.Popen(send_cmd, stdout=subprocess.PIPE)
+    procs = [send]
+    try:
+        if compress_cmd is None:
+            logger.debug('pigz is not found, compressing snapshot in-process')
+            with gzip.GzipFile(
+                fileobj=writer,
+                mode='wb',
+                compresslevel=level or DEFAULT_GZIP_LEVEL
+            ) as out:
+                shutil.copyfileobj(send.stdout, out, READ_CHUNK_SIZE)
+        else:
+            compressor = subprocess.Popen(
+                compress_cmd,
+                stdin=send.stdout,
+                stdout=subprocess.PIPE
+            )
+            procs.append(compressor)
+            send.stdout.close()
+            shutil.copyfileobj(compressor.stdout, writer, READ_CHUNK_SIZE)
+        writer.close()
+    except BaseException:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+        raise
+    for proc in procs:
+        if proc.wait() != 0:
+            raise SnapshotExportError(f'{proc.args[0]} exited with code {proc.returncode}')
+
+
+def export_snapshot(
+    volume_path: str,
+    output_dir: str,
+    block_number: Optional[int] = None,
+    incremental: bool = False,
+    compression: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE
+) -> ExportResult:
+    """
+    Exports skaled snapshot (the latest one by default) of the schain volume
+    as compressed btrfs send stream split into chunks and a manifest.
+    With incremental stream is sent relative to the previous export kept on the volume,
+    it can be received only where that previous export was restored.
+    """
+    start = time.monotonic()
+    snapshots_path = os.path.join(volume_path, SNAPSHOTS_DIRNAME)
+    block_numbers = get_block_numbers(snapshots_path)
+    if block_number is None:
+        if not block_numbers:
+            raise SnapshotExportError(f'No snapshots found in {snapshots_path}')
+        block_number = block_numbers[-1]
+    elif block_number not in block_numbers:
+        raise SnapshotExportError(f'Snapshot for block {block_number} is not found')
+
+    parents = [
+        bn for bn in get_block_numbers(os.path.join(volume_path, EXPORTS_DIRNAME))
+        if bn < block_number
+    ]
+    parent_block_number = parents[-1] if incremental and parents else None
+
+    with METRICS.timed('schain_export.snapshot'):
+        export_path = ensure_export_snapshot(volume_path, block_number)
+    parent_path = None
+    if parent_block_number is not None:
+        parent_path = os.path.join(volume_path, EXPORTS_DIRNAME, str(parent_block_number))
+        logger.info('Exporting block %d incrementally from %d', block_number, parent_block_number)
+
+    os.makedirs(output_dir, exist_ok=True)
+    basename = get_snapshot_basename(block_number)
+    writer = ChunkedWriter(
+        os.path.join(output_dir, f'{basename}.bin.{COMPRESSED_EXTENSIONS[compression]}'),
+        chunk_size=chunk_size
+    )
+    with METRICS.timed('schain_export.send'):
+        send_to_chunks(
+            get_send_cmd(export_path, parent_path),
+            writer,
+            compression=compression,
+            level=level,
+            threads=threads
+        )
+
+    manifest_path = os.path.join(output_dir, f'{basename}{SNAPSHOT_MANIFEST_SUFFIX}')
+    save_json(manifest_path, {
+        'version': SNAPSHOT_MANIFEST_VERSION,
+        'created': datetime.datetime.utcnow().isoformat(),
+        'block_number': block_number,
+        'parent_block_number': parent_block_number,
+        'subvolumes': get_subvolumes(export_path),
+        'compression': compression,
+        'chunk_size': chunk_size,
+        'chunks': writer.chunks
+    })
+    remove_stale_exports(volume_path, keep=block_number)
+    return ExportResult(
+        manifest_path=manifest_path,
+        block_number=block_number,
+        parent_block_number=parent_block_number,
+        chunks=len(writer.chunks),
+        size=sum(chunk['size'] for chunk in writer.chunks),
+        duration=time.monotonic() - start
+    )
+
+
+def verify_chunk(path: str, chunk: Dict) -> None:
+    h = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            h.update(data)
+            size += len(data)
+    if size != chunk['size'] or h.hexdigest() != chunk['sha256']:
+        raise SnapshotIntegrityError(f'Snapshot chunk {chunk["name"]} is corrupted')
+
+
+def verify_chunks(
+    chunks_dir: str,
+    chunks: List[Dict],
+    workers: int = SNAPSHOT_RESTORE_WORKERS
+) -> None:
+    """ Checks that every chunk listed in manifest exists and matches its size and sha256 """
+    for chunk in chunks:
+        if not os.path.isfile(os.path.join(chunks_dir, chunk['name'])):
+            raise SnapshotIntegrityError(f'Snapshot chunk {chunk["name"]} is missing')
+    run_in_pool(
+        verify_chunk,
+        [(os.path.join(chunks_dir, chunk['name']), chunk) for chunk in chunks],
+        workers
+    )
+
+
+class ChunksReader:
+    """ Reads chunks listed in manifest one by one as a single stream """
+
+    def __init__(self, chunks_dir: str, chunks: List[Dict]) -> None:
+        self.chunks_dir = chunks_dir
+        self.chunks = list(chunks)
+        self._file: Optional[BinaryIO] = None
+
+    def _next_chunk(self) -> bool:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not self.chunks:
+            return False
+        chunk = self.chunks.pop(0)
+        self._file = open(os.path.join(self.chunks_dir, chunk['name']), 'rb')
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            if self._file is not None:
+                data = self._file.read(size)
+                if data:
+                    return data
+            if not self._next_chunk():
+                return b''
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def read_snapshot_manifest(manifest_path: str) -> Dict:
+    manifest = read_json(manifest_path)
+    if manifest.get('version') != SNAPSHOT_MANIFEST_VERSION:
+        raise SnapshotIntegrityError(f'Unsupported snapshot manifest {manifest_path}')
+    return manifest
+
+
+@contextmanager
+def open_snapshot_stream(manifest_path: str) -> Iterator[BinaryIO]:
+    """
+    Yields decompressed btrfs send stream assembled from chunks.
+    All chunks are verified before the stream is opened, so nothing is received
+    from a corrupted or incomplete export.
+    """
+    manifest = read_snapshot_manifest(manifest_path)
+    chunks_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with METRICS.timed('schain_restore.verify'):
+        verify_chunks(chunks_dir, manifest['chunks'])
+    reader = ChunksReader(chunks_dir, manifest['chunks'])
+    try:
+        with decompressed_stream(reader, manifest['compression']) as stream:
+            yield stream
+    finally:
+        reader.close()
@@ -22,35 +22,54 @@ import time
 import logging
 import inspect
 import traceback
-from typing import List
+from typing import Dict
 
 import click
 
 from node_cli.cli import __version__
-from node_cli.cli.health import health_cli
 from node_cli.cli.info import BUILD_DATETIME, COMMIT, BRANCH, OS, VERSION, TYPE
-from node_cli.cli.logs import logs_cli
-from node_cli.cli.lvmpy import lvmpy_cli
-from node_cli.cli.node import node_cli
-from node_cli.cli.schains import schains_cli
-from node_cli.cli.wallet import wallet_cli
-from node_cli.cli.ssl import ssl_cli
-from node_cli.cli.exit import exit_cli
-from node_cli.cli.validate import validate_cli
-from node_cli.cli.resources_allocation import resources_allocation_cli
-from node_cli.cli.sync_node import sync_node_cli
-
-from node_cli.utils.helper import safe_load_texts, init_default_logger
+
+from node_cli.utils.metrics import log_metrics_summary
+from node_cli.utils.helper import safe_load_texts, init_default_logger, init_logs_dir
+from node_cli.utils.lazy_group import LazyCommand, LazyGroup
 from node_cli.configs import LONG_LINE
-from node_cli.core.host import init_logs_dir
 from node_cli.utils.helper import error_exit
 
 TEXTS = safe_load_texts()
 
 logger = logging.getLogger(__name__)
 
+LAZY_SUBCOMMANDS = {
+    'health': LazyCommand('node_cli.cli.health', 'health_cli', 'Node health commands'),
+    'schains': LazyCommand('node_cli.cli.schains', 'schains_cli', 'Node sChains commands'),
+    'logs': LazyCommand('node_cli.cli.logs', 'logs_cli', 'Logs commands'),
+    'resources-allocation': LazyCommand(
+        'node_cli.cli.resources_allocation',
+        'resources_allocation_cli',
+        'Resources allocation commands'
+    ),
+    'node': LazyCommand('node_cli.cli.node', 'node_cli', 'SKALE node commands'),
+    'sync-node': LazyCommand('node_cli.cli.sync_node', 'sync_node_cli', 'SKALE sync node commands'),
+    'wallet': LazyCommand('node_cli.cli.wallet', 'wallet_cli', 'Node wallet commands'),
+    'ssl': LazyCommand('node_cli.cli.ssl', 'ssl_cli', 'sChains SSL commands'),
+    'exit': LazyCommand('node_cli.cli.exit', 'exit_cli', 'Exit commands'),
+    'validate': LazyCommand('node_cli.cli.validate', 'validate_cli', 'Validation commands'),
+    'lvmpy': LazyCommand('node_cli.cli.lvmpy', 'lvmpy_cli', 'Lvmpy commands')
+}
+SYNC_LAZY_SUBCOMMANDS = {
+    'sync-node': LAZY_SUBCOMMANDS['sync-node'],
+    'ssl': LAZY_SUBCOMMANDS['ssl'],
+    'health': LazyCommand('node_cli.cli.health', 'sync_health_cli', 'Sync node health commands')
+}
+
+
+def get_lazy_subcommands() -> Dict[str, LazyCommand]:
+    if TYPE == 'sync':
+        return SYNC_LAZY_SUBCOMMANDS
+    return LAZY_SUBCOMMANDS
+
 
-@click.group()
+@click.group(cls=LazyGroup, lazy_subcommands=get_lazy_subcommands())
 def cli():
     pass
 
@@ -78,26 +97,6 @@ def info():
         '''))
 
 
-def get_sources_list() -> List[click.MultiCommand]:
-    if TYPE == 'sync':
-        return [cli, sync_node_cli, ssl_cli]
-    else:
-        return [
-            cli,
-            health_cli,
-            schains_cli,
-            logs_cli,
-            resources_allocation_cli,
-            node_cli,
-            sync_node_cli,
-            wallet_cli,
-            ssl_cli,
-            exit_cli,
-            validate_cli,
-            lvmpy_cli
-        ]
-
-
 def handle_exception(exc_type, exc_value, exc_traceback):
     if issubclass(exc_type, KeyboardInterrupt):
         sys.__excepthook__(exc_type, exc_value, exc_traceback)
@@ -115,13 +114,12 @@ if __name__ == '__main__':
     args = sys.argv
     # todo: hide secret variables (passwords, private keys)
     logger.debug(f'cmd: {" ".join(str(x) for x in args)}, v.{__version__}')
-    sources = get_sources_list()
-    cmd_collection = click.CommandCollection(sources=sources)
 
     try:
-        cmd_collection()
+        cli()
     except Exception as err:
         traceback.print_exc()
         logger.debug('Execution time: %d seconds', time.time() - start_time)
         error_exit(err)
+    log_metrics_summary()
     logger.debug('Execution time: %d seconds', time.time() - start_time)
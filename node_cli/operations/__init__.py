@@ -19,6 +19,7 @@
 
 from node_cli.operations.base import (  # noqa
     update as update_op,
+    prestage as prestage_op,
     init as init_op,
     init_sync as init_sync_op,
     update_sync as update_sync_op,
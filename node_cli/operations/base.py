@@ -20,10 +20,17 @@
 import distro
 import functools
 import logging
-from typing import Dict, Optional
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from node_cli.cli.info import VERSION
-from node_cli.configs import CONTAINER_CONFIG_PATH, CONTAINER_CONFIG_TMP_PATH
+from node_cli.configs import (
+    CONTAINER_CONFIG_PATH,
+    CONTAINER_CONFIG_TMP_PATH,
+    G_CONF_HOME,
+    STATIC_PARAMS_FILEPATH
+)
 from node_cli.core.host import ensure_btrfs_kernel_module_autoloaded, link_env_file, prepare_host
 
 from node_cli.core.docker_config import configure_docker
@@ -36,6 +43,8 @@ from node_cli.operations.common import (
     download_contracts,
     configure_filebeat,
     configure_flask,
+    install_staged_contracts,
+    stage_contracts,
     unpack_backup_archive
 )
 from node_cli.operations.volume import (
@@ -44,14 +53,26 @@ from node_cli.operations.volume import (
     prepare_block_device
 )
 from node_cli.operations.docker_lvmpy import lvmpy_install  # noqa
-from node_cli.operations.skale_node import download_skale_node, sync_skale_node, update_images
-from node_cli.core.checks import CheckType, run_checks as run_host_checks
+from node_cli.operations.skale_node import (
+    download_skale_node,
+    is_local_configs,
+    prestage_images,
+    sync_skale_node,
+    update_images
+)
+from node_cli.core.checks import CheckType, read_static_params, run_checks as run_host_checks
 from node_cli.core.iptables import configure_iptables
-from node_cli.core.schains import update_node_cli_schain_status, cleanup_sync_datadir
+from node_cli.core.schains import (
+    CleanupResult,
+    cleanup_sync_datadir,
+    update_node_cli_schain_status,
+    wait_for_reclaimed_space
+)
 from node_cli.utils.docker_utils import (
     compose_rm,
     compose_up,
     docker_cleanup,
+    get_local_images,
     remove_dynamic_containers,
     remove_schain_container,
     start_admin,
@@ -64,21 +85,28 @@ from node_cli.utils.print_formatters import print_failed_requirements_checks
 logger = logging.getLogger(__name__)
 
 
+def download_checked_configs(env: Dict) -> bool:
+    """ Downloads skale-node configs to the tmp dir and runs preinstall checks against them """
+    download_skale_node(
+        env['CONTAINER_CONFIGS_STREAM'],
+        env.get('CONTAINER_CONFIGS_DIR')
+    )
+    failed_checks = run_host_checks(
+        env['DISK_MOUNTPOINT'],
+        env['ENV_TYPE'],
+        CONTAINER_CONFIG_TMP_PATH,
+        check_type=CheckType.PREINSTALL
+    )
+    if failed_checks:
+        print_failed_requirements_checks(failed_checks)
+        return False
+    return True
+
+
 def checked_host(func):
     @functools.wraps(func)
     def wrapper(env_filepath: str, env: Dict, *args, **kwargs):
-        download_skale_node(
-            env['CONTAINER_CONFIGS_STREAM'],
-            env.get('CONTAINER_CONFIGS_DIR')
-        )
-        failed_checks = run_host_checks(
-            env['DISK_MOUNTPOINT'],
-            env['ENV_TYPE'],
-            CONTAINER_CONFIG_TMP_PATH,
-            check_type=CheckType.PREINSTALL
-        )
-        if failed_checks:
-            print_failed_requirements_checks(failed_checks)
+        if not download_checked_configs(env):
             return False
 
         result = func(env_filepath, env, *args, **kwargs)
@@ -99,8 +127,23 @@ def checked_host(func):
     return wrapper
 
 
+def stage_node_artifacts(env: Dict) -> List[str]:
+    """ Downloads contracts ABIs and images while the old containers keep running """
+    stage_contracts(env)
+    return prestage_images(env)
+
+
+def prestage(env: Dict) -> bool:
+    if not download_checked_configs(env):
+        return False
+    stage_node_artifacts(env)
+    return True
+
+
 @checked_host
 def update(env_filepath: str, env: Dict) -> None:
+    staged_images = stage_node_artifacts(env)
+    logger.info('Configs, contracts ABIs and images are staged, replacing containers')
     compose_rm(env)
     remove_dynamic_containers()
 
@@ -112,7 +155,7 @@ def update(env_filepath: str, env: Dict) -> None:
         configure_docker()
 
     backup_old_contracts()
-    download_contracts(env)
+    install_staged_contracts()
 
     lvmpy_install(env)
     generate_nginx_config()
@@ -132,7 +175,7 @@ def update(env_filepath: str, env: Dict) -> None:
             current_stream,
             env['CONTAINER_CONFIGS_STREAM']
         )
-        docker_cleanup()
+        docker_cleanup(ignore=get_local_images(staged_images))
 
     update_meta(
         VERSION,
@@ -141,7 +184,8 @@ def update(env_filepath: str, env: Dict) -> None:
         distro.id(),
         distro.version()
     )
-    update_images(env.get('CONTAINER_CONFIGS_DIR') != '')
+    # Staged images are skipped as up to date, so only missed ones are pulled here
+    update_images(local=is_local_configs(env))
     compose_up(env)
     return True
 
@@ -304,14 +348,43 @@ def turn_on(env):
     compose_up(env)
 
 
-def restore(env, backup_path, config_only=False):
-    unpack_backup_archive(backup_path)
-    failed_checks = run_host_checks(
+def unpack_backup_with_checks(env: Dict, backup_path: str) -> List:
+    """
+    Unpacks backup and runs preinstall host checks concurrently with extraction:
+    checks start as soon as static params are extracted from the backup.
+    """
+    static_params_name = os.path.relpath(STATIC_PARAMS_FILEPATH, G_CONF_HOME)
+    futures: List[Future] = []
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        def on_extracted(name: str, path: str) -> None:
+            if name == static_params_name and not futures:
+                requirements = read_static_params(path, env['ENV_TYPE'])
+                logger.info('Running preinstall checks while backup is being unpacked')
+                futures.append(executor.submit(
+                    run_host_checks,
+                    env['DISK_MOUNTPOINT'],
+                    env['ENV_TYPE'],
+                    CONTAINER_CONFIG_PATH,
+                    check_type=CheckType.PREINSTALL,
+                    requirements=requirements
+                ))
+
+        unpack_backup_archive(backup_path, on_extracted=on_extracted)
+        if futures:
+            return futures[0].result()
+
+    logger.info('Static params were not found in backup, running preinstall checks')
+    return run_host_checks(
         env['DISK_MOUNTPOINT'],
         env['ENV_TYPE'],
         CONTAINER_CONFIG_PATH,
         check_type=CheckType.PREINSTALL
     )
+
+
+def restore(env, backup_path, config_only=False):
+    failed_checks = unpack_backup_with_checks(env, backup_path)
     if failed_checks:
         print_failed_requirements_checks(failed_checks)
         return False
@@ -321,7 +394,7 @@ def restore(env, backup_path, config_only=False):
         configure_docker()
 
     link_env_file()
-    configure_iptables()
+    configure_iptables(force=True)
     lvmpy_install(env)
     init_shared_space_volume(env['ENV_TYPE'])
 
@@ -354,13 +427,14 @@ def repair_sync(
     archive: bool,
     catchup: bool,
     historic_state: bool,
-    snapshot_from: Optional[str]
-) -> None:
+    snapshot_from: Optional[str],
+    wait_reclaim: bool = False
+) -> CleanupResult:
     stop_admin(sync_node=True)
     remove_schain_container(schain_name=schain_name)
 
-    logger.info('Updating node options')
-    cleanup_sync_datadir(schain_name=schain_name)
+    logger.info('Removing schain data')
+    cleanup_result = cleanup_sync_datadir(schain_name=schain_name)
 
     logger.info('Updating node options')
     node_options = NodeOptions()
@@ -371,3 +445,6 @@ def repair_sync(
     logger.info('Updating cli status')
     update_node_cli_schain_status(schain_name, snapshot_from=snapshot_from)
     start_admin(sync_node=True)
+    if wait_reclaim:
+        cleanup_result = wait_for_reclaimed_space(cleanup_result)
+    return cleanup_result
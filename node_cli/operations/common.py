@@ -19,10 +19,10 @@
 
 import os
 import stat
-import tarfile
 import logging
 import shutil
 import secrets
+from typing import Optional
 
 import urllib.request
 from shutil import copyfile
@@ -36,8 +36,17 @@ from node_cli.configs import (
     FLASK_SECRET_KEY_FILE,
     IMA_CONTRACTS_FILEPATH,
     MANAGER_CONTRACTS_FILEPATH,
-    SRC_FILEBEAT_CONFIG_PATH
+    REPORTS_PATH,
+    SRC_FILEBEAT_CONFIG_PATH,
+    STAGED_CONTRACTS_PATH
 )
+from node_cli.core.backup import (
+    ExtractedCallback,
+    is_backup_manifest,
+    restore_archive,
+    restore_from_manifest
+)
+from node_cli.utils.helper import validate_abi
 
 logger = logging.getLogger(__name__)
 
@@ -47,11 +56,44 @@ def backup_old_contracts():
     copy_tree(CONTRACTS_PATH, BACKUP_CONTRACTS_PATH)
 
 
+CONTRACTS_FILEPATHS = {
+    'MANAGER_CONTRACTS_ABI_URL': MANAGER_CONTRACTS_FILEPATH,
+    'IMA_CONTRACTS_ABI_URL': IMA_CONTRACTS_FILEPATH
+}
+
+
+class ContractsValidationError(Exception):
+    pass
+
+
 def download_contracts(env):
     urllib.request.urlretrieve(env['MANAGER_CONTRACTS_ABI_URL'], MANAGER_CONTRACTS_FILEPATH)
     urllib.request.urlretrieve(env['IMA_CONTRACTS_ABI_URL'], IMA_CONTRACTS_FILEPATH)
 
 
+def get_staged_contracts_filepath(filepath: str) -> str:
+    return os.path.join(STAGED_CONTRACTS_PATH, os.path.basename(filepath))
+
+
+def stage_contracts(env) -> None:
+    """ Downloads contracts ABIs aside of the used ones and validates them """
+    logger.info('Staging contracts ABIs')
+    os.makedirs(STAGED_CONTRACTS_PATH, exist_ok=True)
+    for url_param, filepath in CONTRACTS_FILEPATHS.items():
+        staged_filepath = get_staged_contracts_filepath(filepath)
+        urllib.request.urlretrieve(env[url_param], staged_filepath)
+        result = validate_abi(staged_filepath)
+        if result['status'] == 'error':
+            raise ContractsValidationError(f'{env[url_param]}: {result["msg"]}')
+
+
+def install_staged_contracts() -> None:
+    logger.info('Installing staged contracts ABIs')
+    os.makedirs(CONTRACTS_PATH, exist_ok=True)
+    for filepath in CONTRACTS_FILEPATHS.values():
+        shutil.move(get_staged_contracts_filepath(filepath), filepath)
+
+
 def configure_filebeat():
     logger.info('Configuring filebeat...')
     copyfile(SRC_FILEBEAT_CONFIG_PATH, FILEBEAT_CONFIG_PATH)
@@ -76,7 +118,15 @@ def configure_flask():
         logger.info('Flask secret key generated and saved')
 
 
-def unpack_backup_archive(backup_path: str) -> None:
+def unpack_backup_archive(
+    backup_path: str,
+    on_extracted: Optional[ExtractedCallback] = None
+) -> None:
+    # reports describe the restoring host and are written by preinstall
+    # checks while backup is unpacked, so copies from backup are skipped
+    skip = (os.path.relpath(REPORTS_PATH, G_CONF_HOME),)
+    if is_backup_manifest(backup_path):
+        restore_from_manifest(backup_path, G_CONF_HOME, on_extracted=on_extracted, skip=skip)
+        return
     logger.info('Unpacking backup archive...')
-    with tarfile.open(backup_path) as tar:
-        tar.extractall(path=G_CONF_HOME)
+    restore_archive(backup_path, G_CONF_HOME, on_extracted=on_extracted, skip=skip)
@@ -20,11 +20,18 @@
 import logging
 import os
 import shutil
-from typing import Optional
+from typing import Dict, List, Optional
 
 from node_cli.utils.helper import rm_dir, rsync_dirs, safe_mkdir
 from node_cli.utils.git_utils import clone_repo
-from node_cli.utils.docker_utils import compose_pull, compose_build
+from node_cli.utils.docker_utils import (
+    compose_build,
+    compose_pull,
+    get_compose_env,
+    get_compose_images,
+    get_compose_path,
+    pull_images
+)
 from node_cli.configs import (
     CONTAINER_CONFIG_PATH,
     CONTAINER_CONFIG_TMP_PATH,
@@ -42,6 +49,28 @@ def update_images(local: bool = False, sync_node: bool = False) -> None:
         compose_pull(sync_node=sync_node)
 
 
+def is_local_configs(env: Dict) -> bool:
+    return bool(env.get('CONTAINER_CONFIGS_DIR'))
+
+
+def prestage_images(env: Dict, sync_node: bool = False) -> List[str]:
+    """
+    Pulls images of the downloaded skale-node configs before they are synced,
+    so running containers are not affected. Returns pulled image names.
+    """
+    if is_local_configs(env):
+        logger.info('Images are built from local configs, skipping pre-staging')
+        return []
+    compose_path = get_compose_path(sync_node)
+    staged_compose_path = os.path.join(CONTAINER_CONFIG_TMP_PATH, os.path.basename(compose_path))
+    images = get_compose_images(
+        staged_compose_path,
+        env={**get_compose_env(staged_compose_path), **env}
+    )
+    pull_images(images)
+    return images
+
+
 def download_skale_node(stream: Optional[str], src: Optional[str]) -> None:
     rm_dir(CONTAINER_CONFIG_TMP_PATH)
     safe_mkdir(CONTAINER_CONFIG_TMP_PATH)
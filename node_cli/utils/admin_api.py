@@ -0,0 +1,107 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import functools
+import logging
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from node_cli.configs import (
+    ADMIN_API_BACKOFF_FACTOR,
+    ADMIN_API_POOL_SIZE,
+    ADMIN_API_RETRIES,
+    ADMIN_HOST,
+    ADMIN_PORT
+)
+from node_cli.configs.routes import get_route, get_route_timeout
+from node_cli.utils.metrics import METRICS
+
+
+logger = logging.getLogger(__name__)
+
+ADMIN_API_URL = f'http://{ADMIN_HOST}:{ADMIN_PORT}'
+RETRY_STATUSES = (502, 503, 504)
+
+
+class AdminApiClient:
+    """
+    Keep-alive client for skale-admin API.
+    GET requests are idempotent, so they are retried with backoff,
+    every request is bounded by per-route connect/read timeouts.
+    """
+
+    def __init__(
+        self,
+        base_url: str = ADMIN_API_URL,
+        pool_size: int = ADMIN_API_POOL_SIZE,
+        retries: int = ADMIN_API_RETRIES,
+        backoff_factor: float = ADMIN_API_BACKOFF_FACTOR
+    ) -> None:
+        self.base_url = base_url
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry
+        )
+        self.session.mount(base_url, adapter)
+
+    def url(self, blueprint: str, method: str) -> str:
+        return urllib.parse.urljoin(self.base_url, get_route(blueprint, method))
+
+    def get(self, blueprint: str, method: str, **kwargs) -> requests.Response:
+        url = self.url(blueprint, method)
+        with self._timed('GET', blueprint, method):
+            return self.session.get(
+                url,
+                timeout=get_route_timeout(blueprint, method),
+                **kwargs
+            )
+
+    def post(self, blueprint: str, method: str, **kwargs) -> requests.Response:
+        url = self.url(blueprint, method)
+        with self._timed('POST', blueprint, method):
+            return self.session.post(
+                url,
+                timeout=get_route_timeout(blueprint, method),
+                **kwargs
+            )
+
+    def _timed(self, http_method: str, blueprint: str, method: str):
+        key = f'admin_api.{blueprint}.{method}'
+        logger.debug('%s %s/%s', http_method, blueprint, method)
+        return METRICS.timed(key)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+@functools.lru_cache(maxsize=None)
+def admin_api_client() -> AdminApiClient:
+    return AdminApiClient()
@@ -0,0 +1,215 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import gzip
+import logging
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_ALGORITHMS = ('gzip', 'zstd')
+ARCHIVE_EXTENSIONS = {
+    'gzip': 'tar.gz',
+    'zstd': 'tar.zst'
+}
+COMPRESSED_EXTENSIONS = {
+    'gzip': 'gz',
+    'zstd': 'zst'
+}
+DEFAULT_GZIP_LEVEL = 6
+MAX_COMPRESSION_LEVELS = {
+    'gzip': 9,
+    'zstd': 19
+}
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'zstd': b'\x28\xb5\x2f\xfd'
+}
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class CompressionError(Exception):
+    pass
+
+
+def get_compress_cmd(
+    algorithm: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None
+) -> Optional[List[str]]:
+    """
+    Returns multi-threaded compressor command writing to stdout.
+    None means that gzip should be done in-process (pigz is not installed).
+    """
+    if algorithm == 'gzip':
+        if not shutil.which('pigz'):
+            return None
+        cmd = ['pigz', '-c']
+        if threads:
+            cmd.extend(['-p', str(threads)])
+    elif algorithm == 'zstd':
+        if not shutil.which('zstd'):
+            raise CompressionError('zstd is not installed')
+        cmd = ['zstd', '-c', '-q', f'-T{threads or 0}']
+    else:
+        raise CompressionError(f'Unknown compression algorithm {algorithm}')
+    if level is not None:
+        cmd.append(f'-{level}')
+    return cmd
+
+
+def validate_compression_level(algorithm: str, level: Optional[int]) -> None:
+    if level is None:
+        return
+    max_level = MAX_COMPRESSION_LEVELS[algorithm]
+    if not 1 <= level <= max_level:
+        raise CompressionError(f'{algorithm} compression level should be from 1 to {max_level}')
+
+
+@contextmanager
+def compressed_writer(
+    path: str,
+    algorithm: str = 'gzip',
+    level: Optional[int] = None,
+    threads: Optional[int] = None
+) -> Iterator[BinaryIO]:
+    """ Yields binary stream, everything written to it is compressed into path """
+    cmd = get_compress_cmd(algorithm, level=level, threads=threads)
+    validate_compression_level(algorithm, level)
+    if cmd is None:
+        logger.debug('pigz is not found, compressing %s in-process', path)
+        with gzip.open(path, 'wb', compresslevel=level or DEFAULT_GZIP_LEVEL) as out:
+            yield out
+        return
+
+    logger.debug('Compressing %s with %s', path, ' '.join(cmd))
+    with open(path, 'wb') as out:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=out)
+        try:
+            yield proc.stdin
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise CompressionError(f'{cmd[0]} exited with code {proc.returncode}')
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """ Detects compression algorithm by file magic, None means not compressed """
+    with open(path, 'rb') as f:
+        header = f.read(4)
+    for algorithm, magic in COMPRESSION_MAGIC.items():
+        if header.startswith(magic):
+            return algorithm
+    return None
+
+
+def get_decompress_cmd(algorithm: str) -> Optional[List[str]]:
+    """ Returns decompressor command writing to stdout, None means in-process gzip """
+    if algorithm == 'gzip':
+        return ['pigz', '-dc'] if shutil.which('pigz') else None
+    if algorithm == 'zstd':
+        if not shutil.which('zstd'):
+            raise CompressionError('zstd is not installed')
+        return ['zstd', '-dc', '-q']
+    raise CompressionError(f'Unknown compression algorithm {algorithm}')
+
+
+@contextmanager
+def decompressed_reader(path: str) -> Iterator[BinaryIO]:
+    """ Yields binary stream with decompressed content of path (plain files as is) """
+    algorithm = detect_compression(path)
+    if algorithm is None:
+        with open(path, 'rb') as f:
+            yield f
+        return
+    cmd = get_decompress_cmd(algorithm)
+    if cmd is None:
+        logger.debug('pigz is not found, decompressing %s in-process', path)
+        with gzip.open(path, 'rb') as f:
+            yield f
+        return
+
+    logger.debug('Decompressing %s with %s', path, ' '.join(cmd))
+    proc = subprocess.Popen([*cmd, path], stdout=subprocess.PIPE)
+    try:
+        yield proc.stdout
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    # drain the rest (e.g. tar padding) so decompressor is not killed by SIGPIPE
+    while proc.stdout.read(READ_CHUNK_SIZE):
+        pass
+    proc.stdout.close()
+    if proc.wait() != 0:
+        raise CompressionError(f'{cmd[0]} exited with code {proc.returncode}')
+
+
+@contextmanager
+def decompressed_stream(fileobj: BinaryIO, algorithm: str) -> Iterator[BinaryIO]:
+    """ Yields binary stream with decompressed content of compressed fileobj """
+    cmd = get_decompress_cmd(algorithm)
+    if cmd is None:
+        with gzip.GzipFile(fileobj=fileobj, mode='rb') as f:
+            yield f
+        return
+
+    logger.debug('Decompressing stream with %s', ' '.join(cmd))
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    errors = []
+
+    def feed() -> None:
+        try:
+            shutil.copyfileobj(fileobj, proc.stdin, READ_CHUNK_SIZE)
+        except BrokenPipeError:
+            pass
+        except Exception as err:
+            errors.append(err)
+        finally:
+            proc.stdin.close()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        yield proc.stdout
+    except BaseException as err:
+        proc.kill()
+        proc.wait()
+        feeder.join()
+        if errors:
+            # Consumer usually fails because of the truncated input, report the cause
+            raise errors[0] from err
+        raise
+    while proc.stdout.read(READ_CHUNK_SIZE):
+        pass
+    proc.stdout.close()
+    feeder.join()
+    if errors:
+        proc.wait()
+        raise errors[0]
+    if proc.wait() != 0:
+        raise CompressionError(f'{cmd[0]} exited with code {proc.returncode}')
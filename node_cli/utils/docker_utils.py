@@ -17,19 +17,30 @@
 #   You should have received a copy of the GNU Affero General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import io
-import itertools
+import datetime
+import gzip
 import os
 import logging
-from typing import Optional
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import docker
 from docker.client import DockerClient
+from docker.errors import APIError, DockerException, ImageNotFound
 from docker.models.containers import Container
+from docker.utils import parse_repository_tag
+from dotenv import dotenv_values
 
-from node_cli.utils.helper import run_cmd, str_to_bool
+from node_cli.utils.helper import format_bytes, run_cmd, safe_load_yml, str_to_bool
 from node_cli.configs import (
     COMPOSE_PATH,
+    CONTAINERS_READY_TIMEOUT,
+    CONTAINERS_REMOVAL_WORKERS,
+    IMAGES_PULL_WORKERS,
     SYNC_COMPOSE_PATH,
     REMOVED_CONTAINERS_FOLDER_PATH,
     SGX_CERTIFICATES_DIR_NAME,
@@ -68,17 +79,258 @@ DOCKER_DEFAULT_TAIL_LINES = 10000
 
 COMPOSE_SHUTDOWN_TIMEOUT = 40
 
+COMPOSE_VARIABLE_RE = re.compile(r'\$(?:(\$)|\{(\w+)(?:(:?[-?+])([^}]*))?\}|(\w+)|(\{))')
+PULL_PROGRESS_STEP = 25
+PULL_PROGRESS_STATUSES = ('Downloading', 'Extracting')
 
-def docker_client() -> DockerClient:
-    return docker.from_env()
+COMPOSE_SERVICE_LABEL = 'com.docker.compose.service'
+SKALE_CONTAINER_PREFIX = 'skale_'
+READINESS_INITIAL_DELAY = 0.5
+READINESS_MAX_DELAY = 5
+CRASH_LOOP_POLLS = 3
+FAILED_CONTAINER_STATES = ('exited', 'dead')
+MISSING_SERVICE_STATE = 'missing'
+
+
+ContainerSummary = namedtuple(
+    'ContainerSummary',
+    ['name', 'id', 'state', 'status', 'labels'],
+    defaults=('', None)
+)
+ServiceState = namedtuple(
+    'ServiceState',
+    ['service', 'container', 'state', 'health', 'status', 'alive']
+)
+ContainerRemovalResult = namedtuple('ContainerRemovalResult', ['name', 'duration', 'error'])
+ImagePullResult = namedtuple(
+    'ImagePullResult',
+    ['image', 'skipped', 'transferred', 'duration', 'error']
+)
+
+
+class ContainersRemovalError(Exception):
+    pass
+
+
+class ContainersNotReadyError(Exception):
+    pass
+
+
+class ImagePullError(Exception):
+    pass
+
+
+class ComposeInterpolationError(Exception):
+    pass
+
+
+DOCKER_CLIENTS: Dict[str, DockerClient] = {}
+DOCKER_CLIENTS_LOCK = threading.Lock()
+
+CONTAINERS_CACHE_TTL = 5
+CONTAINERS_CACHE: Dict[tuple, tuple] = {}
+CONTAINERS_CACHE_LOCK = threading.Lock()
+
+
+def docker_client(base_url: Optional[str] = None) -> DockerClient:
+    """
+    Returns process-wide docker client for the socket url.
+    Client is created (and daemon is probed) only on the first call.
+    """
+    key = base_url or os.getenv('DOCKER_HOST', '')
+    with DOCKER_CLIENTS_LOCK:
+        if key not in DOCKER_CLIENTS:
+            logger.debug('Creating docker client for %s', key or 'default socket')
+            if base_url:
+                DOCKER_CLIENTS[key] = docker.DockerClient(base_url=base_url)
+            else:
+                DOCKER_CLIENTS[key] = docker.from_env()
+        return DOCKER_CLIENTS[key]
+
+
+def reset_docker_clients() -> None:
+    with DOCKER_CLIENTS_LOCK:
+        for client in DOCKER_CLIENTS.values():
+            client.close()
+        DOCKER_CLIENTS.clear()
 
 
 def get_sanitized_container_name(container_info: dict) -> str:
     return container_info['Names'][0].replace('/', '', 1)
 
 
-def get_containers(container_name_filter=None, _all=True) -> list:
-    return docker_client().containers.list(all=_all)
+def get_containers_filters(
+    name: Optional[str] = None,
+    labels: Optional[Dict[str, Optional[str]]] = None,
+    status: Optional[str] = None
+) -> dict:
+    """ Builds docker API filters. Name is a regex, label without value matches any value """
+    filters: dict = {}
+    if name:
+        filters['name'] = name
+    if labels:
+        filters['label'] = [
+            key if value is None else f'{key}={value}'
+            for key, value in labels.items()
+        ]
+    if status:
+        filters['status'] = status
+    return filters
+
+
+def get_containers(
+    container_name_filter: Optional[str] = None,
+    _all: bool = True,
+    labels: Optional[Dict[str, Optional[str]]] = None,
+    status: Optional[str] = None
+) -> List[Container]:
+    filters = get_containers_filters(container_name_filter, labels, status)
+    return docker_client().containers.list(all=_all, filters=filters)
+
+
+def get_container_summaries(
+    name: Optional[str] = None,
+    labels: Optional[Dict[str, Optional[str]]] = None,
+    status: Optional[str] = None,
+    _all: bool = True,
+    use_cache: bool = True
+) -> List[ContainerSummary]:
+    """
+    Lists containers without inspecting each of them.
+    Results are cached for CONTAINERS_CACHE_TTL seconds, cache is dropped
+    when containers are started or removed by this process.
+    """
+    filters = get_containers_filters(name, labels, status)
+    key = (_all, repr(sorted(filters.items())))
+    now = time.monotonic()
+    with CONTAINERS_CACHE_LOCK:
+        cached = CONTAINERS_CACHE.get(key)
+        if use_cache and cached and now - cached[0] < CONTAINERS_CACHE_TTL:
+            return cached[1]
+    summaries = [
+        ContainerSummary(
+            name=get_sanitized_container_name(info),
+            id=info['Id'],
+            state=info['State'],
+            status=info.get('Status', ''),
+            labels=info.get('Labels') or {}
+        )
+        for info in docker_client().api.containers(all=_all, filters=filters)
+    ]
+    with CONTAINERS_CACHE_LOCK:
+        CONTAINERS_CACHE[key] = (now, summaries)
+    return summaries
+
+
+def reset_containers_cache() -> None:
+    with CONTAINERS_CACHE_LOCK:
+        CONTAINERS_CACHE.clear()
+
+
+def get_container_health(summary: ContainerSummary) -> Optional[str]:
+    """ Parses health from docker ps status, e.g. 'Up 5 seconds (health: starting)' """
+    status = summary.status or ''
+    if '(healthy)' in status:
+        return 'healthy'
+    if '(unhealthy)' in status:
+        return 'unhealthy'
+    if '(health: starting)' in status:
+        return 'starting'
+    return None
+
+
+def get_services_states(
+    services: Iterable[str],
+    use_cache: bool = True
+) -> Dict[str, ServiceState]:
+    """
+    Returns state of the container of every compose service using one
+    label-filtered containers request. Absent services are reported as missing.
+    Only skale containers are considered, so services of other compose projects
+    with the same names are ignored. Running container wins over stale duplicates.
+    Service is alive when its container is running and is not unhealthy.
+    """
+    by_service: Dict[str, ContainerSummary] = {}
+    for summary in get_container_summaries(
+        name=SKALE_CONTAINER_PREFIX,
+        labels={COMPOSE_SERVICE_LABEL: None},
+        use_cache=use_cache
+    ):
+        if not summary.name.startswith(SKALE_CONTAINER_PREFIX):
+            continue
+        service = summary.labels[COMPOSE_SERVICE_LABEL]
+        current = by_service.get(service)
+        if current is None or (current.state != 'running' and summary.state == 'running'):
+            by_service[service] = summary
+    states = {}
+    for service in services:
+        summary = by_service.get(service)
+        if summary is None:
+            states[service] = ServiceState(
+                service=service,
+                container=None,
+                state=MISSING_SERVICE_STATE,
+                health=None,
+                status='',
+                alive=False
+            )
+            continue
+        health = get_container_health(summary)
+        states[service] = ServiceState(
+            service=service,
+            container=summary.name,
+            state=summary.state,
+            health=health,
+            status=summary.status,
+            alive=summary.state == 'running' and health != 'unhealthy'
+        )
+    return states
+
+
+def wait_for_compose_services(
+    services: Iterable[str],
+    timeout: float = CONTAINERS_READY_TIMEOUT
+) -> Dict[str, float]:
+    """
+    Polls compose containers with exponential backoff until every service
+    is running and healthy (if it has a healthcheck).
+    Fails fast if a container exited, became unhealthy or keeps restarting.
+    Returns seconds to ready per service.
+    """
+    start = time.monotonic()
+    pending = set(services)
+    ready: Dict[str, float] = {}
+    restarts: Dict[str, int] = {}
+    delay = READINESS_INITIAL_DELAY
+    while True:
+        states = get_services_states(pending, use_cache=False)
+        elapsed = time.monotonic() - start
+        for service in sorted(pending):
+            state = states[service]
+            if state.state == MISSING_SERVICE_STATE:
+                continue
+            if state.state in FAILED_CONTAINER_STATES or state.health == 'unhealthy':
+                raise ContainersNotReadyError(f'{service} failed: {state.status}')
+            if state.state == 'restarting':
+                restarts[service] = restarts.get(service, 0) + 1
+                if restarts[service] >= CRASH_LOOP_POLLS:
+                    raise ContainersNotReadyError(f'{service} is restarting in a loop')
+            elif state.alive and state.health != 'starting':
+                ready[service] = elapsed
+                pending.discard(service)
+                logger.info('Service %s is ready in %.1fs', service, elapsed)
+        if not pending:
+            return ready
+        if elapsed >= timeout:
+            raise ContainersNotReadyError(
+                f'Services are not ready in {timeout}s: {", ".join(sorted(pending))}'
+            )
+        time.sleep(min(delay, max(timeout - elapsed, 0)))
+        delay = min(delay * 2, READINESS_MAX_DELAY)
+
+
+def is_container_exists(name: str, use_cache: bool = True) -> bool:
+    return len(get_container_summaries(name=f'^{name}$', use_cache=use_cache)) > 0
 
 
 def get_all_schain_containers(_all=True) -> list:
@@ -113,9 +365,51 @@ def remove_telegraf() -> None:
     remove_containers(telegraf, timeout=TELEGRAF_REMOVE_TIMEOUT)
 
 
-def remove_containers(containers, timeout):
-    for container in containers:
+def remove_containers(
+    containers: Iterable[Container],
+    timeout: int,
+    workers: int = CONTAINERS_REMOVAL_WORKERS
+) -> List[ContainerRemovalResult]:
+    """
+    Stops and removes containers (saving their logs) using a pool of workers.
+    All containers are processed even if some of them fail,
+    ContainersRemovalError is raised afterwards.
+    """
+    containers = list(containers)
+    if not containers:
+        return []
+    workers = max(1, min(workers, len(containers)))
+    logger.info('Removing %d containers, workers: %d', len(containers), workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda c: timed_safe_rm(c, timeout=timeout),
+            containers
+        ))
+    for result in results:
+        if result.error:
+            logger.error(
+                'Container %s removal failed after %.1fs: %s',
+                result.name, result.duration, result.error
+            )
+        else:
+            logger.info('Container %s removed in %.1fs', result.name, result.duration)
+    failed = [result.name for result in results if result.error]
+    if failed:
+        raise ContainersRemovalError(f'Failed to remove containers: {", ".join(failed)}')
+    return results
+
+
+def timed_safe_rm(
+    container: Container,
+    timeout: int = DOCKER_DEFAULT_STOP_TIMEOUT
+) -> ContainerRemovalResult:
+    start = time.perf_counter()
+    error = None
+    try:
         safe_rm(container, timeout=timeout)
+    except Exception as err:
+        error = err
+    return ContainerRemovalResult(container.name, time.perf_counter() - start, error)
 
 
 def safe_rm(container: Container, timeout=DOCKER_DEFAULT_STOP_TIMEOUT, **kwargs):
@@ -130,6 +424,7 @@ def safe_rm(container: Container, timeout=DOCKER_DEFAULT_STOP_TIMEOUT, **kwargs)
     backup_container_logs(container)
     logger.info(f'Removing container: {container_name}, kwargs: {kwargs}')
     container.remove(**kwargs)
+    reset_containers_cache()
     logger.info(f'Container removed: {container_name}')
 
 
@@ -150,10 +445,9 @@ def rm_container(
     dclient: Optional[DockerClient] = None
 ) -> None:
     dc = dclient or docker_client()
-    container_names = [container.name for container in get_containers()]
-    if container_name in container_names:
+    if is_container_exists(container_name, use_cache=False):
         container = dc.containers.get(container_name)
-        safe_rm(container)
+        safe_rm(container, timeout=timeout)
 
 
 def start_container(
@@ -164,6 +458,7 @@ def start_container(
     container = dc.containers.get(container_name)
     logger.info('Starting container %s', container_name)
     container.start()
+    reset_containers_cache()
 
 
 def start_admin(sync_node: bool = False, dclient: Optional[DockerClient] = None) -> None:
@@ -184,37 +479,82 @@ def remove_schain_container(schain_name: str, dclient: Optional[DockerClient] =
 def backup_container_logs(
     container: Container,
     head: int = DOCKER_DEFAULT_HEAD_LINES,
-    tail: int = DOCKER_DEFAULT_TAIL_LINES
+    tail: int = DOCKER_DEFAULT_TAIL_LINES,
+    compress: bool = False
 ) -> None:
     logger.info(f'Going to backup container logs: {container.name}')
-    logs_backup_filepath = get_logs_backup_filepath(container)
-    save_container_logs(container, logs_backup_filepath, tail)
+    logs_backup_filepath = get_logs_backup_filepath(container, compress=compress)
+    save_container_logs(
+        container,
+        logs_backup_filepath,
+        head=head,
+        tail=tail,
+        compress=compress
+    )
     logger.info(
         f'Old container logs saved to {logs_backup_filepath}, tail: {tail}')
 
 
+def iter_log_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """ Splits docker log stream chunks into newline terminated lines """
+    rest = b''
+    for chunk in chunks:
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if rest:
+        yield rest
+
+
 def save_container_logs(
     container: Container,
     log_filepath: str,
     head: int = DOCKER_DEFAULT_HEAD_LINES,
-    tail: int = DOCKER_DEFAULT_TAIL_LINES
+    tail: Union[int, str] = DOCKER_DEFAULT_TAIL_LINES,
+    compress: bool = False,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None
 ) -> None:
+    """
+    Saves first `head` and last `tail` lines of container logs separated by a line of `=`.
+    Logs are read in one pass without following a running container, memory usage is
+    bounded by `tail` lines (or by `head` lines if tail is 'all').
+    """
     separator = b'=' * 80 + b'\n'
-    tail_lines = container.logs(tail=tail)
-    lines_number = len(io.BytesIO(tail_lines).readlines())
-    head = min(lines_number, head)
-    log_stream = container.logs(stream=True, follow=True)
-    head_lines = b''.join(itertools.islice(log_stream, head))
-    with open(log_filepath, 'wb') as out:
-        out.write(head_lines)
-        out.write(separator)
-        out.write(tail_lines)
-
-
-def get_logs_backup_filepath(container: Container) -> str:
+    all_lines = tail == 'all'
+    if not all_lines:
+        head = min(head, tail)
+    pending: Deque[bytes] = deque(maxlen=None if all_lines else tail)
+    flushed = False
+    opener = gzip.open if compress else open
+    log_stream = container.logs(stream=True, follow=False, since=since, until=until)
+    try:
+        with opener(log_filepath, 'wb') as out:
+            for i, line in enumerate(iter_log_lines(log_stream)):
+                if i < head:
+                    out.write(line)
+                if flushed:
+                    out.write(line)
+                    continue
+                pending.append(line)
+                if all_lines and i + 1 >= head:
+                    out.write(separator)
+                    out.writelines(pending)
+                    pending.clear()
+                    flushed = True
+            if not flushed:
+                out.write(separator)
+                out.writelines(pending)
+    finally:
+        log_stream.close()
+
+
+def get_logs_backup_filepath(container: Container, compress: bool = False) -> str:
     container_index = sum(1 for f in os.listdir(REMOVED_CONTAINERS_FOLDER_PATH)
                           if f.startswith(f'{container.name}-'))
-    log_file_name = f'{container.name}-{container_index}.log'
+    extension = 'log.gz' if compress else 'log'
+    log_file_name = f'{container.name}-{container_index}.{extension}'
     return os.path.join(REMOVED_CONTAINERS_FOLDER_PATH, log_file_name)
 
 
@@ -252,20 +592,182 @@ def compose_rm(env={}, sync_node: bool = False):
             'down',
             '-t', str(COMPOSE_SHUTDOWN_TIMEOUT),
         ),
-        env=env
+        env=env,
+        capture=False,
+        live=True
     )
     logger.info('Compose containers removed')
 
 
-def compose_pull(sync_node: bool = False):
-    logger.info('Pulling compose containers')
-    compose_path = get_compose_path(sync_node)
-    run_cmd(
-        cmd=('docker-compose', '-f', compose_path, 'pull'),
-        env={
-            'SKALE_DIR': SKALE_DIR
-        }
+def interpolate_compose_value(value: str, env: Dict[str, str]) -> str:
+    """
+    Substitutes $VAR, ${VAR} and ${VAR<op>arg} with :-, -, :?, ?, :+ and +
+    operators like compose does. Raises ComposeInterpolationError for a required
+    variable that is missing and for braced forms compose would not accept.
+    """
+    def replace(match: re.Match) -> str:
+        escaped, braced, operator, arg, plain, invalid = match.groups()
+        if escaped:
+            return '$'
+        if invalid:
+            raise ComposeInterpolationError(f'Invalid interpolation format in "{value}"')
+        name = braced or plain
+        var = env.get(name)
+        # operators with colon treat empty variable as unset
+        is_set = bool(var) if operator and operator.startswith(':') else var is not None
+        if operator in (':-', '-') and not is_set:
+            return arg
+        if operator in (':?', '?') and not is_set:
+            raise ComposeInterpolationError(f'Required variable {name} is missing: {arg}')
+        if operator in (':+', '+'):
+            return arg if is_set else ''
+        return var or ''
+    return COMPOSE_VARIABLE_RE.sub(replace, value)
+
+
+def get_compose_env(compose_path: str) -> Dict[str, str]:
+    """ Environment used by docker-compose: shell env overrides .env of the project """
+    dotenv_path = os.path.join(os.path.dirname(compose_path), '.env')
+    dotenv = dotenv_values(dotenv_path) if os.path.isfile(dotenv_path) else {}
+    return {**dotenv, **os.environ, 'SKALE_DIR': SKALE_DIR}
+
+
+def get_compose_images(compose_path: str, env: Optional[Dict[str, str]] = None) -> List[str]:
+    """ Returns unique images of compose services, services that are only built are skipped """
+    env = get_compose_env(compose_path) if env is None else env
+    services = safe_load_yml(compose_path)['services']
+    images = (
+        interpolate_compose_value(str(service['image']), env)
+        for service in services.values()
+        if service.get('image')
     )
+    return list(dict.fromkeys(images))
+
+
+def is_image_up_to_date(image: str) -> bool:
+    """
+    Checks if local image has the same digest as the registry one.
+    Images pinned by digest are checked without querying the registry.
+    """
+    client = docker_client()
+    try:
+        local_image = client.api.inspect_image(image)
+    except ImageNotFound:
+        return False
+    local_digests = {
+        repo_digest.split('@', 1)[1]
+        for repo_digest in local_image.get('RepoDigests') or []
+    }
+    _, tag = parse_repository_tag(image)
+    if tag and tag.startswith('sha256:'):
+        return tag in local_digests
+    try:
+        distribution = client.api.inspect_distribution(image)
+    except APIError as err:
+        logger.warning('Cannot get registry digest of %s: %s', image, err)
+        return False
+    return distribution['Descriptor']['digest'] in local_digests
+
+
+class ImagePullProgress:
+    """ Tracks docker pull events of one image, logs layer status changes and progress """
+
+    def __init__(self, image: str) -> None:
+        self.image = image
+        self.statuses: Dict[str, str] = {}
+        self.milestones: Dict[Tuple[str, str], int] = {}
+        self.downloaded: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+
+    @property
+    def transferred(self) -> int:
+        return sum(self.downloaded.values())
+
+    def update(self, event: Dict) -> None:
+        if 'error' in event:
+            raise ImagePullError(f'{self.image}: {event["error"]}')
+        status = event.get('status', '')
+        layer = event.get('id')
+        if layer is None or 'progressDetail' not in event:
+            logger.info('%s: %s', self.image, status)
+            return
+        detail = event['progressDetail'] or {}
+        if status == 'Downloading' and detail.get('total'):
+            self.sizes[layer] = detail['total']
+            self.downloaded[layer] = max(self.downloaded.get(layer, 0), detail['current'])
+        elif status == 'Download complete' and layer in self.sizes:
+            self.downloaded[layer] = self.sizes[layer]
+
+        if status in PULL_PROGRESS_STATUSES and detail.get('total'):
+            percent = detail['current'] * 100 // detail['total']
+            milestone = percent // PULL_PROGRESS_STEP * PULL_PROGRESS_STEP
+            if milestone > self.milestones.get((layer, status), -1):
+                self.milestones[(layer, status)] = milestone
+                logger.info(
+                    '%s %s: %s %d%% of %s',
+                    self.image, layer, status, milestone, format_bytes(detail['total'])
+                )
+        elif self.statuses.get(layer) != status:
+            logger.info('%s %s: %s', self.image, layer, status)
+        self.statuses[layer] = status
+
+
+def pull_image(image: str) -> ImagePullResult:
+    start = time.monotonic()
+    progress = ImagePullProgress(image)
+    try:
+        if is_image_up_to_date(image):
+            logger.info('Image %s is up to date', image)
+            return ImagePullResult(image, True, 0, time.monotonic() - start, None)
+        logger.info('Pulling %s', image)
+        for event in docker_client().api.pull(image, stream=True, decode=True):
+            progress.update(event)
+    except (DockerException, ImagePullError) as err:
+        return ImagePullResult(
+            image, False, progress.transferred, time.monotonic() - start, str(err)
+        )
+    return ImagePullResult(image, False, progress.transferred, time.monotonic() - start, None)
+
+
+def pull_images(
+    images: Iterable[str],
+    workers: int = IMAGES_PULL_WORKERS
+) -> List[ImagePullResult]:
+    """
+    Pulls images concurrently, images that are already up to date are skipped.
+    All images are processed even if some of them fail,
+    ImagePullError is raised afterwards.
+    """
+    images = list(images)
+    if not images:
+        return []
+    workers = max(1, min(workers, len(images)))
+    logger.info('Pulling %d images, workers: %d', len(images), workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(pull_image, images))
+    for result in results:
+        if result.error:
+            logger.error('Image %s pull failed: %s', result.image, result.error)
+        elif not result.skipped:
+            logger.info(
+                'Image %s pulled in %.1fs, transferred %s',
+                result.image, result.duration, format_bytes(result.transferred)
+            )
+    logger.info(
+        'Images pulled: %d, up to date: %d, transferred %s',
+        sum(1 for r in results if not r.skipped and not r.error),
+        sum(1 for r in results if r.skipped),
+        format_bytes(sum(r.transferred for r in results))
+    )
+    failed = [result.image for result in results if result.error]
+    if failed:
+        raise ImagePullError(f'Failed to pull images: {", ".join(failed)}')
+    return results
+
+
+def compose_pull(sync_node: bool = False) -> List[ImagePullResult]:
+    logger.info('Pulling compose images')
+    return pull_images(get_compose_images(get_compose_path(sync_node)))
 
 
 def compose_build(sync_node: bool = False):
@@ -275,7 +777,9 @@ def compose_build(sync_node: bool = False):
         cmd=('docker-compose', '-f', compose_path, 'build'),
         env={
             'SKALE_DIR': SKALE_DIR
-        }
+        },
+        capture=False,
+        live=True
     )
 
 
@@ -291,10 +795,39 @@ def get_compose_path(sync_node: bool) -> str:
     return SYNC_COMPOSE_PATH if sync_node else COMPOSE_PATH
 
 
+def is_monitoring_enabled(env: Dict) -> bool:
+    return str_to_bool(env.get('MONITORING_CONTAINERS', 'False'))
+
+
+def is_notification_enabled(env: Dict) -> bool:
+    return 'TG_API_KEY' in env and 'TG_CHAT_ID' in env
+
+
+def get_compose_services(env: Dict, sync_node: bool = False) -> Tuple[str, ...]:
+    """ Returns compose services that compose_up starts for the env """
+    if sync_node:
+        return tuple(safe_load_yml(SYNC_COMPOSE_PATH)['services'])
+    services = BASE_COMPOSE_SERVICES
+    if is_monitoring_enabled(env):
+        services += MONITORING_COMPOSE_SERVICES
+    if is_notification_enabled(env):
+        services += NOTIFICATION_COMPOSE_SERVICES
+    return services
+
+
+def get_services_liveness(env: Dict, sync_node: bool = False) -> Dict[str, ServiceState]:
+    services = get_compose_services(env, sync_node=sync_node)
+    return get_services_states(services, use_cache=False)
+
+
+def run_compose_cmd(cmd, env) -> None:
+    run_cmd(cmd=cmd, env=env, capture=False, live=True)
+
+
 def compose_up(env, sync_node=False):
     if sync_node:
         logger.info('Running containers for sync node')
-        run_cmd(cmd=get_up_compose_sync_cmd(), env=env)
+        run_compose_cmd(get_up_compose_sync_cmd(), env=env)
         return
 
     logger.info('Running base set of containers')
@@ -302,13 +835,13 @@ def compose_up(env, sync_node=False):
     if 'SGX_CERTIFICATES_DIR_NAME' not in env:
         env['SGX_CERTIFICATES_DIR_NAME'] = SGX_CERTIFICATES_DIR_NAME
 
-    run_cmd(cmd=get_up_compose_cmd(BASE_COMPOSE_SERVICES), env=env)
-    if str_to_bool(env.get('MONITORING_CONTAINERS', 'False')):
+    run_compose_cmd(get_up_compose_cmd(BASE_COMPOSE_SERVICES), env=env)
+    if is_monitoring_enabled(env):
         logger.info('Running monitoring containers')
-        run_cmd(cmd=get_up_compose_cmd(MONITORING_COMPOSE_SERVICES), env=env)
-    if 'TG_API_KEY' in env and 'TG_CHAT_ID' in env:
+        run_compose_cmd(get_up_compose_cmd(MONITORING_COMPOSE_SERVICES), env=env)
+    if is_notification_enabled(env):
         logger.info('Running containers for Telegram notifications')
-        run_cmd(cmd=get_up_compose_cmd(NOTIFICATION_COMPOSE_SERVICES), env=env)
+        run_compose_cmd(get_up_compose_cmd(NOTIFICATION_COMPOSE_SERVICES), env=env)
 
 
 def restart_nginx_container(dutils=None):
@@ -323,6 +856,17 @@ def remove_images(images, dclient=None):
         dc.images.remove(image.id)
 
 
+def get_local_images(names: Iterable[str], dclient=None) -> list:
+    dc = dclient or docker_client()
+    images = []
+    for name in names:
+        try:
+            images.append(dc.images.get(name))
+        except ImageNotFound:
+            logger.warning('Image %s is not found locally', name)
+    return images
+
+
 def get_used_images(dclient=None):
     dc = dclient or docker_client()
     return [c.image for c in dc.containers.list()]
@@ -342,7 +886,7 @@ def cleanup_unused_images(dclient=None, ignore=None):
 def system_prune():
     logger.info('Removing dangling docker artifacts')
     cmd = ['docker', 'system', 'prune', '-f']
-    run_cmd(cmd=cmd)
+    run_cmd(cmd=cmd, capture=False)
 
 
 def docker_cleanup(dclient=None, ignore=None):
@@ -22,9 +22,13 @@ import json
 import os
 import re
 import sys
+import threading
+import time
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import Optional
+from typing import IO, Callable, Deque, Iterable, List, Optional
 
 import yaml
 import shutil
@@ -32,7 +36,6 @@ import requests
 import subprocess
 import urllib.request
 
-import urllib.parse
 from functools import wraps
 
 import logging
@@ -44,8 +47,6 @@ import distutils.util
 
 import click
 
-from jinja2 import Environment
-
 from node_cli.utils.print_formatters import print_err_response
 from node_cli.utils.exit_codes import CLIExitCodes
 from node_cli.configs.env import (
@@ -53,21 +54,25 @@ from node_cli.configs.env import (
     get_env_config
 )
 from node_cli.configs import (
-    TEXT_FILE, ADMIN_HOST, ADMIN_PORT, HIDE_STREAM_LOG, GLOBAL_SKALE_DIR,
-    GLOBAL_SKALE_CONF_FILEPATH
+    TEXT_FILE, HIDE_STREAM_LOG, GLOBAL_SKALE_DIR,
+    GLOBAL_SKALE_CONF_FILEPATH, REMOVED_CONTAINERS_FOLDER_PATH
 )
-from node_cli.configs.routes import get_route
+from node_cli.configs.routes import RouteNotFoundException
+from node_cli.utils.admin_api import admin_api_client
 from node_cli.utils.global_config import read_g_config, get_system_user
+from node_cli.utils.metrics import METRICS
 
 from node_cli.configs.cli_logger import (
-    FILE_LOG_FORMAT, LOG_BACKUP_COUNT, LOG_FILE_SIZE_BYTES,
+    FILE_LOG_FORMAT, LOG_BACKUP_COUNT, LOG_DATA_PATH, LOG_FILE_SIZE_BYTES,
     LOG_FILEPATH, STREAM_LOG_FORMAT, DEBUG_LOG_FILEPATH)
 
 
 logger = logging.getLogger(__name__)
 
 
-HOST = f'http://{ADMIN_HOST}:{ADMIN_PORT}'
+RUN_CMD_TAIL_LINES = 200
+RUN_CMD_POLL_INTERVAL = 0.1
+RUN_CMD_KILL_TIMEOUT = 10
 
 DEFAULT_ERROR_DATA = {
     'status': 'error',
@@ -79,6 +84,10 @@ class InvalidEnvFileError(Exception):
     pass
 
 
+class CommandCancelledError(Exception):
+    pass
+
+
 def read_json(path: str) -> dict:
     with open(path, encoding='utf-8') as data_file:
         return json.loads(data_file.read())
@@ -100,38 +109,132 @@ def init_file(path, content=None):
         write_json(path, content)
 
 
+def get_cmd_name(cmd, shell: bool = False) -> str:
+    args = cmd.split() if shell or isinstance(cmd, str) else cmd
+    return os.path.basename(str(args[0])) if args else ''
+
+
+class OutputCollector:
+    """ Reads process stream line by line, logs it and keeps bounded tail """
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        capture: bool,
+        live: bool,
+        tail_lines: int
+    ) -> None:
+        self.stream = stream
+        self.capture = capture
+        self.live = live
+        self.tail: Deque[bytes] = deque(maxlen=tail_lines)
+        self.captured: List[bytes] = []
+        self.thread = threading.Thread(target=self.collect, daemon=True)
+        self.thread.start()
+
+    def collect(self) -> None:
+        for line in iter(self.stream.readline, b''):
+            text = line.decode('utf-8', errors='replace').rstrip()
+            logger.debug(text)
+            if self.live:
+                sys.stderr.write(f'{text}\n')
+                sys.stderr.flush()
+            self.tail.append(line)
+            if self.capture:
+                self.captured.append(line)
+        self.stream.close()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self.thread.join(timeout)
+
+    @property
+    def output(self) -> bytes:
+        return b''.join(self.captured if self.capture else self.tail)
+
+    @property
+    def tail_text(self) -> str:
+        return b''.join(self.tail).decode('utf-8', errors='replace').rstrip()
+
+
+def stop_process(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=RUN_CMD_KILL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
 def run_cmd(
     cmd,
     env={},
     shell=False,
     secure=False,
     check_code=True,
-    separate_stderr=False
-):
+    separate_stderr=False,
+    capture=True,
+    live=False,
+    timeout: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+    tail_lines: int = RUN_CMD_TAIL_LINES
+) -> subprocess.CompletedProcess:
+    """
+    Runs command streaming its output line by line to the logger
+    (and to stderr if live is set and stream log is not hidden).
+    Only last tail_lines are kept unless capture is set, full output
+    should be captured only for commands with small output.
+    Process is stopped on timeout or when cancel_event is set.
+    Duration and exit code are recorded to METRICS as cmd.<name>.
+    """
     if not secure:
         logger.debug(f'Running: {cmd}')
     else:
         logger.debug('Running some secure command')
-    stdout, stderr = subprocess.PIPE, subprocess.PIPE
-    if not separate_stderr:
-        stderr = subprocess.STDOUT
-    res = subprocess.run(
+    name = get_cmd_name(cmd, shell=shell)
+    live = live and HIDE_STREAM_LOG is None
+    start = time.monotonic()
+    proc = subprocess.Popen(
         cmd,
         shell=shell,
-        stdout=stdout,
-        stderr=stderr,
-        env={**env, **os.environ}
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if separate_stderr else subprocess.STDOUT,
+        env={**os.environ, **env}
+    )
+    stdout = OutputCollector(proc.stdout, capture, live, tail_lines)
+    stderr = OutputCollector(proc.stderr, capture, live, tail_lines) if separate_stderr else None
+
+    deadline = start + timeout if timeout is not None else None
+    while proc.poll() is None:
+        if cancel_event is not None and cancel_event.is_set():
+            stop_process(proc)
+            METRICS.record(f'cmd.{name}', time.monotonic() - start, ok=False, code=proc.returncode)
+            raise CommandCancelledError(f'{name} was cancelled')
+        if deadline is not None and time.monotonic() >= deadline:
+            stop_process(proc)
+            METRICS.record(f'cmd.{name}', time.monotonic() - start, ok=False, code=proc.returncode)
+            stdout.join(RUN_CMD_KILL_TIMEOUT)
+            raise subprocess.TimeoutExpired(cmd, timeout, output=stdout.output)
+        try:
+            proc.wait(timeout=RUN_CMD_POLL_INTERVAL)
+        except subprocess.TimeoutExpired:
+            pass
+    stdout.join()
+    if stderr:
+        stderr.join()
+    duration = time.monotonic() - start
+    METRICS.record(f'cmd.{name}', duration, ok=proc.returncode == 0, code=proc.returncode)
+    logger.debug('%s exited with code %d in %.2fs', name, proc.returncode, duration)
+
+    res = subprocess.CompletedProcess(
+        args=cmd,
+        returncode=proc.returncode,
+        stdout=stdout.output,
+        stderr=stderr.output if stderr else None
     )
-    if check_code:
-        output = res.stdout.decode('utf-8')
-        if res.returncode:
-            if separate_stderr:
-                output = res.stderr.decode('utf-8')
-            logger.error(f'Error during shell execution: {output}')
-            res.check_returncode()
-        else:
-            logger.debug('Command is executed successfully. Command log:')
-            logger.debug(res.stdout.decode('UTF-8').rstrip())
+    if check_code and res.returncode:
+        output = stderr.tail_text if stderr else stdout.tail_text
+        logger.error(f'Error during shell execution: {output}')
+        res.check_returncode()
     return res
 
 
@@ -150,6 +253,8 @@ def process_template(source, destination, data):
     :param data: dictionary with fields for template
     :return: Nothing
     """
+    from jinja2 import Environment  # only node operations render templates
+
     template = read_file(source)
     processed_template = Environment().from_string(template).render(data)
     with open(destination, "w") as f:
@@ -179,6 +284,21 @@ def str_to_bool(val):
     return bool(distutils.util.strtobool(val))
 
 
+def run_in_pool(func: Callable, items: Iterable, workers: int) -> None:
+    """ Applies func to every item (tuple of args) concurrently, reraises the first error """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(func, *item) for item in items]:
+            future.result()
+
+
+def format_bytes(amount: float) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(amount) < 1024:
+            return f'{amount:.1f} {unit}'
+        amount /= 1024
+    return f'{amount:.1f} TiB'
+
+
 def error_exit(error_payload, exit_code=CLIExitCodes.FAILURE):
     print_err_response(error_payload)
     sys.exit(exit_code.value)
@@ -208,21 +328,17 @@ def safe_load_yml(filepath):
             print(exc)
 
 
-def construct_url(route):
-    return urllib.parse.urljoin(HOST, route)
-
-
 def abort_if_false(ctx, param, value):
     if not value:
         ctx.abort()
 
 
 def post_request(blueprint, method, json=None, files=None):
-    route = get_route(blueprint, method)
-    url = construct_url(route)
     try:
-        response = requests.post(url, json=json, files=files)
+        response = admin_api_client().post(blueprint, method, json=json, files=files)
         data = response.json()
+    except RouteNotFoundException:
+        raise
     except Exception as err:
         logger.error('Request failed', exc_info=err)
         data = DEFAULT_ERROR_DATA
@@ -232,11 +348,11 @@ def post_request(blueprint, method, json=None, files=None):
 
 
 def get_request(blueprint: str, method: str, params: Optional[dict] = None) -> tuple[str, str]:
-    route = get_route(blueprint, method)
-    url = construct_url(route)
     try:
-        response = requests.get(url, params=params)
+        response = admin_api_client().get(blueprint, method, params=params)
         data = response.json()
+    except RouteNotFoundException:
+        raise
     except Exception as err:
         logger.error('Request failed', exc_info=err)
         data = DEFAULT_ERROR_DATA
@@ -247,12 +363,10 @@ def get_request(blueprint: str, method: str, params: Optional[dict] = None) -> t
 
 
 def download_dump(path, container_name=None):
-    route = get_route('logs', 'dump')
-    url = construct_url(route)
     params = {}
     if container_name:
         params['container_name'] = container_name
-    with requests.get(url, params=params, stream=True) as r:
+    with admin_api_client().get('logs', 'dump', params=params, stream=True) as r:
         if r is None:
             return None
         if r.status_code != requests.codes.ok:  # pylint: disable=no-member
@@ -268,6 +382,11 @@ def download_dump(path, container_name=None):
     return fname
 
 
+def init_logs_dir():
+    safe_mkdir(LOG_DATA_PATH)
+    safe_mkdir(REMOVED_CONTAINERS_FOLDER_PATH)
+
+
 def init_default_logger():
     f_handler = get_file_handler(LOG_FILEPATH, logging.INFO)
     debug_f_handler = get_file_handler(DEBUG_LOG_FILEPATH, logging.DEBUG)
@@ -368,8 +487,8 @@ def safe_mkdir(path: str, print_res: bool = False):
 
 def rsync_dirs(src: str, dest: str) -> None:
     logger.info(f'Syncing {dest} with {src}')
-    run_cmd(['rsync', '-r', f'{src}/', dest])
-    run_cmd(['rsync', '-r', f'{src}/.git', dest])
+    run_cmd(['rsync', '-r', f'{src}/', dest], capture=False)
+    run_cmd(['rsync', '-r', f'{src}/.git', dest], capture=False)
 
 
 def ok_result(payload: dict = None):
@@ -0,0 +1,84 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import importlib
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import click
+
+
+LazyCommand = namedtuple('LazyCommand', ['module', 'source', 'help'])
+
+
+class LazyGroup(click.Group):
+    """
+    Click group that knows names and help of its subcommands upfront
+    and imports implementing module only when subcommand is invoked
+    """
+
+    def __init__(
+        self,
+        *args,
+        lazy_subcommands: Optional[Dict[str, LazyCommand]] = None,
+        **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*self.commands, *self.lazy_subcommands})
+
+    def get_command(
+        self,
+        ctx: click.Context,
+        cmd_name: str
+    ) -> Optional[click.Command]:
+        if cmd_name not in self.commands and cmd_name in self.lazy_subcommands:
+            self.add_command(self._load(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(
+        self,
+        ctx: click.Context,
+        formatter: click.HelpFormatter
+    ) -> None:
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                cmd = self.commands[name]
+                if cmd.hidden:
+                    continue
+                rows.append((name, cmd.get_short_help_str()))
+            else:
+                rows.append((name, self.lazy_subcommands[name].help))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        lazy = self.lazy_subcommands[cmd_name]
+        module = importlib.import_module(lazy.module)
+        source = getattr(module, lazy.source)
+        cmd = source.get_command(None, cmd_name)
+        if cmd is None:
+            raise ValueError(
+                f'{lazy.module}.{lazy.source} has no command {cmd_name}'
+            )
+        return cmd
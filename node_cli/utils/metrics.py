@@ -0,0 +1,101 @@
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """ Thread safe in-process registry of operation timings """
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        key: str,
+        duration: float,
+        ok: bool = True,
+        code: Optional[int] = None
+    ) -> None:
+        """ Records operation duration, code (e.g. exit code) is counted per value """
+        with self._lock:
+            stats = self._stats.setdefault(key, {
+                'count': 0,
+                'errors': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'codes': {}
+            })
+            stats['count'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            if code is not None:
+                stats['codes'][code] = stats['codes'].get(code, 0) + 1
+
+    @contextmanager
+    def timed(self, key: str) -> Iterator[None]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(key, time.perf_counter() - start, ok=ok)
+
+    def get(self, key: str) -> Dict:
+        with self._lock:
+            stats = self._stats.get(key, {})
+            return {**stats, 'codes': dict(stats['codes'])} if stats else {}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                key: {
+                    **stats,
+                    'codes': dict(stats['codes']),
+                    'avg': stats['total'] / stats['count']
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+METRICS = Metrics()
+
+
+def log_metrics_summary(prefixes: Tuple[str, ...] = ('admin_api.', 'cmd.')) -> None:
+    for key, stats in METRICS.snapshot().items():
+        if key.startswith(prefixes):
+            logger.debug(
+                '%s: count %d, errors %d, avg %.3fs, max %.3fs, codes %s',
+                key, stats['count'], stats['errors'], stats['avg'], stats['max'],
+                stats['codes'] or '-'
+            )
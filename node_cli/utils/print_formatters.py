@@ -22,6 +22,7 @@ import json
 import datetime
 import texttable
 from dateutil import parser
+from terminaltables import SingleTable
 
 import inspect
 
@@ -91,6 +92,27 @@ def print_containers(containers):
     print(Formatter().table(headers, rows))
 
 
+def print_services_liveness(states):
+    headers = [
+        'Service',
+        'Container',
+        'State',
+        'Health',
+        'Alive'
+    ]
+    rows = [
+        [
+            state.service,
+            state.container or '-',
+            state.state.capitalize(),
+            state.health or '-',
+            'Yes' if state.alive else 'No'
+        ]
+        for state in states
+    ]
+    print(Formatter().table(headers, rows))
+
+
 def print_schains(schains):
     headers = [
         'Name',
@@ -170,6 +192,23 @@ def print_schains_healthchecks(schains):
     print(Formatter().table(headers, rows))
 
 
+def print_sgx_info(data):
+    table_data = [
+        ['SGX info', ''],
+        ['Server URL', data['sgx_server_url']],
+        ['SGXWallet Version', data['sgx_wallet_version']],
+        ['Node SGX keyname', data['sgx_keyname']],
+        ['Status', data['status_name']]
+    ]
+    table = SingleTable(table_data)
+    print(table.table)
+
+
+def print_dashboard_section(title):
+    print(f'\n{title}')
+    print(LONG_LINE)
+
+
 def print_logs(logs):
     print('Base logs\n')
     print_log_list(logs['base'])
@@ -245,6 +284,32 @@ def print_firewall_rules(rules, raw=False):
     print(Formatter().table(headers, rows))
 
 
+def format_firewall_rule(rule) -> str:
+    parts = [rule.target]
+    if rule.protocol:
+        parts.append(rule.protocol)
+    if rule.in_interface:
+        parts.append(f'in {rule.in_interface}')
+    if rule.dport:
+        parts.append(f'dport {rule.dport}')
+    if rule.icmp_type:
+        parts.append(f'icmp-type {rule.icmp_type}')
+    if rule.ctstate:
+        parts.append(f'ctstate {rule.ctstate}')
+    parts.append('(insert)' if rule.insert else '(append)')
+    return ' '.join(parts)
+
+
+def print_firewall_diff(diff) -> None:
+    if not diff.add and not diff.remove:
+        print('Firewall rules are up to date')
+        return
+    for rule in diff.remove:
+        print(f'- {format_firewall_rule(rule)}')
+    for rule in diff.add:
+        print(f'+ {format_firewall_rule(rule)}')
+
+
 def print_schain_info(info: dict, raw: bool = False) -> None:
     if raw:
         print(info)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+#   -*- coding: utf-8 -*-
+#
+#   This file is part of node-cli
+#
+#   Copyright (C) 2024-Present SKALE Labs
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures node-cli startup cost per command using `python -X importtime`.
+
+Usage: scripts/startup_benchmark.py [--runs N] [--top N] [--json PATH] [COMMAND ...]
+
+Each COMMAND is a quoted list of cli arguments, e.g. 'version' or 'node --help'.
+Without commands all top level commands are measured with --help.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+MAIN_PATH = os.path.join(PROJECT_DIR, 'node_cli', 'main.py')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+DEFAULT_COMMANDS = (
+    'version',
+    'info',
+    '--help',
+    'health --help',
+    'schains --help',
+    'logs --help',
+    'resources-allocation --help',
+    'node --help',
+    'sync-node --help',
+    'wallet --help',
+    'ssl --help',
+    'exit --help',
+    'validate --help',
+    'lvmpy --help'
+)
+
+
+def parse_importtime(output):
+    modules = []
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'top_level': len(indent) == 1
+            })
+    return modules
+
+
+def measure(command, runs):
+    args = command.split()
+    env = {**os.environ, 'PYTHONPATH': PROJECT_DIR}
+    walls, imports, modules = [], [], []
+    returncode = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        res = subprocess.run(
+            [sys.executable, '-X', 'importtime', MAIN_PATH, *args],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            env=env
+        )
+        walls.append(time.perf_counter() - start)
+        modules = parse_importtime(res.stderr.decode('utf-8'))
+        imports.append(sum(m['self_us'] for m in modules) / 10 ** 6)
+        returncode = res.returncode
+    return {
+        'command': command,
+        'returncode': returncode,
+        'wall_s': statistics.median(walls),
+        'import_s': statistics.median(imports),
+        'modules_count': len(modules),
+        'slowest': sorted(
+            (m for m in modules if m['top_level']),
+            key=lambda m: m['cumulative_us'],
+            reverse=True
+        )
+    }
+
+
+def print_results(results, top):
+    print(f'{"Command":<32}{"Wall, s":>10}{"Import, s":>12}{"Modules":>10}')
+    print('-' * 64)
+    for r in results:
+        print(
+            f'{r["command"]:<32}{r["wall_s"]:>10.3f}'
+            f'{r["import_s"]:>12.3f}{r["modules_count"]:>10}'
+        )
+        for m in r['slowest'][:top]:
+            print(f'    {m["module"]:<44}{m["cumulative_us"] / 1000:>10.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('commands', nargs='*', default=DEFAULT_COMMANDS)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--json', dest='json_path')
+    args = parser.parse_args()
+
+    results = [measure(command, args.runs) for command in args.commands]
+    print_results(results, args.top)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
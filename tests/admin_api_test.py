@@ -0,0 +1,45 @@
+import mock
+import requests
+
+from node_cli.configs.routes import DEFAULT_ROUTE_TIMEOUT, TRANSACTION_ROUTE_TIMEOUT
+from node_cli.utils.admin_api import AdminApiClient, admin_api_client
+from node_cli.utils.metrics import METRICS
+
+
+def test_admin_api_client_shared():
+    assert admin_api_client() is admin_api_client()
+
+
+def test_admin_api_client_retries_only_get():
+    client = AdminApiClient(retries=5)
+    adapter = client.session.get_adapter(client.base_url)
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.is_retry('GET', 503)
+    assert not adapter.max_retries.is_retry('POST', 503)
+
+
+def test_admin_api_client_timeouts_and_metrics():
+    METRICS.reset()
+    client = AdminApiClient()
+    response = requests.Response()
+    response.status_code = 200
+    with mock.patch('requests.Session.get', return_value=response) as get_mock:
+        assert client.get('node', 'info', params={'a': 1}) is response
+        get_mock.assert_called_once_with(
+            'http://localhost:3007/api/v1/node/info',
+            timeout=DEFAULT_ROUTE_TIMEOUT,
+            params={'a': 1}
+        )
+    with mock.patch('requests.Session.post', side_effect=requests.ConnectionError):
+        try:
+            client.post('node', 'register', json={})
+        except requests.ConnectionError:
+            pass
+    with mock.patch('requests.Session.post', return_value=response) as post_mock:
+        client.post('node', 'register', json={})
+        assert post_mock.call_args[1]['timeout'] == TRANSACTION_ROUTE_TIMEOUT
+
+    assert METRICS.get('admin_api.node.info')['count'] == 1
+    register_stats = METRICS.get('admin_api.node.register')
+    assert register_stats['count'] == 2
+    assert register_stats['errors'] == 1
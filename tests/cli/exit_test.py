@@ -16,6 +16,6 @@ def test_exit_status():
         json_data={'payload': payload, 'status': 'ok'}
     )
     result = run_command_mock(
-        'node_cli.utils.helper.requests.get', resp_mock, status, ['--format', 'json'])
+        'node_cli.utils.admin_api.requests.Session.get', resp_mock, status, ['--format', 'json'])
     assert result.exit_code == 0
     assert result.output == "{'status': 'ACTIVE', 'data': [{'name': 'test', 'status': 'ACTIVE'}], 'exit_time': 0}\n" # noqa
@@ -1,7 +1,11 @@
+import json
+
+import mock
 import requests
 
-from tests.helper import response_mock, run_command_mock
-from node_cli.cli.health import containers, schains, sgx
+from tests.helper import response_mock, run_command, run_command_mock
+from node_cli.cli.health import containers, schains, services, sgx
+from node_cli.utils.docker_utils import ServiceState
 
 
 OK_LS_RESPONSE_DATA = {
@@ -42,7 +46,7 @@ def test_containers():
         requests.codes.ok,
         json_data=OK_LS_RESPONSE_DATA
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock, containers)
     assert result.exit_code == 0
     assert result.output == '                 Name                    Status         Started At                       Image               \n-------------------------------------------------------------------------------------------------------------\nskale_schain_shapely-alfecca-meridiana   Running   Jul 31 2020 11:56:35   skalenetwork/schain:1.46-develop.21\nskale_api                                Running   Jul 31 2020 11:55:17   skale-admin:latest                 \n'  # noqa
@@ -69,13 +73,13 @@ def test_checks():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'ok'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock, schains)
 
     assert result.exit_code == 0
     assert result.output == 'sChain Name   Config directory    DKG    Config file   Volume   Container    IMA    Firewall    RPC    Blocks\n-------------------------------------------------------------------------------------------------------------\ntest_schain   True               False   False         False    False       False   False      False   False \n'  # noqa
 
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock, schains, ['--json'])
 
     assert result.exit_code == 0
@@ -94,7 +98,34 @@ def test_sgx_status():
         json_data={'payload': payload, 'status': 'ok'}
     )
     result = run_command_mock(
-        'node_cli.utils.helper.requests.get', resp_mock, sgx)
+        'node_cli.utils.admin_api.requests.Session.get', resp_mock, sgx)
 
     assert result.exit_code == 0
     assert result.output == '\x1b(0lqqqqqqqqqqqqqqqqqqqwqqqqqqqqqqqqqqqqqqqqqqqqk\x1b(B\n\x1b(0x\x1b(B SGX info          \x1b(0x\x1b(B                        \x1b(0x\x1b(B\n\x1b(0tqqqqqqqqqqqqqqqqqqqnqqqqqqqqqqqqqqqqqqqqqqqqu\x1b(B\n\x1b(0x\x1b(B Server URL        \x1b(0x\x1b(B https://127.0.0.1:1026 \x1b(0x\x1b(B\n\x1b(0x\x1b(B SGXWallet Version \x1b(0x\x1b(B 1.50.1-stable.0        \x1b(0x\x1b(B\n\x1b(0x\x1b(B Node SGX keyname  \x1b(0x\x1b(B test_keyname           \x1b(0x\x1b(B\n\x1b(0x\x1b(B Status            \x1b(0x\x1b(B CONNECTED              \x1b(0x\x1b(B\n\x1b(0mqqqqqqqqqqqqqqqqqqqvqqqqqqqqqqqqqqqqqqqqqqqqj\x1b(B\n'  # noqa
+
+
+def test_services():
+    liveness = {
+        'skale-api': ServiceState(
+            'skale-api', 'skale_api', 'running', None, 'Up 1 minute', True
+        ),
+        'redis': ServiceState('redis', None, 'missing', None, '', False)
+    }
+    with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True), \
+            mock.patch('node_cli.core.node.get_node_env', return_value={}), \
+            mock.patch('node_cli.core.health.get_services_liveness', return_value=liveness):
+        result = run_command(services, ['--json'])
+        assert result.exit_code == 1
+        assert json.loads(result.output)['redis'] == {
+            'service': 'redis',
+            'container': None,
+            'state': 'missing',
+            'health': None,
+            'status': '',
+            'alive': False
+        }
+
+        del liveness['redis']
+        result = run_command(services)
+        assert result.exit_code == 0
+        assert 'skale_api' in result.output
@@ -18,6 +18,7 @@
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import freezegun
+import mock
 
 from node_cli.cli.logs import dump
 from node_cli.configs import G_CONF_HOME
@@ -31,3 +32,18 @@ def test_dump(backup_func, removed_containers_folder): # noqa
     result = run_command(dump, [G_CONF_HOME])
     assert result.exit_code == 0
     assert result.output == f'Logs dump created: {TEST_ARCHIVE_PATH}\n'
+
+
+def test_dump_tail():
+    with mock.patch('node_cli.cli.logs.create_logs_dump', return_value='dump.tar.gz') as dump_mock:
+        result = run_command(dump, ['--tail', '0', G_CONF_HOME])
+        assert result.exit_code == 0
+        assert dump_mock.call_args.kwargs['tail'] == 0
+
+        result = run_command(dump, [G_CONF_HOME])
+        assert result.exit_code == 0
+        assert dump_mock.call_args.kwargs['tail'] == 'all'
+
+        result = run_command(dump, ['--tail', '-1', G_CONF_HOME])
+        assert result.exit_code == 2
+        assert dump_mock.call_count == 2
@@ -17,8 +17,14 @@
 #   You should have received a copy of the GNU Affero General Public License
 #   along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import inspect
+import subprocess
+import sys
 
-from node_cli.main import version
+import click
+
+from node_cli.main import cli, version, LAZY_SUBCOMMANDS, SYNC_LAZY_SUBCOMMANDS
+from node_cli.utils.lazy_group import LazyGroup
 from tests.helper import run_command
 
 
@@ -28,3 +34,38 @@ def test_version():
     assert result.output == expected
     result = run_command(version, ['--short'])
     assert result.output == 'test\n'
+
+
+def test_lazy_subcommands():
+    script = inspect.cleandoc('''
+        import sys
+        from click.testing import CliRunner
+        from node_cli.main import cli
+        result = CliRunner().invoke(cli, ['--help'])
+        assert 'wallet' in result.output, result.output
+        assert 'node_cli.cli.wallet' not in sys.modules
+        result = CliRunner().invoke(cli, ['wallet', '--help'])
+        assert 'Get info about SKALE node wallet' in result.output, result.output
+        assert 'node_cli.cli.wallet' in sys.modules
+        assert 'node_cli.cli.node' not in sys.modules
+        assert 'docker' not in sys.modules
+        assert 'jinja2' not in sys.modules
+    ''')
+    res = subprocess.run([sys.executable, '-c', script], capture_output=True)
+    assert res.returncode == 0, res.stderr.decode('utf-8')
+
+
+def test_lazy_subcommands_registered():
+    ctx = click.Context(cli)
+    for name in LAZY_SUBCOMMANDS:
+        assert name in cli.list_commands(ctx)
+    assert cli.get_command(ctx, 'wallet').name == 'wallet'
+    assert cli.get_command(ctx, 'unknown') is None
+
+
+def test_sync_lazy_subcommands():
+    sync_cli = LazyGroup(lazy_subcommands=SYNC_LAZY_SUBCOMMANDS)
+    ctx = click.Context(sync_cli)
+    assert sync_cli.list_commands(ctx) == ['health', 'ssl', 'sync-node']
+    health = sync_cli.get_command(ctx, 'health')
+    assert health.list_commands(ctx) == ['services']
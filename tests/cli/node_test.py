@@ -25,6 +25,7 @@ import requests
 import logging
 
 from node_cli.configs import SKALE_DIR, G_CONF_HOME
+from node_cli.core.iptables import FirewallDiff, FirewallRule
 from node_cli.cli.node import (
     node_info,
     register_node,
@@ -37,7 +38,9 @@ from node_cli.cli.node import (
     _turn_off,
     _turn_on,
     _set_domain_name,
+    configure_firewall,
 )
+from node_cli.utils.compression import CompressionError
 from node_cli.utils.exit_codes import CLIExitCodes
 from node_cli.utils.helper import init_default_logger
 
@@ -58,7 +61,7 @@ def test_register_node(resource_alloc, mocked_g_config):
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             register_node,
             ['--name', 'test-node', '--ip', '0.0.0.0', '--port', '8080', '-d', 'skale.test'],
@@ -77,7 +80,7 @@ def test_register_node_with_error(resource_alloc, mocked_g_config):
     )
     with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             register_node,
             ['--name', 'test-node2', '--ip', '0.0.0.0', '--port', '80', '-d', 'skale.test'],
@@ -91,7 +94,7 @@ def test_register_node_with_prompted_ip(resource_alloc, mocked_g_config):
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             register_node,
             ['--name', 'test-node', '--port', '8080', '-d', 'skale.test'],
@@ -105,7 +108,7 @@ def test_register_node_with_default_port(resource_alloc, mocked_g_config):
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             register_node,
             ['--name', 'test-node', '-d', 'skale.test'],
@@ -118,7 +121,7 @@ def test_register_node_with_default_port(resource_alloc, mocked_g_config):
 def test_register_with_no_alloc(mocked_g_config):
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     result = run_command_mock(
-        'node_cli.utils.helper.requests.post',
+        'node_cli.utils.admin_api.requests.Session.post',
         resp_mock,
         register_node,
         ['--name', 'test-node', '-d', 'skale.test'],
@@ -148,7 +151,7 @@ def test_node_info_node_info():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == '--------------------------------------------------\nNode info\nName: test\nID: 32\nIP: 0.0.0.0\nPublic IP: 1.1.1.1\nPort: 10001\nDomain name: skale.test\nStatus: Active\n--------------------------------------------------\n'  # noqa
 
@@ -173,7 +176,7 @@ def test_node_info_node_info_not_created():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == 'This SKALE node is not registered on SKALE Manager yet\n'
 
@@ -198,7 +201,7 @@ def test_node_info_node_info_frozen():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == '--------------------------------------------------\nNode info\nName: test\nID: 32\nIP: 0.0.0.0\nPublic IP: 1.1.1.1\nPort: 10001\nDomain name: skale.test\nStatus: Frozen\n--------------------------------------------------\n'  # noqa
 
@@ -223,7 +226,7 @@ def test_node_info_node_info_left():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == '--------------------------------------------------\nNode info\nName: test\nID: 32\nIP: 0.0.0.0\nPublic IP: 1.1.1.1\nPort: 10001\nDomain name: skale.test\nStatus: Left\n--------------------------------------------------\n'  # noqa
 
@@ -248,7 +251,7 @@ def test_node_info_node_info_leaving():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == '--------------------------------------------------\nNode info\nName: test\nID: 32\nIP: 0.0.0.0\nPublic IP: 1.1.1.1\nPort: 10001\nDomain name: skale.test\nStatus: Leaving\n--------------------------------------------------\n'  # noqa
 
@@ -273,7 +276,7 @@ def test_node_info_node_info_in_maintenance():
     }
 
     resp_mock = response_mock(requests.codes.ok, json_data={'payload': payload, 'status': 'ok'})
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, node_info)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, node_info)
     assert result.exit_code == 0
     assert result.output == '--------------------------------------------------\nNode info\nName: test\nID: 32\nIP: 0.0.0.0\nPublic IP: 1.1.1.1\nPort: 10001\nDomain name: skale.test\nStatus: In Maintenance\n--------------------------------------------------\n'  # noqa
 
@@ -282,7 +285,9 @@ def test_node_signature():
     signature_sample = '0x1231231231'
     response_data = {'status': 'ok', 'payload': {'signature': signature_sample}}
     resp_mock = response_mock(requests.codes.ok, json_data=response_data)
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, signature, ['1'])
+    result = run_command_mock(
+        'node_cli.utils.admin_api.requests.Session.get', resp_mock, signature, ['1']
+    )
     assert result.exit_code == 0
     assert result.output == f'Signature: {signature_sample}\n'
 
@@ -295,6 +300,32 @@ def test_backup():
     assert 'Backup archive succesfully created ' in result.output
 
 
+def test_backup_incremental_rejects_archive_options():
+    result = run_command(backup_node, ['/tmp', '--incremental', '--compression', 'zstd'])
+    assert result.exit_code == CLIExitCodes.BAD_USER_ERROR
+    assert 'not supported for incremental backup' in result.output
+    result = run_command(backup_node, ['/tmp', '--incremental', '--level', '15'])
+    assert result.exit_code == CLIExitCodes.BAD_USER_ERROR
+    assert 'level should be from 1 to 9' in result.output
+
+
+def test_backup_invalid_level():
+    result = run_command(backup_node, ['/tmp', '--level', '15'])
+    assert result.exit_code == CLIExitCodes.BAD_USER_ERROR
+    assert 'level should be from 1 to 9' in result.output
+
+
+def test_backup_removes_incomplete_archive(tmp_path):
+    def pack_dir(source, dest, **kwargs):
+        pathlib.Path(dest).write_bytes(b'partial')
+        raise CompressionError('pigz exited with code 1')
+
+    with patch('node_cli.core.node.pack_dir', side_effect=pack_dir):
+        result = run_command(backup_node, [str(tmp_path)])
+    assert result.exit_code == CLIExitCodes.OPERATION_EXECUTION_ERROR
+    assert list(tmp_path.iterdir()) == []
+
+
 def test_restore(mocked_g_config):
     pathlib.Path(SKALE_DIR).mkdir(parents=True, exist_ok=True)
     result = run_command(backup_node, ['/tmp'])
@@ -306,7 +337,7 @@ def test_restore(mocked_g_config):
         'subprocess.run', new=subprocess_run_mock
     ), patch('node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE), patch(
         'node_cli.utils.decorators.is_node_inited', return_value=False
-    ):
+    ), patch('node_cli.core.node.wait_for_containers', return_value=True):
         result = run_command(restore_node, [backup_path, './tests/test-env'])
         assert result.exit_code == 0
         assert 'Node is restored from backup\n' in result.output  # noqa
@@ -325,7 +356,7 @@ def test_restore_no_snapshot(mocked_g_config):
         'subprocess.run', new=subprocess_run_mock
     ), patch('node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE), patch(
         'node_cli.utils.decorators.is_node_inited', return_value=False
-    ):
+    ), patch('node_cli.core.node.wait_for_containers', return_value=True):
         result = run_command(restore_node, [backup_path, './tests/test-env', '--no-snapshot'])
         assert result.exit_code == 0
         assert 'Node is restored from backup\n' in result.output  # noqa
@@ -336,7 +367,10 @@ def test_restore_no_snapshot(mocked_g_config):
 def test_maintenance_on():
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     result = run_command_mock(
-        'node_cli.utils.helper.requests.post', resp_mock, set_node_in_maintenance, ['--yes']
+        'node_cli.utils.admin_api.requests.Session.post',
+        resp_mock,
+        set_node_in_maintenance,
+        ['--yes']
     )
     assert result.exit_code == 0
     assert (
@@ -348,7 +382,7 @@ def test_maintenance_on():
 def test_maintenance_off(mocked_g_config):
     resp_mock = response_mock(requests.codes.ok, {'status': 'ok', 'payload': None})
     result = run_command_mock(
-        'node_cli.utils.helper.requests.post', resp_mock, remove_node_from_maintenance
+        'node_cli.utils.admin_api.requests.Session.post', resp_mock, remove_node_from_maintenance
     )
     assert result.exit_code == 0
     assert (
@@ -363,10 +397,10 @@ def test_turn_off_maintenance_on(mocked_g_config):
         'node_cli.core.node.turn_off_op'
     ), mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         with mock.patch(
-            'node_cli.utils.helper.requests.get', return_value=safe_update_api_response()
+            'node_cli.utils.admin_api.requests.Session.get', return_value=safe_update_api_response()
         ):
             result = run_command_mock(
-                'node_cli.utils.helper.requests.post',
+                'node_cli.utils.admin_api.requests.Session.post',
                 resp_mock,
                 _turn_off,
                 ['--maintenance-on', '--yes'],
@@ -377,7 +411,7 @@ def test_turn_off_maintenance_on(mocked_g_config):
             )  # noqa
             assert result.exit_code == 0
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             _turn_off,
             ['--maintenance-on', '--yes'],
@@ -391,10 +425,10 @@ def test_turn_on_maintenance_off(mocked_g_config):
     with mock.patch('subprocess.run', new=subprocess_run_mock), mock.patch(
         'node_cli.core.node.get_flask_secret_key'
     ), mock.patch('node_cli.core.node.turn_on_op'), mock.patch(
-        'node_cli.core.node.is_base_containers_alive'
+        'node_cli.core.node.wait_for_containers'
     ), mock.patch('node_cli.core.node.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             _turn_on,
             ['./tests/test-env', '--maintenance-off', '--sync-schains', '--yes'],
@@ -412,7 +446,7 @@ def test_set_domain_name():
 
     with mock.patch('node_cli.utils.decorators.is_node_inited', return_value=True):
         result = run_command_mock(
-            'node_cli.utils.helper.requests.post',
+            'node_cli.utils.admin_api.requests.Session.post',
             resp_mock,
             _set_domain_name,
             ['-d', 'skale.test', '--yes'],
@@ -435,3 +469,20 @@ def test_node_version(meta_file_v2):
         result.output
         == "{'version': '0.1.1', 'config_stream': 'develop', 'docker_lvmpy_stream': '1.1.2'}\n"
     )  # noqa
+
+
+def test_configure_firewall_dry_run():
+    diff = FirewallDiff(
+        add=[FirewallRule('ACCEPT', protocol='tcp', dport='22', insert=True)],
+        remove=[FirewallRule('ACCEPT', protocol='tcp', dport='8888', insert=True)]
+    )
+    with mock.patch('node_cli.core.node.configure_iptables', return_value=diff) as iptables_mock:
+        result = run_command(configure_firewall, ['--dry-run'])
+    assert result.exit_code == 0
+    assert result.output == '- ACCEPT tcp dport 8888 (insert)\n+ ACCEPT tcp dport 22 (insert)\n'
+    iptables_mock.assert_called_once_with(dry_run=True)
+
+    with mock.patch('node_cli.core.node.configure_iptables', return_value=diff) as iptables_mock:
+        result = run_command(configure_firewall, ['--yes'])
+    assert result.exit_code == 0
+    iptables_mock.assert_called_once_with(force=True)
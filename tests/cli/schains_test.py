@@ -50,7 +50,7 @@ def test_ls():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'ok'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, ls)
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, ls)
     assert result.exit_code == 0
     assert result.output == '    Name       Owner   Size   Lifetime        Created At              Deposit         Generation   Originator\n-------------------------------------------------------------------------------------------------------------\ntest_schain1   0x123   0      5          Oct 03 2019 16:09:45   1000000000000000000   1            0x465     \ncrazy_cats1    0x321   0      5          Oct 07 2019 18:30:10   1000000000000000000   0            0x0       \n'  # noqa
 
@@ -71,12 +71,12 @@ def test_dkg():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'ok'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock, dkg)
     assert result.exit_code == 0
     assert result.output == '  sChain Name      DKG Status          Added At         sChain Status\n---------------------------------------------------------------------\nmelodic-aldhibah   IN_PROGRESS   Jan 08 2020 15:26:52   Exists       \n'  # noqa
 
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock, dkg, ['--all'])
     assert result.exit_code == 0
     assert result.output == '  sChain Name      DKG Status          Added At         sChain Status\n---------------------------------------------------------------------\nmelodic-aldhibah   IN_PROGRESS   Jan 08 2020 15:26:52   Exists       \n'  # noqa
@@ -121,7 +121,7 @@ def test_get_schain_config():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'ok'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               resp_mock,
                               get_schain_config, ['test1'])
     assert result.exit_code == 0
@@ -147,7 +147,7 @@ def test_schain_rules():
         json_data={'payload': payload, 'status': 'ok'}
     )
     result = run_command_mock(
-        'node_cli.utils.helper.requests.get', resp_mock, show_rules, ['schain-test'])
+        'node_cli.utils.admin_api.requests.Session.get', resp_mock, show_rules, ['schain-test'])
     assert result.exit_code == 0
     print(repr(result.output))
     assert result.output == '      IP range          Port \n-----------------------------\n127.0.0.2 - 127.0.0.2   10000\n127.0.0.2 - 127.0.0.2   10001\nAll IPs                 10002\nAll IPs                 10003\n127.0.0.2 - 127.0.0.2   10004\n127.0.0.2 - 127.0.0.2   10005\nAll IPs                 10007\nAll IPs                 10008\nAll IPs                 10009\n'  # noqa
@@ -174,7 +174,7 @@ def test_info():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'ok'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, info_,
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, info_,
                               ['attractive-ed-asich'])
     assert result.output == '       Name                                           Id                                                     Owner                      Part_of_node   Dkg_status   Is_deleted   First_run   Repair_mode\n--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------\nattractive-ed-asich   0xfb3b68013fa494407b691b4b603d84c66076c0a5ac96a7d6b162d7341d74fa61   0x1111111111111111111111111111111111111111   0              3            False        False       False      \n'  # noqa
     assert result.exit_code == 0
@@ -184,7 +184,7 @@ def test_info():
         requests.codes.ok,
         json_data={'payload': payload, 'status': 'error'}
     )
-    result = run_command_mock('node_cli.utils.helper.requests.get', resp_mock, info_,
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get', resp_mock, info_,
                               ['schain not found'])
     assert result.output == f'Command failed with following errors:\n--------------------------------------------------\nerror\n--------------------------------------------------\nYou can find more info in {G_CONF_HOME}.skale/.skale-cli-log/debug-node-cli.log\n'  # noqa
     assert result.exit_code == 3
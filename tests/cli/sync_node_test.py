@@ -38,7 +38,7 @@ def test_init_sync(mocked_g_config):
     pathlib.Path(SKALE_DIR).mkdir(parents=True, exist_ok=True)
     with mock.patch('subprocess.run', new=subprocess_run_mock), mock.patch(
         'node_cli.core.node.init_sync_op'
-    ), mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    ), mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE
     ), mock.patch('node_cli.core.node.configure_firewall_rules'), mock.patch(
         'node_cli.utils.decorators.is_node_inited', return_value=False
@@ -50,7 +50,7 @@ def test_init_sync(mocked_g_config):
 def test_init_sync_archive_catchup(mocked_g_config, clean_node_options):
     pathlib.Path(NODE_DATA_PATH).mkdir(parents=True, exist_ok=True)
     #     with mock.patch('subprocess.run', new=subprocess_run_mock), \
-    with mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    with mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.operations.base.cleanup_volume_artifacts'
     ), mock.patch('node_cli.operations.base.download_skale_node'), mock.patch(
         'node_cli.operations.base.sync_skale_node'
@@ -85,7 +85,7 @@ def test_init_sync_historic_state_fail(mocked_g_config, clean_node_options):
     pathlib.Path(SKALE_DIR).mkdir(parents=True, exist_ok=True)
     with mock.patch('subprocess.run', new=subprocess_run_mock), mock.patch(
         'node_cli.core.node.init_sync_op'
-    ), mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    ), mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE
     ), mock.patch('node_cli.core.node.configure_firewall_rules'), mock.patch(
         'node_cli.utils.decorators.is_node_inited', return_value=False
@@ -100,7 +100,7 @@ def test_update_sync(mocked_g_config):
 
     with mock.patch('subprocess.run', new=subprocess_run_mock), mock.patch(
         'node_cli.core.node.update_sync_op'
-    ), mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    ), mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE
     ), mock.patch('node_cli.core.node.configure_firewall_rules'), mock.patch(
         'node_cli.utils.decorators.is_node_inited', return_value=True
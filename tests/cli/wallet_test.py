@@ -39,7 +39,7 @@ def test_wallet_info():
     response_mock = MagicMock()
     response_mock.status_code = requests.codes.ok
     response_mock.json = Mock(return_value=response_data)
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               response_mock,
                               wallet_info)
     assert result.exit_code == 0
@@ -52,7 +52,7 @@ def test_wallet_info():
     )
     assert result.output == expected
 
-    result = run_command_mock('node_cli.utils.helper.requests.get',
+    result = run_command_mock('node_cli.utils.admin_api.requests.Session.get',
                               response_mock,
                               wallet_info,
                               ['--format', 'json'])
@@ -70,7 +70,7 @@ def test_wallet_send():
         {'status': 'ok', 'payload': None}
     )
     result = run_command_mock(
-        'node_cli.utils.helper.requests.post',
+        'node_cli.utils.admin_api.requests.Session.post',
         resp_mock,
         send,
         ['0x00000000000000000000000000000000', '10', '--yes'])
@@ -84,7 +84,7 @@ def test_wallet_send_with_error():
         {'status': 'error', 'payload': ['Strange error']},
     )
     result = run_command_mock(
-        'node_cli.utils.helper.requests.post',
+        'node_cli.utils.admin_api.requests.Session.post',
         resp_mock,
         send,
         ['0x00000000000000000000000000000000', '10', '--yes'])
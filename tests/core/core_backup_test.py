@@ -0,0 +1,244 @@
+import datetime
+import gzip
+import io
+import json
+import os
+import shutil
+import tarfile
+from pathlib import Path
+
+import mock
+import pytest
+
+from node_cli.core.backup import (
+    compile_excludes,
+    create_incremental_backup,
+    get_chunk_path,
+    is_backup_manifest,
+    iter_tree,
+    pack_dir,
+    restore_archive,
+    restore_from_manifest,
+    BackupIntegrityError,
+    CHECKSUMS_MEMBER
+)
+from node_cli.utils.compression import CompressionError, decompressed_reader, detect_compression
+from node_cli.utils.helper import read_json, save_json
+
+
+@pytest.fixture
+def backup_tree(tmp_dir_path):
+    source = Path(os.path.abspath(tmp_dir_path)) / 'skale'
+    for path in ('data/a', 'data/b', 'log/trash', 'log-keep/c', 'node/log/d'):
+        (source / path).parent.mkdir(parents=True, exist_ok=True)
+        (source / path).write_text(path * 100)
+    (source / 'data/link').symlink_to('a')
+    return source
+
+
+def test_compile_excludes(backup_tree):
+    is_excluded = compile_excludes(backup_tree, [str(backup_tree / 'log')])
+    assert is_excluded('skale/log')
+    assert is_excluded('skale/log/trash')
+    assert not is_excluded('skale/log-keep/c')
+    assert not is_excluded('skale/node/log/d')
+    with pytest.raises(ValueError):
+        compile_excludes(backup_tree, ['log'])
+
+
+def test_iter_tree(backup_tree):
+    is_excluded = compile_excludes(backup_tree, [str(backup_tree / 'log')])
+    names = list(iter_tree(backup_tree, is_excluded))
+    assert names[0] == 'skale'
+    assert 'skale/data/link' in names
+    assert 'skale/log-keep/c' in names
+    assert not any(name.startswith('skale/log/') or name == 'skale/log' for name in names)
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_pack_dir(backup_tree, compression):
+    if compression == 'zstd' and shutil.which('zstd') is None:
+        pytest.skip('zstd is not installed')
+    dest = str(backup_tree.parent / f'backup.{compression}')
+    with mock.patch('shutil.which', side_effect=lambda cmd: None if cmd == 'pigz' else cmd):
+        result = pack_dir(
+            str(backup_tree),
+            dest,
+            exclude=(str(backup_tree / 'log'),),
+            compression=compression,
+            level=1
+        )
+    assert detect_compression(dest) == compression
+    assert result.entries == 10
+    files = ('data/a', 'data/b', 'log-keep/c', 'node/log/d')
+    assert result.size == sum(len(path) * 100 for path in files)
+    assert result.archive_size == os.path.getsize(dest)
+
+    with decompressed_reader(dest) as stream:
+        with tarfile.open(fileobj=stream, mode='r|') as tar:
+            members = {member.name: member for member in tar}
+    assert members['skale/data/link'].issym()
+    assert members['skale/data/a'].size == 600
+    assert 'skale/log/trash' not in members
+    assert list(members)[-1] == CHECKSUMS_MEMBER
+
+
+def test_incremental_backup(backup_tree, tmp_dir_path):
+    backup_dir = os.path.join(os.path.abspath(tmp_dir_path), 'backups')
+    os.makedirs(backup_dir)
+    exclude = (str(backup_tree / 'log'),)
+    (backup_tree / 'data/big').write_bytes(os.urandom(1024) * 10)
+
+    first = create_incremental_backup(str(backup_tree), backup_dir, exclude=exclude)
+    assert first.reused_files == 0
+    assert first.new_chunks == 5
+    assert is_backup_manifest(first.manifest_path)
+
+    (backup_tree / 'data/b').write_text('changed')
+    (backup_tree / 'data/a-copy').write_text('data/a' * 100)
+    with mock.patch('node_cli.core.backup.datetime') as datetime_mock:
+        datetime_mock.datetime.utcnow.return_value = datetime.datetime(2100, 1, 1)
+        second = create_incremental_backup(str(backup_tree), backup_dir, exclude=exclude)
+    assert second.manifest_path != first.manifest_path
+    assert second.reused_files == 4
+    assert second.new_chunks == 1
+
+    dest = os.path.join(os.path.abspath(tmp_dir_path), 'restored')
+    os.makedirs(dest)
+    assert restore_from_manifest(second.manifest_path, dest) == second.entries
+    restored = Path(dest) / 'skale'
+    assert (restored / 'data/b').read_text() == 'changed'
+    assert (restored / 'data/big').read_bytes() == (backup_tree / 'data/big').read_bytes()
+    assert os.readlink(restored / 'data/link') == 'a'
+    assert not (restored / 'log').exists()
+    assert os.stat(restored / 'data/a').st_mtime_ns == os.stat(backup_tree / 'data/a').st_mtime_ns
+
+
+def test_incremental_backup_prunes_unused_chunks(backup_tree, tmp_dir_path):
+    backup_dir = os.path.join(os.path.abspath(tmp_dir_path), 'backups')
+    os.makedirs(backup_dir)
+    first = create_incremental_backup(str(backup_tree), backup_dir)
+    (backup_tree / 'data/b').write_text('changed')
+    second = create_incremental_backup(str(backup_tree), backup_dir)
+    assert second.manifest_path != first.manifest_path
+    assert second.removed_chunks == 0
+
+    os.remove(first.manifest_path)
+    third = create_incremental_backup(str(backup_tree), backup_dir)
+    assert third.removed_chunks == 1
+    dest = os.path.join(os.path.abspath(tmp_dir_path), 'restored')
+    os.makedirs(dest)
+    assert restore_from_manifest(second.manifest_path, dest) == second.entries
+    assert (Path(dest) / 'skale/data/b').read_text() == 'changed'
+
+    with pytest.raises(CompressionError):
+        create_incremental_backup(str(backup_tree), backup_dir, level=15)
+
+
+def test_restore_from_manifest_rejects_unsafe(backup_tree, tmp_dir_path):
+    backup_dir = os.path.join(os.path.abspath(tmp_dir_path), 'backups')
+    result = create_incremental_backup(str(backup_tree), backup_dir)
+    manifest = read_json(result.manifest_path)
+
+    digest = manifest['entries'][-1]['chunks'][0]
+    with open(get_chunk_path(os.path.join(backup_dir, 'chunks'), digest), 'wb') as f:
+        f.write(gzip.compress(b'corrupted'))
+    with pytest.raises(BackupIntegrityError, match='corrupted'):
+        restore_from_manifest(result.manifest_path, os.path.join(tmp_dir_path, 'restored'))
+
+    manifest['entries'][0]['path'] = '../escaped'
+    save_json(result.manifest_path, manifest)
+    with pytest.raises(BackupIntegrityError, match='Unsafe path'):
+        restore_from_manifest(result.manifest_path, os.path.join(tmp_dir_path, 'restored'))
+
+
+def test_restore_archive(backup_tree, tmp_dir_path):
+    archive = str(backup_tree.parent / 'backup.tar.gz')
+    with mock.patch('shutil.which', return_value=None):
+        pack_dir(str(backup_tree), archive, exclude=(str(backup_tree / 'log'),))
+    dest = os.path.join(os.path.abspath(tmp_dir_path), 'restored')
+    os.makedirs(os.path.join(dest, 'skale', 'data'))
+    (Path(dest) / 'skale/data/a').write_text('old')
+    extracted = []
+
+    with mock.patch('shutil.which', return_value=None):
+        result = restore_archive(archive, dest, on_extracted=lambda n, p: extracted.append(n))
+    assert result.verified
+    assert result.entries == len(extracted) == 10
+    restored = Path(dest) / 'skale'
+    assert (restored / 'data/a').read_text() == 'data/a' * 100
+    assert os.readlink(restored / 'data/link') == 'a'
+    assert not (restored / 'log').exists()
+    assert os.listdir(dest) == ['skale']
+
+
+def test_restore_skips_names(backup_tree, tmp_dir_path):
+    archive = str(backup_tree.parent / 'backup.tar.gz')
+    backup_dir = os.path.join(os.path.abspath(tmp_dir_path), 'backups')
+    os.makedirs(backup_dir)
+    with mock.patch('shutil.which', return_value=None):
+        pack_dir(str(backup_tree), archive)
+    manifest_path = create_incremental_backup(str(backup_tree), backup_dir).manifest_path
+
+    for restore in (restore_archive, restore_from_manifest):
+        dest = os.path.join(os.path.abspath(tmp_dir_path), f'restored-{restore.__name__}')
+        os.makedirs(os.path.join(dest, 'skale', 'log'))
+        (Path(dest) / 'skale/log/trash').write_text('local')
+        with mock.patch('shutil.which', return_value=None):
+            restore(archive if restore is restore_archive else manifest_path, dest,
+                    skip=('skale/log',))
+        restored = Path(dest) / 'skale'
+        assert (restored / 'log/trash').read_text() == 'local'
+        assert (restored / 'data/a').read_text() == 'data/a' * 100
+        assert (restored / 'log-keep/c').exists()
+
+
+def write_archive(path, members):
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, data in members:
+            tarinfo = tarfile.TarInfo(name)
+            if isinstance(data, tuple):
+                tarinfo.type, tarinfo.linkname = data
+                tar.addfile(tarinfo)
+                continue
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+
+
+def test_restore_archive_rejects_invalid(tmp_dir_path):
+    tmp_dir_path = os.path.abspath(tmp_dir_path)
+    archive = os.path.join(tmp_dir_path, 'backup.tar.gz')
+    dest = os.path.join(tmp_dir_path, 'restored')
+    checksums = json.dumps({'algorithm': 'sha256', 'files': {'a': '0' * 64}}).encode()
+
+    write_archive(archive, [('a', b'tampered'), (CHECKSUMS_MEMBER, checksums)])
+    with mock.patch('shutil.which', return_value=None):
+        with pytest.raises(BackupIntegrityError, match='mismatched'):
+            restore_archive(archive, dest)
+    assert os.listdir(dest) == []
+
+    for name in ('../escaped', '/escaped'):
+        write_archive(archive, [(name, b'data')])
+        with mock.patch('shutil.which', return_value=None):
+            with pytest.raises(BackupIntegrityError, match='Unsafe path'):
+                restore_archive(archive, dest)
+    assert not os.path.exists(os.path.join(tmp_dir_path, 'escaped'))
+
+    victim = Path(tmp_dir_path, 'victim')
+    victim.write_bytes(b'original')
+    for members in (
+        [('a', (tarfile.SYMTYPE, str(victim))), ('a', b'pwned')],
+        [('a', (tarfile.SYMTYPE, str(victim))), ('b', (tarfile.LNKTYPE, 'a'))],
+        [('a', (tarfile.SYMTYPE, tmp_dir_path)), ('a', (tarfile.DIRTYPE, ''))]
+    ):
+        write_archive(archive, members)
+        with mock.patch('shutil.which', return_value=None):
+            with pytest.raises(BackupIntegrityError):
+                restore_archive(archive, dest)
+        assert victim.read_bytes() == b'original'
+    assert os.listdir(dest) == []
+
+    write_archive(archive, [('a', b'data')])
+    with mock.patch('shutil.which', return_value=None):
+        assert not restore_archive(archive, dest).verified
+    assert Path(dest, 'a').read_bytes() == b'data'
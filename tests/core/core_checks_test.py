@@ -1,5 +1,6 @@
 import os
 import shutil
+import threading
 import time
 from pip._internal import main as pipmain
 
@@ -9,8 +10,14 @@ import pytest
 from node_cli.configs import STATIC_PARAMS_FILEPATH
 
 from node_cli.core.checks import (
+    CheckResult,
     CheckType,
     DockerChecker,
+    DPKG_QUERY_FORMAT,
+    execute_cached_checks,
+    execute_checks,
+    HostFactError,
+    HostFacts,
     generate_report_from_result,
     get_all_checkers,
     get_checks,
@@ -19,6 +26,7 @@ from node_cli.core.checks import (
     MachineChecker,
     merge_reports,
     PackageChecker,
+    reset_packages_cache,
     save_report
 )
 
@@ -158,6 +166,70 @@ def test_checks_machine_check(server_req):
     ]
 
 
+HOST_FACTS_DATA = {
+    'disk_device': 'test-disk',
+    'facts': {
+        'cpu_total': 8,
+        'cpu_physical': 4,
+        'memory': 32 * 1024 ** 3,
+        'swap': 16 * 1024 ** 3,
+        'disk_size': 200 * 1024 ** 3,
+        'docker_version': {'Version': '20.10.7', 'ApiVersion': '1.41'},
+        'compose_version': {
+            'returncode': 0,
+            'output': 'docker-compose version 1.27.4, build 40524192'
+        },
+        'docker_config': {
+            'live-restore': True,
+            'hosts': ['unix:///var/run/skale/docker.sock', 'fd://']
+        }
+    },
+    'errors': {}
+}
+
+
+def test_host_facts_replay(requirements_data):
+    facts = HostFacts.from_dict(HOST_FACTS_DATA)
+    assert facts.to_dict() == HOST_FACTS_DATA
+    with mock.patch('node_cli.core.checks.run_cmd') as run_cmd_mock, \
+            mock.patch('node_cli.core.checks.get_docker_client') as client_mock, \
+            mock.patch('shutil.which', return_value='/usr/bin/docker'), \
+            mock.patch(
+                'node_cli.core.checks.get_packages_info',
+                side_effect=lambda names: {name: None for name in names}
+            ):
+        checkers = get_all_checkers('test-disk', requirements_data, facts=facts)
+        results = execute_checks(get_checks(checkers))
+    run_cmd_mock.assert_not_called()
+    client_mock.assert_not_called()
+    statuses = {r.name: r.status for r in results}
+    for name in (
+        'cpu-total', 'cpu-physical', 'memory', 'swap', 'disk',
+        'docker-engine', 'docker-api', 'docker-compose', 'live-restore', 'docker-hosts'
+    ):
+        assert statuses[name] == 'ok', name
+
+
+def test_host_facts_collected_once():
+    facts = HostFacts('test-disk')
+    with mock.patch('node_cli.core.checks.get_disk_size', return_value=100) as disk_mock:
+        assert facts.get('disk_size') == 100
+        assert facts.get('disk_size') == 100
+    disk_mock.assert_called_once_with('test-disk')
+
+    facts = HostFacts('test-disk')
+    with mock.patch('node_cli.core.checks.get_disk_size', side_effect=ValueError):
+        with pytest.raises(ValueError):
+            facts.get('disk_size')
+    data = facts.to_dict()
+    assert data['errors'] == {'disk_size': 'ValueError()'}
+
+    replayed = HostFacts.from_dict(data)
+    assert replayed.to_dict() == data
+    with pytest.raises(HostFactError, match='ValueError'):
+        replayed.get('disk_size')
+
+
 @pytest.fixture
 def docker_req(requirements_data):
     return requirements_data['docker']
@@ -302,35 +374,39 @@ def package_req(requirements_data):
 def test_checks_apt_package(package_req):
     checker = PackageChecker(package_req)
     res_mock = mock.Mock()
-    res_mock.stdout = b"""Package: test-package
-        Version: 5.2.1-2
-    """
-
-    def run_cmd_mock(*args, **kwargs):
-        return res_mock
-
-    res_mock.returncode = 0
+    res_mock.returncode = 1
+    run_cmd_mock = mock.Mock(return_value=res_mock)
     apt_package_name = 'test-package'
-    with mock.patch('node_cli.core.checks.run_cmd', run_cmd_mock):
-        r = checker._check_apt_package(apt_package_name)
-        assert r.name == apt_package_name
-        assert r.status == 'ok'
 
-    res_mock.stdout = b"""Package: test-package
-        Version: 1.1.1
-    """
+    for version, status in (('5.2.1-2', 'ok'), ('1.1.1', 'failed'), ('2.2.2', 'ok')):
+        reset_packages_cache()
+        res_mock.stdout = f'lvm2\tinstalled\t2.03.11\ntest-package\tinstalled\t{version}\n'.encode()  # noqa
+        with mock.patch('node_cli.core.checks.run_cmd', run_cmd_mock):
+            r = checker._check_apt_package(apt_package_name)
+            assert r.name == apt_package_name
+            assert r.status == status
+            assert r.info['actual_version'] == version
+
+    reset_packages_cache()
+    run_cmd_mock.reset_mock()
+    res_mock.stdout = b'lvm2\tconfig-files\t2.03.11\n'
     with mock.patch('node_cli.core.checks.run_cmd', run_cmd_mock):
-        r = checker._check_apt_package(apt_package_name)
-        assert r.name == 'test-package'
+        r = checker._check_apt_package('lvm2')
         assert r.status == 'failed'
-
-    res_mock.stdout = b"""Package: test-package
-        Version: 2.2.2
-    """
-    with mock.patch('node_cli.core.checks.run_cmd', run_cmd_mock):
+        assert r.info == 'Package lvm2 is not installed'
         r = checker._check_apt_package(apt_package_name)
-        assert r.name == 'test-package'
-        assert r.status == 'ok'
+        assert r.status == 'failed'
+        r = checker._check_apt_package('iptables_persistant')
+        assert r.status == 'failed'
+    run_cmd_mock.assert_called_once_with(
+        [
+            'dpkg-query', '-W', '-f', DPKG_QUERY_FORMAT,
+            'iptables_persistant', 'lvm2', 'test-package'
+        ],
+        check_code=False,
+        separate_stderr=True
+    )
+    reset_packages_cache()
 
 
 def test_get_all_checkers(requirements_data):
@@ -353,6 +429,58 @@ def test_get_checks(requirements_data):
     assert len(checks) == 2
 
 
+def test_execute_checks():
+    def make_check(name, delay):
+        def check():
+            time.sleep(delay)
+            return CheckResult(name=name, status='ok', info=None)
+        check.__name__ = name
+        return check
+
+    checks = [make_check('slow', 0.5), make_check('fast', 0), make_check('hanging', 3)]
+    start = time.monotonic()
+    results = execute_checks(checks, timeout=1)
+    assert time.monotonic() - start < 1.5
+    assert [r.name for r in results] == ['slow', 'fast', 'hanging']
+    assert [r.status for r in results] == ['ok', 'ok', 'error']
+    assert results[0].duration >= 0.5
+    assert results[2].info == 'Timed out after 1s'
+    hanging = [t for t in threading.enumerate() if t.name == 'check-hanging']
+    assert hanging and all(t.daemon for t in hanging)
+
+    report = generate_report_from_result(results)
+    assert report[1] == {'name': 'fast', 'status': 'ok', 'duration': 0}
+    assert report[2] == {'name': 'hanging', 'status': 'error', 'duration': 1}
+
+
+def test_execute_cached_checks(server_req):
+    checker = MachineChecker(server_req, 'test-disk')
+    checks = [c for c in checker.get_checks() if c.func.__name__ in ('cpu_total', 'memory')]
+    cache = {}
+    with mock.patch('node_cli.core.checks.file_content_fingerprint', return_value='boot-1'):
+        results = execute_cached_checks(checks, cache)
+        assert [r.status for r in results] == ['ok', 'ok']
+        assert set(cache) == {'cpu_total', 'memory'}
+
+        with mock.patch.object(HostFacts, 'get', side_effect=ValueError):
+            results = execute_cached_checks(checks, cache)
+        assert [r.status for r in results] == ['ok', 'ok']
+        assert [r.duration for r in results] == [0, 0]
+
+        with mock.patch.object(HostFacts, 'get', side_effect=ValueError):
+            results = execute_cached_checks(checks, cache, ttl=0)
+        assert [r.status for r in results] == ['error', 'error']
+        assert cache == {}
+
+    execute_cached_checks(checks, cache)
+    server_req['cpu_total'] = 10000
+    with mock.patch('node_cli.core.checks.file_content_fingerprint', return_value='boot-2'):
+        execute_cached_checks(checks, cache)
+        results = execute_cached_checks(checks, cache)
+    assert results[0].status == 'failed'
+    assert 'cpu_total' not in cache
+
+
 def test_get_save_report(tmp_dir_path):
     path = os.path.join(tmp_dir_path, 'checks.json')
     report = get_report(path)
@@ -387,3 +515,9 @@ def test_get_static_params(tmp_config_dir):
     tmp_params = get_static_params(config_path=tmp_config_dir)
     assert params['server']['cpu_total'] == 8
     assert params == tmp_params
+
+
+def test_docker_liveness_checks_not_cached(docker_req):
+    checker = DockerChecker(docker_req)
+    assert checker.fingerprint('docker_engine') is None
+    assert checker.fingerprint('docker_api') is None
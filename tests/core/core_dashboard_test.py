@@ -0,0 +1,52 @@
+import json
+import time
+
+import mock
+import pytest
+
+from node_cli.core.dashboard import DASHBOARD_SECTIONS, fetch_dashboard, show_dashboard
+
+
+REQUEST_DELAY = 0.2
+
+
+def slow_get_request(blueprint, method, params=None):
+    time.sleep(REQUEST_DELAY)
+    return 'ok', {'blueprint': blueprint, 'method': method}
+
+
+def test_fetch_dashboard_concurrent():
+    with mock.patch('node_cli.core.dashboard.get_request', slow_get_request):
+        start = time.perf_counter()
+        results = fetch_dashboard()
+        elapsed = time.perf_counter() - start
+    assert elapsed < REQUEST_DELAY * len(DASHBOARD_SECTIONS) / 2
+    assert list(results) == list(DASHBOARD_SECTIONS)
+    assert results['dkg'] == {
+        'status': 'ok',
+        'payload': {'blueprint': 'schains', 'method': 'dkg-statuses'}
+    }
+
+
+def test_show_dashboard_json(capsys):
+    with mock.patch('node_cli.core.dashboard.get_request', slow_get_request):
+        show_dashboard('json')
+    output = json.loads(capsys.readouterr().out)
+    assert list(output) == list(DASHBOARD_SECTIONS)
+    assert output['wallet']['payload'] == {'blueprint': 'wallet', 'method': 'info'}
+
+
+def test_show_dashboard_failed_section(capsys):
+    def get_request(blueprint, method, params=None):
+        if blueprint == 'wallet':
+            return 'error', 'Wallet is unavailable'
+        return 'ok', []
+
+    with mock.patch('node_cli.core.dashboard.get_request', get_request), \
+            mock.patch('node_cli.core.dashboard.SECTION_PRINTERS', {
+                name: lambda payload: None for name in DASHBOARD_SECTIONS
+            }):
+        with pytest.raises(SystemExit) as e:
+            show_dashboard('text')
+    assert e.value.code == 3
+    assert 'Wallet is unavailable' in capsys.readouterr().out
@@ -2,8 +2,10 @@ import os
 import time
 import shlex
 import shutil
+import tarfile
 from datetime import datetime
 
+import mock
 import pytest
 import freezegun
 
@@ -96,3 +98,24 @@ def test_create_logs_dump_one_container(backup_func, skale_container, removed_co
         TEST_DUMP_DIR_PATH, 'containers', f'{TEST_SKALE_NAME}.log'
     )
     assert not os.path.isfile(test_container_log_path)
+
+
+@freezegun.freeze_time(CURRENT_DATETIME)
+def test_create_logs_dump_streaming(backup_func, removed_containers_folder):
+    containers = [mock.Mock() for _ in range(3)]
+    for i, container in enumerate(containers):
+        container.name = f'skale_test_{i}'
+        container.logs.return_value = (line for line in [f'Log {i}\n'.encode()])
+    since = datetime(2020, 7, 1)
+    with mock.patch('node_cli.core.logs.get_containers', return_value=containers):
+        archive_path = create_logs_dump(G_CONF_HOME, since=since, tail=100)
+
+    assert archive_path == TEST_ARCHIVE_PATH
+    assert not os.path.exists(TEST_DUMP_DIR_PATH)
+    containers[0].logs.assert_called_once_with(
+        stream=True, follow=False, since=since, until=None)
+    with tarfile.open(archive_path) as tar:
+        names = tar.getnames()
+        assert {'containers', 'cli', 'removed_containers'}.issubset(names)
+        log = tar.extractfile('containers/skale_test_2.log').read()
+    assert log == b'Log 2\n' + b'=' * 80 + b'\n' + b'Log 2\n'
@@ -11,7 +11,11 @@ import requests
 
 from node_cli.configs import NODE_DATA_PATH
 from node_cli.configs.resource_allocation import RESOURCE_ALLOCATION_FILEPATH
-from node_cli.core.node import BASE_CONTAINERS_AMOUNT, is_base_containers_alive
+from node_cli.utils.docker_utils import (
+    BASE_COMPOSE_SERVICES,
+    COMPOSE_SERVICE_LABEL,
+    get_services_liveness
+)
 from node_cli.core.node import init, pack_dir, update, is_update_safe, repair_sync
 
 from tests.helper import response_mock, safe_update_api_response, subprocess_run_mock
@@ -24,12 +28,19 @@ HELLO_WORLD_IMAGE_NAME = 'hello-world'
 CMD = 'sleep 10'
 
 
+def run_service_container(service, image=ALPINE_IMAGE_NAME, command=CMD):
+    return dclient.containers.run(
+        image,
+        detach=True,
+        name=f'skale_test_{service}',
+        command=command,
+        labels={COMPOSE_SERVICE_LABEL: service}
+    )
+
+
 @pytest.fixture
 def skale_base_containers():
-    containers = [
-        dclient.containers.run(ALPINE_IMAGE_NAME, detach=True, name=f'skale_test{i}', command=CMD)
-        for i in range(BASE_CONTAINERS_AMOUNT)
-    ]
+    containers = [run_service_container(service) for service in BASE_COMPOSE_SERVICES]
     yield containers
     for c in containers:
         c.remove(force=True)
@@ -37,10 +48,7 @@ def skale_base_containers():
 
 @pytest.fixture
 def skale_base_containers_without_one():
-    containers = [
-        dclient.containers.run(ALPINE_IMAGE_NAME, detach=True, name=f'skale_test{i}', command=CMD)
-        for i in range(BASE_CONTAINERS_AMOUNT - 1)
-    ]
+    containers = [run_service_container(service) for service in BASE_COMPOSE_SERVICES[:-1]]
     yield containers
     for c in containers:
         c.remove(force=True)
@@ -49,8 +57,8 @@ def skale_base_containers_without_one():
 @pytest.fixture
 def skale_base_containers_exited():
     containers = [
-        dclient.containers.run(HELLO_WORLD_IMAGE_NAME, detach=True, name=f'skale_test{i}')
-        for i in range(BASE_CONTAINERS_AMOUNT)
+        run_service_container(service, image=HELLO_WORLD_IMAGE_NAME, command=None)
+        for service in BASE_COMPOSE_SERVICES
     ]
     time.sleep(10)
     yield containers
@@ -100,22 +108,28 @@ def test_pack_dir(tmp_dir):
         pack_dir(backup_dir, cleaned_archive_path, exclude=('trash_data',))
 
 
-def test_is_base_containers_alive(skale_base_containers):
+def is_alive(liveness):
+    return all(state.alive for state in liveness.values())
+
+
+def test_get_services_liveness(skale_base_containers):
     cont = skale_base_containers
     print([c.name for c in cont])
-    assert is_base_containers_alive()
+    assert is_alive(get_services_liveness({}))
 
 
-def test_is_base_containers_alive_one_failed(skale_base_containers_without_one):
-    assert not is_base_containers_alive()
+def test_get_services_liveness_one_failed(skale_base_containers_without_one):
+    liveness = get_services_liveness({})
+    assert not is_alive(liveness)
+    assert liveness[BASE_COMPOSE_SERVICES[-1]].state == 'missing'
 
 
-def test_is_base_containers_alive_exited(skale_base_containers_exited):
-    assert not is_base_containers_alive()
+def test_get_services_liveness_exited(skale_base_containers_exited):
+    assert not is_alive(get_services_liveness({}))
 
 
-def test_is_base_containers_alive_empty():
-    assert not is_base_containers_alive()
+def test_get_services_liveness_empty():
+    assert not is_alive(get_services_liveness({}))
 
 
 @pytest.fixture
@@ -147,7 +161,7 @@ def test_init_node(no_resource_file):  # todo: write new init node test
         'node_cli.core.host.init_data_dir'
     ), mock.patch('node_cli.core.node.configure_firewall_rules'), mock.patch(
         'node_cli.core.node.init_op'
-    ), mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    ), mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.utils.helper.post_request', resp_mock
     ):
         init(env_filepath)
@@ -164,31 +178,60 @@ def test_update_node(mocked_g_config, resource_file):
         'node_cli.core.node.save_env_params'
     ), mock.patch('node_cli.core.node.configure_firewall_rules'), mock.patch(
         'node_cli.core.host.prepare_host'
-    ), mock.patch('node_cli.core.node.is_base_containers_alive', return_value=True), mock.patch(
+    ), mock.patch('node_cli.core.node.wait_for_containers', return_value=True), mock.patch(
         'node_cli.utils.helper.post_request', resp_mock
     ), mock.patch('node_cli.core.resources.get_disk_size', return_value=BIG_DISK_SIZE), mock.patch(
         'node_cli.core.host.init_data_dir'
     ):
         with mock.patch(
-            'node_cli.utils.helper.requests.get', return_value=safe_update_api_response()
+            'node_cli.utils.admin_api.requests.Session.get', return_value=safe_update_api_response()
         ):  # noqa
             result = update(env_filepath, pull_config_for_schain=None)
             assert result is None
 
 
+def test_update_node_prestage(mocked_g_config, resource_file):
+    env_filepath = './tests/test-env'
+    os.makedirs(NODE_DATA_PATH, exist_ok=True)
+    with mock.patch('subprocess.run', new=subprocess_run_mock), mock.patch(
+        'node_cli.core.node.update_op'
+    ) as update_op_mock, mock.patch(
+        'node_cli.core.node.prestage_op', return_value=True
+    ) as prestage_op_mock, mock.patch('node_cli.core.node.get_flask_secret_key'), mock.patch(
+        'node_cli.core.node.save_env_params'
+    ) as save_env_mock, mock.patch(
+        'node_cli.core.node.configure_firewall_rules'
+    ) as firewall_mock, mock.patch(
+        'node_cli.core.node.is_update_safe'
+    ) as update_safe_mock, mock.patch('node_cli.core.host.init_data_dir'):
+        update(env_filepath, pull_config_for_schain=None, prestage=True)
+        save_env_mock.assert_not_called()
+        assert prestage_op_mock.call_count == 1
+        assert prestage_op_mock.call_args[0][0]['ENV_TYPE']
+        update_op_mock.assert_not_called()
+        firewall_mock.assert_not_called()
+        update_safe_mock.assert_not_called()
+
+
 def test_is_update_safe():
     assert not is_update_safe()
-    with mock.patch('node_cli.utils.helper.requests.get', return_value=safe_update_api_response()):
+    with mock.patch(
+        'node_cli.utils.admin_api.requests.Session.get',
+        return_value=safe_update_api_response()
+    ):
         assert is_update_safe()
 
     with mock.patch(
-        'node_cli.utils.helper.requests.get', return_value=safe_update_api_response(safe=False)
+        'node_cli.utils.admin_api.requests.Session.get',
+        return_value=safe_update_api_response(safe=False)
     ):
         assert not is_update_safe()
 
 
-def test_repair_sync(tmp_sync_datadir, mocked_g_config, resource_file):
-    with mock.patch('node_cli.core.schains.rm_btrfs_subvolume'), \
+def test_repair_sync(tmp_sync_datadir, mocked_g_config, resource_file, capsys):
+    with mock.patch('node_cli.core.schains.rm_btrfs_subvolumes'), \
+         mock.patch('node_cli.core.schains.btrfs_subvolume_sync'), \
          mock.patch('node_cli.utils.docker_utils.stop_container'), \
          mock.patch('node_cli.utils.docker_utils.start_container'):
         repair_sync(archive=True, catchup=True, historic_state=True, snapshot_from='127.0.0.1')
+    assert 'Removed 0 subvolumes' in capsys.readouterr().out
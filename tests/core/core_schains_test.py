@@ -1,12 +1,20 @@
 import os
 import datetime
+import gzip
 from unittest import mock
 from pathlib import Path
 
 
 import freezegun
-
-from node_cli.core.schains import cleanup_sync_datadir, toggle_schain_repair_mode
+import pytest
+
+from node_cli.core.schains import (
+    cleanup_sync_datadir,
+    get_block_number_from_path,
+    restore_schain_from_snapshot,
+    toggle_schain_repair_mode,
+    wait_for_reclaimed_space
+)
 from node_cli.utils.helper import read_json
 
 
@@ -85,6 +93,78 @@ def test_cleanup_sync_datadir(tmp_sync_datadir):
             hash_path = snapshot_folder.joinpath('snapshot_hash.txt')
             hash_path.touch()
 
-    with mock.patch('node_cli.core.schains.rm_btrfs_subvolume'):
-        cleanup_sync_datadir(schain_name, base_path=tmp_sync_datadir)
+    with mock.patch('node_cli.core.schains.rm_btrfs_subvolumes') as rm_mock, \
+            mock.patch('node_cli.core.schains.btrfs_subvolume_sync') as sync_mock, \
+            mock.patch('node_cli.core.schains.get_free_space', side_effect=[100, 300]):
+        result = cleanup_sync_datadir(schain_name, base_path=tmp_sync_datadir, batch_size=5)
         assert not os.path.isdir(base_folder)
+        sync_mock.assert_not_called()
+        assert result.reclaimed is None
+        result = wait_for_reclaimed_space(result, base_path=tmp_sync_datadir)
+    assert result.subvolumes == len(snapshots) * len(snapshot_content)
+    assert result.paths == len(folders) - 1 + len(regular_files) + len(snapshots)
+    assert [len(c.args[0]) for c in rm_mock.call_args_list] == [5, 5, 2]
+    assert rm_mock.call_args_list[-1].kwargs == {'commit': True}
+    sync_mock.assert_called_once_with(tmp_sync_datadir)
+    assert result.reclaimed == 200
+
+
+def test_get_block_number_from_path():
+    assert get_block_number_from_path('/tmp/snapshot-1000.bin') == 1000
+    assert get_block_number_from_path('/tmp/snapshot-1000.bin.zst') == 1000
+    assert get_block_number_from_path('-') == -1
+
+
+def test_restore_schain_from_snapshot(tmp_dir_path):
+    volume_path = Path(os.path.abspath(tmp_dir_path)) / 'volume'
+    snapshot_path = Path(os.path.abspath(tmp_dir_path)) / 'snapshot-100.bin.gz'
+    snapshot_path.write_bytes(gzip.compress(b'btrfs-stream'))
+    subvolumes = ['28e07f34', 'blocks_5.db', 'filestorage', 'prices_5.db']
+    received = []
+
+    def receive(src_path, stream):
+        received.append(stream.read())
+        for subvolume in subvolumes:
+            (volume_path / subvolume).mkdir(parents=True)
+
+    with mock.patch('node_cli.core.schains.ensure_schain_volume'), \
+            mock.patch('node_cli.core.schains.get_node_id', return_value=1), \
+            mock.patch('node_cli.core.schains.mount'), \
+            mock.patch('node_cli.core.schains.volume_mountpoint', return_value=str(volume_path)), \
+            mock.patch('node_cli.core.schains.btrfs_receive_stream', side_effect=receive), \
+            mock.patch('shutil.which', return_value=None), \
+            mock.patch('node_cli.core.schains.btrfs_set_readonly_false') as set_rw_mock, \
+            mock.patch('node_cli.core.schains.make_btrfs_snapshot') as snapshot_mock:
+        timings = restore_schain_from_snapshot('test', str(snapshot_path), env_type='devnet')
+
+    assert received == [b'btrfs-stream']
+    assert list(timings) == ['receive', 'migrate', 'snapshots']
+    assert set_rw_mock.call_count == len(subvolumes)
+    assert sorted(os.listdir(volume_path)) == [
+        '28e07f34', 'blocks_1.db', 'filestorage', 'prices_1.db', 'snapshots'
+    ]
+    assert sorted(call.args[1] for call in snapshot_mock.call_args_list) == [
+        str(volume_path / 'snapshots' / '100' / name)
+        for name in ['28e07f34', 'blocks_1.db', 'filestorage', 'prices_1.db']
+    ]
+
+
+def test_restore_schain_from_snapshot_missing_parent(tmp_dir_path):
+    volume_path = Path(os.path.abspath(tmp_dir_path)) / 'volume'
+    volume_path.mkdir()
+    manifest_path = Path(os.path.abspath(tmp_dir_path)) / 'snapshot-200.manifest.json'
+    manifest = {'block_number': 200, 'parent_block_number': 100}
+
+    with mock.patch('node_cli.core.schains.read_snapshot_manifest', return_value=manifest), \
+            mock.patch('node_cli.core.schains.is_volume_exists', return_value=True), \
+            mock.patch('node_cli.core.schains.ensure_schain_volume'), \
+            mock.patch('node_cli.core.schains.get_node_id', return_value=1), \
+            mock.patch('node_cli.core.schains.mount'), \
+            mock.patch('node_cli.core.schains.volume_mountpoint', return_value=str(volume_path)), \
+            mock.patch('node_cli.core.schains.btrfs_receive_stream') as receive_mock, \
+            mock.patch('node_cli.core.schains.error_exit', side_effect=SystemExit) as exit_mock:
+        with pytest.raises(SystemExit):
+            restore_schain_from_snapshot('test', str(manifest_path), env_type='devnet')
+
+    assert 'block 100' in exit_mock.call_args.args[0]
+    receive_mock.assert_not_called()
@@ -0,0 +1,117 @@
+import os
+import shutil
+from pathlib import Path
+
+import mock
+import pytest
+
+from node_cli.core.snapshots import (
+    ChunkedWriter,
+    export_snapshot,
+    get_send_cmd,
+    open_snapshot_stream,
+    remove_stale_exports,
+    SnapshotIntegrityError
+)
+from node_cli.utils.helper import read_json
+
+
+SUBVOLUMES = ['28e07f34', 'blocks_0.db', 'filestorage']
+
+
+@pytest.fixture
+def schain_volume(tmp_dir_path):
+    volume = Path(os.path.abspath(tmp_dir_path)) / 'volume'
+    for block_number in ('100', '200'):
+        for subvolume in SUBVOLUMES:
+            (volume / 'snapshots' / block_number / subvolume).mkdir(parents=True)
+        (volume / 'snapshots' / block_number / 'snapshot_hash.txt').touch()
+    return volume
+
+
+def test_chunked_writer(tmp_dir_path):
+    base_path = os.path.join(tmp_dir_path, 'stream')
+    writer = ChunkedWriter(base_path, chunk_size=10)
+    writer.write(b'a' * 15)
+    writer.write(b'b' * 5)
+    writer.write(b'c' * 3)
+    writer.close()
+    assert [chunk['size'] for chunk in writer.chunks] == [10, 10, 3]
+    assert Path(f'{base_path}.00001').read_bytes() == b'a' * 5 + b'b' * 5
+
+
+def test_get_send_cmd(schain_volume):
+    export_path = str(schain_volume / 'snapshots' / '200')
+    parent_path = str(schain_volume / 'snapshots' / '100')
+    assert get_send_cmd(export_path) == [
+        'btrfs', 'send', '-q', *[os.path.join(export_path, s) for s in SUBVOLUMES]
+    ]
+    cmd = get_send_cmd(export_path, parent_path)
+    assert cmd.count('-c') == len(SUBVOLUMES)
+    assert cmd[-1] == os.path.join(export_path, SUBVOLUMES[-1])
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_export_snapshot(schain_volume, tmp_dir_path, compression):
+    if compression == 'zstd' and shutil.which('zstd') is None:
+        pytest.skip('zstd is not installed')
+    stream_path = os.path.join(tmp_dir_path, 'send-stream')
+    data = os.urandom(1024) * 64
+    with open(stream_path, 'wb') as f:
+        f.write(data)
+    output_dir = os.path.join(tmp_dir_path, 'export')
+
+    def export(**kwargs):
+        return export_snapshot(
+            str(schain_volume), output_dir, compression=compression, chunk_size=4096, **kwargs
+        )
+
+    with mock.patch('node_cli.core.snapshots.make_readonly_snapshot',
+                    side_effect=lambda src, dst: os.mkdir(dst)), \
+            mock.patch('node_cli.core.snapshots.delete_subvolume', side_effect=os.rmdir), \
+            mock.patch('node_cli.core.snapshots.get_send_cmd',
+                       return_value=['cat', stream_path]) as send_cmd_mock, \
+            mock.patch('shutil.which', side_effect=lambda cmd: None if cmd == 'pigz' else cmd):
+        first = export(block_number=100)
+        assert send_cmd_mock.call_args[0][1] is None
+        second = export(incremental=True)
+        assert send_cmd_mock.call_args[0][1] == str(schain_volume / '.exports' / '100')
+        assert os.listdir(schain_volume / '.exports') == ['200']
+        full = export_snapshot(
+            str(schain_volume), f'{output_dir}-full', compression=compression, chunk_size=4096
+        )
+        assert full.parent_block_number is None
+        assert first.parent_block_number is None
+        assert second.block_number == 200
+        assert second.parent_block_number == 100
+
+        manifest = read_json(second.manifest_path)
+        assert os.path.basename(second.manifest_path) == 'snapshot-200.manifest.json'
+        assert manifest['subvolumes'] == SUBVOLUMES
+        assert len(manifest['chunks']) == second.chunks
+        assert sum(chunk['size'] for chunk in manifest['chunks']) == second.size
+        with open_snapshot_stream(second.manifest_path) as stream:
+            assert stream.read() == data
+
+        with open(os.path.join(output_dir, manifest['chunks'][-1]['name']), 'r+b') as f:
+            f.write(b'corrupted')
+        consumed = []
+        with pytest.raises(SnapshotIntegrityError, match='corrupted'):
+            with open_snapshot_stream(second.manifest_path) as stream:
+                consumed.append(stream.read())
+        assert consumed == []
+
+        os.remove(os.path.join(output_dir, manifest['chunks'][0]['name']))
+        with pytest.raises(SnapshotIntegrityError, match='missing'):
+            with open_snapshot_stream(second.manifest_path) as stream:
+                consumed.append(stream.read())
+        assert consumed == []
+
+
+def test_remove_stale_exports(schain_volume):
+    exports_path = schain_volume / '.exports'
+    for block_number in ('100', '200', '300'):
+        (exports_path / block_number / 'filestorage').mkdir(parents=True)
+    with mock.patch('node_cli.core.snapshots.delete_subvolume', side_effect=os.rmdir):
+        remove_stale_exports(str(schain_volume), keep=200)
+    assert sorted(os.listdir(exports_path)) == ['200', '300']
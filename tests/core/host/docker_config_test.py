@@ -1,13 +1,17 @@
+import importlib
 import json
 import os
 import pathlib
 import shutil
+import socket
 from contextlib import contextmanager
 from timeit import default_timer as timer
 from node_cli.core.docker_config import get_docker_group_id, save_docker_group_id
 
+import mock
 import pytest
 
+from node_cli.core import docker_config
 from node_cli.core.docker_config import (
     assert_no_containers,
     ContainersExistError,
@@ -160,3 +164,11 @@ def test_get_save_group_id():
     save_docker_group_id(gid)
     with open(NODE_DOCKER_CONFIG_PATH) as config_path:
         assert json.load(config_path)['docker_group_id'] == gid
+
+
+def test_import_does_no_socket_io():
+    with mock.patch.object(socket.socket, 'connect') as connect_mock, \
+            mock.patch('docker.from_env') as from_env_mock:
+        importlib.reload(docker_config)
+    connect_mock.assert_not_called()
+    from_env_mock.assert_not_called()
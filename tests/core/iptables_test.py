@@ -1,8 +1,21 @@
+import os
 import socket
+from types import SimpleNamespace
 
 import mock
 
-from node_cli.core.iptables import allow_ssh, get_ssh_port
+from node_cli.core.iptables import (
+    configure_iptables,
+    get_firewall_diff,
+    get_firewall_plan,
+    get_ssh_port,
+    ChainReconciler,
+    FirewallDiff,
+    FirewallRule,
+    BASE_POLICIES,
+    ALLOWED_INCOMING_TCP_PORTS,
+    ALLOWED_INCOMING_UDP_PORTS
+)
 
 
 def test_get_ssh_port():
@@ -12,7 +25,76 @@ def test_get_ssh_port():
         assert get_ssh_port() == 22
 
 
-def test_allow_ssh():
-    chain = mock.Mock()
-    chain.rules = []
-    allow_ssh(chain)
+def test_get_firewall_plan():
+    plan = get_firewall_plan(ssh_port=2222)
+    assert FirewallRule('ACCEPT', protocol='tcp', dport='2222', insert=True) in plan
+    inserted = [rule for rule in plan if rule.insert]
+    assert len(inserted) == len(ALLOWED_INCOMING_TCP_PORTS) + len(ALLOWED_INCOMING_UDP_PORTS) + 1
+    assert plan[-2:] == [FirewallRule('DROP', protocol='tcp'), FirewallRule('DROP', protocol='udp')]
+
+
+def test_get_firewall_diff():
+    plan = get_firewall_plan(ssh_port=22)
+    old_rule = FirewallRule('ACCEPT', protocol='tcp', dport='8888', insert=True)
+    with mock.patch('node_cli.core.iptables.to_iptc_rule', side_effect=lambda r: r):
+        diff = get_firewall_diff(plan[1:] + [old_rule], plan, plan + [old_rule])
+    assert diff.add == [plan[0]]
+    assert diff.remove == [old_rule]
+
+
+def test_configure_iptables(tmp_dir_path):
+    plan_path = os.path.join(tmp_dir_path, 'firewall_plan.json')
+    with mock.patch('node_cli.core.iptables.iptc') as iptc_mock, \
+            mock.patch('node_cli.core.iptables.IPTABLES_DIR', tmp_dir_path), \
+            mock.patch('node_cli.core.iptables.FIREWALL_PLAN_FILEPATH', plan_path), \
+            mock.patch('node_cli.core.iptables.save_iptables_rules_state') as save_mock:
+        iptc_mock.Rule.side_effect = lambda: mock.Mock()
+        chain = iptc_mock.Chain.return_value
+        chain.rules = []
+
+        diff = configure_iptables(dry_run=True)
+        assert len(diff.add) == len(get_firewall_plan())
+        chain.insert_rule.assert_not_called()
+        assert not os.path.isfile(plan_path)
+
+        diff = configure_iptables()
+        table = iptc_mock.Table.return_value
+        assert table.autocommit is True
+        table.commit.assert_called_once()
+        assert chain.set_policy.call_count == 3
+        tcp_ports = len(ALLOWED_INCOMING_TCP_PORTS) + 1
+        assert chain.insert_rule.call_count == tcp_ports + len(ALLOWED_INCOMING_UDP_PORTS)
+        assert chain.append_rule.call_count == 7
+        save_mock.assert_called_once()
+        assert os.path.isfile(plan_path)
+
+        chain.get_policy.return_value.name = 'ACCEPT'
+        assert configure_iptables() is not None
+        assert table.commit.call_count == 2
+
+        chain.get_policy.side_effect = lambda: SimpleNamespace(
+            name=BASE_POLICIES[iptc_mock.Chain.call_args[0][1]]
+        )
+        with mock.patch('node_cli.core.iptables.get_firewall_diff',
+                        return_value=FirewallDiff([], [])):
+            assert configure_iptables() is None
+            assert table.commit.call_count == 2
+            assert configure_iptables(force=True) is not None
+            assert table.commit.call_count == 3
+
+
+def test_chain_reconciler():
+    existing_rule, new_rule, appended_rule = mock.Mock(), mock.Mock(), mock.Mock()
+    with mock.patch('node_cli.core.iptables.iptc') as iptc_mock:
+        chain = iptc_mock.Chain.return_value
+        chain.rules = [existing_rule]
+        reconciler = ChainReconciler(iptc_mock.Table.return_value, 'INPUT')
+        reconciler.delete_rule(existing_rule)
+        reconciler.insert_rule(new_rule)
+        reconciler.append_rule(appended_rule)
+        assert reconciler.rules == [new_rule, appended_rule]
+        chain.insert_rule.assert_not_called()
+        reconciler.apply()
+    chain.delete_rule.assert_called_once_with(existing_rule)
+    chain.insert_rule.assert_called_once_with(new_rule)
+    chain.append_rule.assert_called_once_with(appended_rule)
@@ -1,3 +1,4 @@
+import gzip
 import os
 import time
 from time import sleep
@@ -6,11 +7,33 @@ import mock
 import pytest
 
 from node_cli.utils.docker_utils import (
+    docker_client,
     docker_cleanup,
+    get_compose_services,
+    get_container_summaries,
+    get_compose_images,
+    get_containers_filters,
+    get_services_states,
+    is_container_exists,
+    reset_containers_cache,
+    remove_containers,
+    rm_container,
+    reset_docker_clients,
+    wait_for_compose_services,
+    pull_images,
+    BASE_COMPOSE_SERVICES,
+    ContainersNotReadyError,
+    ImagePullError,
+    ImagePullProgress,
+    ContainersRemovalError,
+    ContainerSummary,
+    ComposeInterpolationError,
+    interpolate_compose_value,
     save_container_logs,
     safe_rm
 )
 from node_cli.configs import REMOVED_CONTAINERS_FOLDER_PATH
+from node_cli.operations.skale_node import prestage_images
 
 
 @pytest.fixture
@@ -77,6 +100,42 @@ def test_save_container_logs(simple_container, tmp_dir_path):
     ]
 
 
+def log_stream_container(lines_number):
+    logs = b''.join(f'Test {i}\n'.encode() for i in range(lines_number))
+    container = mock.Mock()
+    # chunks are not aligned with lines
+    container.logs.return_value = iter(logs[i:i + 7] for i in range(0, len(logs), 7))
+    return container
+
+
+def test_save_container_logs_streaming(tmp_dir_path):
+    separator = ['=' * 80 + '\n']
+    log_path = os.path.join(tmp_dir_path, 'stream.log')
+    container = log_stream_container(20)
+    save_container_logs(container, log_path, head=3, tail=4)
+    container.logs.assert_called_once_with(
+        stream=True, follow=False, since=None, until=None)
+    with open(log_path) as log_file:
+        assert log_file.readlines() == [f'Test {i}\n' for i in range(3)] + separator + \
+            [f'Test {i}\n' for i in range(16, 20)]
+
+    save_container_logs(log_stream_container(5), log_path, head=3, tail='all')
+    with open(log_path) as log_file:
+        assert log_file.readlines() == [f'Test {i}\n' for i in range(3)] + separator + \
+            [f'Test {i}\n' for i in range(5)]
+
+    save_container_logs(log_stream_container(2), log_path, head=3, tail='all')
+    with open(log_path) as log_file:
+        assert log_file.readlines() == [f'Test {i}\n' for i in range(2)] + separator + \
+            [f'Test {i}\n' for i in range(2)]
+
+    gz_path = os.path.join(tmp_dir_path, 'stream.log.gz')
+    save_container_logs(log_stream_container(10), gz_path, head=2, tail=2, compress=True)
+    with gzip.open(gz_path, 'rt') as log_file:
+        assert log_file.readlines() == ['Test 0\n', 'Test 1\n'] + separator + \
+            ['Test 8\n', 'Test 9\n']
+
+
 def test_safe_rm(simple_container, removed_containers_folder):
     sleep(10)
     safe_rm(simple_container)
@@ -102,3 +161,296 @@ def test_docker_cleanup(dclient, simple_container):
 
     with mock.patch('node_cli.utils.docker_utils.run_cmd', side_effect=ValueError):
         docker_cleanup(dclient=dclient)
+
+
+def test_docker_client_cached():
+    reset_docker_clients()
+    with mock.patch('docker.from_env') as from_env_mock, \
+            mock.patch('docker.DockerClient') as client_mock:
+        assert docker_client() is docker_client()
+        from_env_mock.assert_called_once()
+        custom_url = 'unix:///var/run/skale/docker.sock'
+        assert docker_client(custom_url) is docker_client(custom_url)
+        client_mock.assert_called_once_with(base_url=custom_url)
+        assert docker_client(custom_url) is not docker_client()
+        reset_docker_clients()
+        docker_client()
+        assert from_env_mock.call_count == 2
+    reset_docker_clients()
+
+
+def test_remove_containers():
+    containers = [mock.Mock() for _ in range(4)]
+    for i, c in enumerate(containers):
+        c.name = f'skale_schain_test{i}'
+
+    def slow_rm(container, timeout):
+        sleep(0.5)
+        if container.name == 'skale_schain_test3':
+            raise ValueError('Stop failed')
+
+    with mock.patch('node_cli.utils.docker_utils.safe_rm', slow_rm):
+        start = time.perf_counter()
+        results = remove_containers(containers[:3], timeout=1, workers=3)
+        assert time.perf_counter() - start < 1
+        assert [r.name for r in results] == [c.name for c in containers[:3]]
+        assert all(r.error is None and r.duration >= 0.5 for r in results)
+
+        with pytest.raises(ContainersRemovalError, match='skale_schain_test3'):
+            remove_containers(containers, timeout=1, workers=2)
+    assert remove_containers([], timeout=1) == []
+
+
+def test_get_containers_filters():
+    assert get_containers_filters() == {}
+    assert get_containers_filters(
+        name='^skale_',
+        labels={'com.docker.compose.service': 'nginx', 'skale': None},
+        status='running'
+    ) == {
+        'name': '^skale_',
+        'label': ['com.docker.compose.service=nginx', 'skale'],
+        'status': 'running'
+    }
+
+
+def test_get_container_summaries():
+    reset_containers_cache()
+    client = mock.Mock()
+    client.api.containers.return_value = [
+        {'Names': ['/skale_admin'], 'Id': '0x1', 'State': 'running'}
+    ]
+    with mock.patch('node_cli.utils.docker_utils.docker_client', return_value=client):
+        summaries = get_container_summaries(name='^skale_')
+        assert summaries[0].name == 'skale_admin'
+        assert summaries[0].id == '0x1'
+        assert summaries[0].state == 'running'
+        client.api.containers.assert_called_once_with(all=True, filters={'name': '^skale_'})
+
+        assert get_container_summaries(name='^skale_') == summaries
+        assert client.api.containers.call_count == 1
+        get_container_summaries(name='^skale_', use_cache=False)
+        assert client.api.containers.call_count == 2
+
+        assert is_container_exists('skale_admin')
+        client.api.containers.assert_called_with(all=True, filters={'name': '^skale_admin$'})
+    reset_containers_cache()
+
+
+def test_rm_container_ignores_cache():
+    reset_containers_cache()
+    client = mock.Mock()
+    client.api.containers.return_value = [
+        {'Names': ['/skale_admin'], 'Id': '0x1', 'State': 'running'}
+    ]
+    with mock.patch('node_cli.utils.docker_utils.docker_client', return_value=client):
+        assert is_container_exists('skale_admin')
+        client.api.containers.return_value = []
+        rm_container('skale_admin', dclient=client)
+    assert client.api.containers.call_count == 2
+    client.containers.get.assert_not_called()
+    reset_containers_cache()
+
+
+def test_get_compose_services():
+    assert get_compose_services({}) == BASE_COMPOSE_SERVICES
+    services = get_compose_services({
+        'MONITORING_CONTAINERS': 'True',
+        'TG_API_KEY': 'key',
+        'TG_CHAT_ID': 'id'
+    })
+    assert services[-3:] == ('node-exporter', 'advisor', 'celery')
+
+
+def compose_summary(service, state='running', status='Up 1 second'):
+    return ContainerSummary(
+        name=f'skale_{service}',
+        id=service,
+        state=state,
+        status=status,
+        labels={'com.docker.compose.service': service}
+    )
+
+
+def test_get_services_states():
+    summaries = [
+        compose_summary('api'),
+        compose_summary('admin', status='Up 1 minute (unhealthy)'),
+        compose_summary('bounty', state='exited', status='Exited (1)')
+    ]
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        return_value=summaries
+    ) as summaries_mock:
+        states = get_services_states(['api', 'admin', 'bounty', 'redis'])
+    assert summaries_mock.call_count == 1
+    assert list(states) == ['api', 'admin', 'bounty', 'redis']
+    assert states['api'].alive and states['api'].container == 'skale_api'
+    assert states['admin'].health == 'unhealthy' and not states['admin'].alive
+    assert states['bounty'].state == 'exited' and not states['bounty'].alive
+    assert states['redis'].state == 'missing' and states['redis'].container is None
+
+
+def test_get_services_states_ignores_foreign_containers():
+    foreign = compose_summary('redis')._replace(name='otherproject_redis_1')
+    summaries = [
+        compose_summary('api'),
+        compose_summary('admin', state='exited', status='Exited (0)'),
+        compose_summary('admin'),
+        compose_summary('bounty'),
+        compose_summary('bounty', state='exited', status='Exited (0)'),
+        foreign
+    ]
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        return_value=summaries
+    ) as summaries_mock:
+        states = get_services_states(['api', 'admin', 'bounty', 'redis'])
+    assert summaries_mock.call_args[1]['name'] == 'skale_'
+    assert states['admin'].alive and states['bounty'].alive
+    assert states['redis'].state == 'missing'
+
+
+def test_wait_for_compose_services():
+    polls = iter([
+        [compose_summary('api', status='Up 1 second (health: starting)')],
+        [
+            compose_summary('api', status='Up 2 seconds (healthy)'),
+            compose_summary('admin')
+        ]
+    ])
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        side_effect=lambda **kwargs: next(polls)
+    ), mock.patch('node_cli.utils.docker_utils.READINESS_INITIAL_DELAY', 0.01):
+        ready = wait_for_compose_services(['api', 'admin'], timeout=5)
+    assert set(ready) == {'api', 'admin'}
+
+
+def test_wait_for_compose_services_failed():
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        return_value=[compose_summary('api', state='exited', status='Exited (1)')]
+    ):
+        with pytest.raises(ContainersNotReadyError, match='api failed'):
+            wait_for_compose_services(['api'], timeout=5)
+
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        return_value=[compose_summary('api', state='restarting')]
+    ), mock.patch('node_cli.utils.docker_utils.READINESS_INITIAL_DELAY', 0.01):
+        with pytest.raises(ContainersNotReadyError, match='restarting in a loop'):
+            wait_for_compose_services(['api'], timeout=5)
+
+    with mock.patch(
+        'node_cli.utils.docker_utils.get_container_summaries',
+        return_value=[]
+    ):
+        start = time.monotonic()
+        with pytest.raises(ContainersNotReadyError, match='not ready in 1s: api'):
+            wait_for_compose_services(['api'], timeout=1)
+        assert time.monotonic() - start < 2
+
+
+def test_get_compose_images(tmp_path):
+    compose_path = tmp_path / 'docker-compose.yml'
+    compose_path.write_text(
+        'services:\n'
+        '  admin:\n'
+        '    image: skalenetwork/admin:${ADMIN_VERSION}\n'
+        '  api:\n'
+        '    image: skalenetwork/admin:$ADMIN_VERSION\n'
+        '  redis:\n'
+        '    image: redis:${REDIS_VERSION:-6.0}\n'
+        '  local:\n'
+        '    build: .\n'
+    )
+    (tmp_path / '.env').write_text('ADMIN_VERSION=1.0.0\n')
+    assert get_compose_images(str(compose_path)) == [
+        'skalenetwork/admin:1.0.0',
+        'redis:6.0'
+    ]
+    assert get_compose_images(str(compose_path), env={'ADMIN_VERSION': '2.0.0'}) == [
+        'skalenetwork/admin:2.0.0',
+        'redis:6.0'
+    ]
+
+
+def test_interpolate_compose_value():
+    env = {'SET': 'value', 'EMPTY': ''}
+    assert interpolate_compose_value('$$SET-${SET}-$SET', env) == '$SET-value-value'
+    assert interpolate_compose_value('${EMPTY:-a}${EMPTY-b}${UNSET-c}', env) == 'ac'
+    assert interpolate_compose_value('${SET:?err}${EMPTY?err}', env) == 'value'
+    assert interpolate_compose_value('${SET:+a}${EMPTY:+b}${EMPTY+c}${UNSET+d}', env) == 'ac'
+    with pytest.raises(ComposeInterpolationError, match='EMPTY is missing: need it'):
+        interpolate_compose_value('${EMPTY:?need it}', env)
+    with pytest.raises(ComposeInterpolationError, match='UNSET is missing'):
+        interpolate_compose_value('${UNSET?err}', env)
+    with pytest.raises(ComposeInterpolationError, match='Invalid interpolation'):
+        interpolate_compose_value('${SET:x}', env)
+
+
+def test_prestage_images_uses_staged_env(tmp_path):
+    staged_dir = tmp_path / 'config'
+    staged_dir.mkdir()
+    (staged_dir / 'docker-compose.yml').write_text(
+        'services:\n'
+        '  admin:\n'
+        '    image: skalenetwork/admin:${ADMIN_VERSION}\n'
+    )
+    (staged_dir / '.env').write_text('ADMIN_VERSION=2.0.0\n')
+    with mock.patch(
+        'node_cli.operations.skale_node.CONTAINER_CONFIG_TMP_PATH', str(staged_dir)
+    ), mock.patch('node_cli.operations.skale_node.pull_images') as pull_mock:
+        images = prestage_images({'CONTAINER_CONFIGS_DIR': ''})
+    assert images == ['skalenetwork/admin:2.0.0']
+    pull_mock.assert_called_once_with(images)
+
+
+PULL_EVENTS = [
+    {'status': 'Pulling from skalenetwork/admin', 'id': '1.0.0'},
+    {'status': 'Already exists', 'progressDetail': {}, 'id': 'a1'},
+    {'status': 'Pulling fs layer', 'progressDetail': {}, 'id': 'b2'},
+    {'status': 'Downloading', 'progressDetail': {'current': 50, 'total': 200}, 'id': 'b2'},
+    {'status': 'Downloading', 'progressDetail': {'current': 190, 'total': 200}, 'id': 'b2'},
+    {'status': 'Download complete', 'progressDetail': {}, 'id': 'b2'},
+    {'status': 'Pull complete', 'progressDetail': {}, 'id': 'b2'},
+    {'status': 'Digest: sha256:abc'},
+    {'status': 'Status: Downloaded newer image for skalenetwork/admin:1.0.0'}
+]
+
+
+def test_image_pull_progress():
+    progress = ImagePullProgress('skalenetwork/admin:1.0.0')
+    for event in PULL_EVENTS:
+        progress.update(event)
+    assert progress.transferred == 200
+    assert progress.statuses == {'a1': 'Already exists', 'b2': 'Pull complete'}
+
+    with pytest.raises(ImagePullError, match='manifest unknown'):
+        progress.update({'error': 'manifest unknown'})
+
+
+def test_pull_images():
+    client = mock.Mock()
+    client.api.inspect_image.side_effect = lambda image: {
+        'RepoDigests': ['redis@sha256:up-to-date']
+    }
+    client.api.inspect_distribution.side_effect = lambda image: {
+        'Descriptor': {
+            'digest': 'sha256:up-to-date' if image.startswith('redis') else 'sha256:new'
+        }
+    }
+    client.api.pull.side_effect = lambda image, **kwargs: iter(PULL_EVENTS)
+    with mock.patch('node_cli.utils.docker_utils.docker_client', return_value=client):
+        results = pull_images(['skalenetwork/admin:1.0.0', 'redis:6.0', 'redis@sha256:up-to-date'])
+        assert [r.skipped for r in results] == [False, True, True]
+        assert [r.transferred for r in results] == [200, 0, 0]
+        client.api.pull.assert_called_once_with(
+            'skalenetwork/admin:1.0.0', stream=True, decode=True
+        )
+        assert client.api.inspect_distribution.call_count == 2
+
+        client.api.pull.side_effect = lambda image, **kwargs: iter([{'error': 'denied'}])
+        with pytest.raises(ImagePullError, match='skalenetwork/admin:1.0.0'):
+            pull_images(['skalenetwork/admin:1.0.0', 'redis:6.0'])
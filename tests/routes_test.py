@@ -1,6 +1,8 @@
 import pytest
 from node_cli.configs.routes import (route_exists, get_route, get_all_available_routes,
-                                     RouteNotFoundException)
+                                     get_route_timeout, RouteNotFoundException,
+                                     DEFAULT_ROUTE_TIMEOUT, DOWNLOAD_ROUTE_TIMEOUT,
+                                     TRANSACTION_ROUTE_TIMEOUT)
 
 
 ALL_V1_ROUTES = [
@@ -49,3 +51,10 @@ def test_get_route():
 
 def test_get_all_available_routes():
     assert get_all_available_routes() == ALL_V1_ROUTES
+
+
+def test_get_route_timeout():
+    assert get_route_timeout('node', 'info') == DEFAULT_ROUTE_TIMEOUT
+    assert get_route_timeout('node', 'register') == TRANSACTION_ROUTE_TIMEOUT
+    assert get_route_timeout('wallet', 'send-eth') == TRANSACTION_ROUTE_TIMEOUT
+    assert get_route_timeout('logs', 'dump') == DOWNLOAD_ROUTE_TIMEOUT
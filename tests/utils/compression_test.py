@@ -0,0 +1,94 @@
+import gzip
+import shutil
+import subprocess
+
+import mock
+import pytest
+
+from node_cli.utils.compression import (
+    compressed_writer,
+    decompressed_reader,
+    decompressed_stream,
+    detect_compression,
+    get_compress_cmd,
+    CompressionError
+)
+
+
+def test_get_compress_cmd():
+    with mock.patch('shutil.which', return_value='/usr/bin/pigz'):
+        assert get_compress_cmd('gzip', level=9, threads=2) == ['pigz', '-c', '-p', '2', '-9']
+        assert get_compress_cmd('zstd') == ['zstd', '-c', '-q', '-T0']
+    with mock.patch('shutil.which', return_value=None):
+        assert get_compress_cmd('gzip') is None
+        with pytest.raises(CompressionError):
+            get_compress_cmd('zstd')
+    with pytest.raises(CompressionError):
+        get_compress_cmd('bzip2')
+
+
+def test_compressed_writer_gzip_fallback(tmp_dir_path):
+    path = f'{tmp_dir_path}/data.gz'
+    with mock.patch('shutil.which', return_value=None):
+        with compressed_writer(path, 'gzip', level=1) as out:
+            out.write(b'test data')
+    with gzip.open(path) as f:
+        assert f.read() == b'test data'
+
+
+@pytest.mark.skipif(shutil.which('zstd') is None, reason='zstd is not installed')
+def test_compressed_writer_zstd(tmp_dir_path):
+    path = f'{tmp_dir_path}/data.zst'
+    with compressed_writer(path, 'zstd') as out:
+        out.write(b'test data')
+    assert subprocess.check_output(['zstd', '-d', '-c', path]) == b'test data'
+    assert detect_compression(path) == 'zstd'
+    with decompressed_reader(path) as stream:
+        assert stream.read() == b'test data'
+
+    with pytest.raises(ValueError):
+        with compressed_writer(path, 'zstd') as out:
+            raise ValueError('Writing failed')
+
+
+def test_decompressed_reader(tmp_dir_path):
+    plain_path = f'{tmp_dir_path}/data'
+    with open(plain_path, 'wb') as f:
+        f.write(b'test data')
+    assert detect_compression(plain_path) is None
+    with decompressed_reader(plain_path) as stream:
+        assert stream.read() == b'test data'
+
+    gzip_path = f'{tmp_dir_path}/data.gz'
+    with gzip.open(gzip_path, 'wb') as f:
+        f.write(b'test data')
+    assert detect_compression(gzip_path) == 'gzip'
+    with mock.patch('shutil.which', return_value=None):
+        with decompressed_reader(gzip_path) as stream:
+            assert stream.read() == b'test data'
+
+
+@pytest.mark.skipif(shutil.which('zstd') is None, reason='zstd is not installed')
+def test_decompressed_stream_reports_source_error():
+    compressed = subprocess.check_output(['zstd', '-c', '-q'], input=b'test data' * 1024)
+
+    class FailingReader:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size=-1):
+            self.calls += 1
+            if self.calls > 1:
+                raise OSError('Chunk read failed')
+            return compressed[:len(compressed) // 2]
+
+    with pytest.raises(OSError, match='Chunk read failed'):
+        with decompressed_stream(FailingReader(), 'zstd') as stream:
+            stream.read()
+            raise subprocess.CalledProcessError(1, ['btrfs', 'receive'])
+
+
+def test_compression_level_validation(tmp_dir_path):
+    with pytest.raises(CompressionError, match='from 1 to 9'):
+        with compressed_writer(f'{tmp_dir_path}/data.gz', 'gzip', level=12):
+            pass
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from node_cli.utils.helper import CommandCancelledError, format_bytes, run_cmd
+from node_cli.utils.metrics import METRICS
+
+
+def python_cmd(script):
+    return [sys.executable, '-c', script]
+
+
+def test_run_cmd_output():
+    res = run_cmd(python_cmd('print("out"); import sys; print("err", file=sys.stderr)'))
+    assert res.returncode == 0
+    assert res.stdout.splitlines() == [b'out', b'err']
+
+    res = run_cmd(
+        python_cmd('print("out"); import sys; print("err", file=sys.stderr)'),
+        separate_stderr=True
+    )
+    assert res.stdout == b'out\n'
+    assert res.stderr == b'err\n'
+
+
+def test_run_cmd_bounded_tail():
+    res = run_cmd(
+        python_cmd('for i in range(1000): print(i)'),
+        capture=False,
+        tail_lines=3
+    )
+    assert res.stdout == b'997\n998\n999\n'
+
+
+def test_run_cmd_env_overrides_host_env(monkeypatch):
+    monkeypatch.setenv('NODE_CLI_TEST_VAR', 'host')
+    res = run_cmd(
+        python_cmd('import os; print(os.environ["NODE_CLI_TEST_VAR"])'),
+        env={'NODE_CLI_TEST_VAR': 'passed'}
+    )
+    assert res.stdout == b'passed\n'
+
+
+def test_run_cmd_failed():
+    METRICS.reset()
+    with pytest.raises(subprocess.CalledProcessError):
+        run_cmd(python_cmd('import sys; print("boom"); sys.exit(3)'))
+    res = run_cmd(python_cmd('import sys; sys.exit(3)'), check_code=False)
+    assert res.returncode == 3
+    stats = METRICS.get(f'cmd.{sys.executable.split("/")[-1]}')
+    assert stats['count'] == 2
+    assert stats['errors'] == 2
+    assert stats['codes'] == {3: 2}
+
+
+def test_run_cmd_timeout_and_cancel():
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_cmd(python_cmd('import time; time.sleep(10)'), timeout=0.3)
+
+    cancel_event = threading.Event()
+    timer = threading.Timer(0.3, cancel_event.set)
+    timer.start()
+    with pytest.raises(CommandCancelledError):
+        run_cmd(python_cmd('import time; time.sleep(10)'), cancel_event=cancel_event)
+
+
+def test_format_bytes():
+    assert format_bytes(512) == '512.0 B'
+    assert format_bytes(1536) == '1.5 KiB'
+    assert format_bytes(3 * 1024 ** 3) == '3.0 GiB'